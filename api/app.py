@@ -1,21 +1,31 @@
+import time
+_import_start = time.perf_counter()
+
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_caching import Cache
-import torch
-from transformers import RobertaTokenizer, RobertaForSequenceClassification
-import tensorflow as tf
-import numpy as np
 import sys
 import os
-import pandas as pd
 import io
-import requests
 import logging
 import redis
-from simple_model import predict_with_simple_model
-from database import MoodTrackingDB
+import simple_model
+import batching
+import import_report
+import inference_client
+import model_executor
+import model_registry
+import precision
+import prediction_cache
+import single_flight
+import thread_budget
+import tokenization
+import warmup
+from predictors import predict_roberta_sentiment_chunk, predict_lstm_sentiment_batch
+from onnx_backend import get_backend_info
+from database import get_db
 from user_manager import UserManager
 from translations import translate_test_data, get_recommendations
 from jwt_utils import create_token, verify_token, require_auth, extract_user_id_from_request
@@ -72,10 +82,19 @@ try:
     redis_client = redis.from_url(config.REDIS_URL, decode_responses=True)
     redis_client.ping()
     logger.info(f"✓ Redis connected: {config.REDIS_URL}")
+    prediction_cache.init_redis(redis_client)
 except (redis.ConnectionError, redis.RedisError) as e:
     logger.warning(f"⚠ Redis connection failed: {e}. Using in-memory storage.")
     redis_client = None
 
+def _reset_redis_after_fork():
+    """Forked gunicorn workers must not share the parent's Redis sockets"""
+    if redis_client is not None:
+        redis_client.connection_pool.reset()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_redis_after_fork)
+
 # Configure rate limiting with Redis (fallback to memory if Redis unavailable)
 storage_uri = config.RATE_LIMIT_STORAGE if redis_client else "memory://"
 limiter = Limiter(
@@ -89,7 +108,7 @@ logger.info(f"✓ Rate limiting configured: {storage_uri}")
 
 # Configure caching
 cache_config = {
-    'CACHE_TYPE': config.CACHE_TYPE if redis_client else 'simple',
+    'CACHE_TYPE': config.CACHE_TYPE if redis_client else 'SimpleCache',  # 'simple' was removed in Flask-Caching 2
     'CACHE_DEFAULT_TIMEOUT': config.CACHE_DEFAULT_TIMEOUT,
     'CACHE_KEY_PREFIX': config.CACHE_KEY_PREFIX,
 }
@@ -100,13 +119,10 @@ if config.CACHE_TYPE == 'redis' and redis_client:
 cache = Cache(app, config=cache_config)
 logger.info(f"✓ Caching configured: {cache_config['CACHE_TYPE']}")
 
-# Global variables for models
-roberta_model = None
-roberta_tokenizer = None
-lstm_model = None
+# Models are loaded on first use by model_registry (one copy per process)
 
 # Initialize database and user manager
-db = MoodTrackingDB()
+db = get_db()
 user_manager = UserManager()
 
 # ============================================
@@ -134,8 +150,6 @@ logger.info("✓ All blueprints registered successfully")
 # REQUEST LOGGING MIDDLEWARE (Phase 3)
 # ============================================
 
-import time
-
 @app.before_request
 def log_request():
     """Log incoming requests"""
@@ -227,95 +241,21 @@ swagger = Swagger(app, config=swagger_config, template=swagger_template)
 
 logger.info("✓ Swagger documentation enabled at /api/docs")
 
+# ML frameworks are imported by the model loaders on first use, not here
+import_report.record_app_import(time.perf_counter() - _import_start)
+logger.info(f"✓ App imported in {time.perf_counter() - _import_start:.2f}s (ML_ENABLED={config.ML_ENABLED})")
+
 # ============================================
 # MODEL LOADING
 # ============================================
 
 def load_roberta_model():
-    """Load the fine-tuned RoBERTa model"""
-    global roberta_model, roberta_tokenizer
-    try:
-        model_path = os.path.join("..", "Fine_tuned_RoBERTa", "roberta_sentiment_model")
-        tokenizer_path = os.path.join("..", "Fine_tuned_RoBERTa", "roberta_tokenizer")
-
-        roberta_tokenizer = RobertaTokenizer.from_pretrained(tokenizer_path)
-        roberta_model = RobertaForSequenceClassification.from_pretrained(model_path)
-        roberta_model.eval()
-
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        roberta_model.to(device)
-
-        logger.info("RoBERTa model loaded successfully!")
-        return True
-    except Exception as e:
-        logger.error(f"Error loading RoBERTa model: {e}")
-        return False
+    """Load the fine-tuned RoBERTa model (shared model registry)"""
+    return model_registry.get_model('roberta') is not None
 
 def load_lstm_model():
-    """Load the MentalBERT-based LSTM model"""
-    global lstm_model
-    try:
-        model_path = "../mentalbert_lstm_model.keras"
-        lstm_model = tf.keras.models.load_model(model_path)
-        logger.info("LSTM model loaded successfully!")
-        return True
-    except Exception as e:
-        logger.error(f"Error loading LSTM model: {e}")
-        return False
-
-def predict_roberta_sentiment(text):
-    """Predict sentiment using RoBERTa model"""
-    if roberta_model is None or roberta_tokenizer is None:
-        return {"error": "RoBERTa model not loaded"}
-
-    try:
-        labels = {0: "Negative", 1: "Neutral", 2: "Positive"}
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-
-        inputs = roberta_tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=512)
-        inputs = {key: value.to(device) for key, value in inputs.items()}
-
-        with torch.no_grad():
-            outputs = roberta_model(**inputs)
-            probabilities = torch.softmax(outputs.logits, dim=-1)
-            prediction = torch.argmax(outputs.logits, dim=-1).item()
-
-        confidence_scores = {
-            "negative": float(probabilities[0][0]),
-            "neutral": float(probabilities[0][1]),
-            "positive": float(probabilities[0][2])
-        }
-
-        return {
-            "sentiment": labels[prediction],
-            "confidence": float(probabilities[0][prediction]),
-            "scores": confidence_scores
-        }
-    except Exception as e:
-        return {"error": f"RoBERTa prediction error: {str(e)}"}
-
-def predict_lstm_sentiment(text):
-    """Predict sentiment using MentalBERT-LSTM model"""
-    try:
-        # Use the user's Model.py implementation
-        result = predict_with_simple_model(text)
-
-        # Convert to expected format (matching RoBERTa output format)
-        return {
-            "sentiment": result.get("sentiment", "Neutral"),
-            "confidence": result.get("confidence", 0.5),
-            "scores": {
-                "negative": result.get("scores", {}).get("negative", 0.33),
-                "neutral": result.get("scores", {}).get("neutral", 0.33),
-                "positive": result.get("scores", {}).get("positive", 0.34)
-            },
-            "model_info": {
-                "architecture": result.get("architecture", "MentalBERT-LSTM"),
-                "embeddings": result.get("embeddings_used", "MentalBERT")
-            }
-        }
-    except Exception as e:
-        return {"error": f"LSTM prediction error: {str(e)}"}
+    """Load the MentalBERT-based LSTM model (shared model registry)"""
+    return simple_model.ensure_models_loaded()
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -341,12 +281,8 @@ def health_check():
     start_time = time.time()
 
     # Check ML models
-    lstm_loaded = False
-    try:
-        from simple_model import model, tokenizer, mentalbert
-        lstm_loaded = model is not None and tokenizer is not None and mentalbert is not None
-    except:
-        lstm_loaded = False
+    roberta_loaded = model_registry.registry.is_loaded('roberta')
+    lstm_loaded = model_registry.registry.is_loaded('lstm_head') and model_registry.registry.is_loaded('mentalbert')
 
     # Check Redis
     redis_status = "disconnected"
@@ -374,7 +310,7 @@ def health_check():
 
     # Overall health determination
     critical_services = [
-        roberta_model is not None or lstm_loaded,  # At least one model loaded
+        roberta_loaded or lstm_loaded,  # At least one model loaded
         db_status == "connected"
     ]
 
@@ -393,8 +329,8 @@ def health_check():
         "services": {
             "ml_models": {
                 "roberta": {
-                    "loaded": roberta_model is not None,
-                    "status": "ready" if roberta_model is not None else "not_loaded"
+                    "loaded": roberta_loaded,
+                    "status": "ready" if roberta_loaded else "not_loaded"
                 },
                 "lstm": {
                     "loaded": lstm_loaded,
@@ -408,7 +344,8 @@ def health_check():
             },
             "database": {
                 "status": db_status,
-                "path": config.DATABASE_PATH
+                "path": config.DATABASE_PATH,
+                "connections": db.get_connection_stats()
             },
             "cache": {
                 "type": cache_status,
@@ -419,217 +356,208 @@ def health_check():
         "details": {
             "rate_limiting": storage_uri,
             "blueprints_loaded": len(app.blueprints),
-            "total_routes": len([rule for rule in app.url_map.iter_rules()])
+            "total_routes": len([rule for rule in app.url_map.iter_rules()]),
+            "inference_batching": batching.get_batching_stats(),
+            "prediction_cache": prediction_cache.get_cache_stats(),
+            "single_flight": single_flight.get_single_flight_stats(),
+            "model_registry": model_registry.get_registry_report(),
+            "inference_server": inference_client.get_status(),
+            "model_executor": model_executor.get_executor_stats(),
+            "thread_budget": thread_budget.get_report(),
+            "tokenization": tokenization.get_stats(),
+            "warmup": warmup.get_status(),
+            "imports": import_report.get_import_status(),
+            "encoder_backend": get_backend_info(config.ENCODER_BACKEND, model_registry.get_loaded_encoders()),
+            "precision": precision.get_precision_report()
         }
     })
 
-@app.route('/api/predict/roberta', methods=['POST'])
-@limiter.limit("30 per minute")  # Limit model predictions
-def predict_roberta():
-    """Predict sentiment using RoBERTa model"""
-    MAX_TEXT_LENGTH = 5000
-
-    try:
-        data = request.get_json()
-        if not data or 'text' not in data:
-            return jsonify({"error": "No text provided"}), 400
-
-        text = data['text']
-        if not isinstance(text, str):
-            return jsonify({"error": "Text must be a string"}), 400
-
-        if not text.strip():
-            return jsonify({"error": "Empty text provided"}), 400
-
-        if len(text) > MAX_TEXT_LENGTH:
-            return jsonify({"error": f"Text too long. Maximum length is {MAX_TEXT_LENGTH} characters"}), 400
-
-        result = predict_roberta_sentiment(text)
-        return jsonify(result)
-
-    except Exception as e:
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
-
-@app.route('/api/predict/lstm', methods=['POST'])
-@limiter.limit("30 per minute")  # Limit model predictions
-def predict_lstm():
-    """Predict sentiment using LSTM model"""
-    MAX_TEXT_LENGTH = 5000
-
-    try:
-        data = request.get_json()
-        if not data or 'text' not in data:
-            return jsonify({"error": "No text provided"}), 400
-
-        text = data['text']
-        if not isinstance(text, str):
-            return jsonify({"error": "Text must be a string"}), 400
-
-        if not text.strip():
-            return jsonify({"error": "Empty text provided"}), 400
-
-        if len(text) > MAX_TEXT_LENGTH:
-            return jsonify({"error": f"Text too long. Maximum length is {MAX_TEXT_LENGTH} characters"}), 400
-
-        result = predict_lstm_sentiment(text)
-        return jsonify(result)
-
-    except Exception as e:
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
-
-@app.route('/api/predict/both', methods=['POST'])
-@limiter.limit("20 per minute")  # More restrictive for dual model predictions
-def predict_both():
-    """Predict sentiment using both models"""
-    MAX_TEXT_LENGTH = 5000
-
-    try:
-        data = request.get_json()
-        if not data or 'text' not in data:
-            return jsonify({"error": "No text provided"}), 400
+@app.route('/api/ready', methods=['GET'])
+@limiter.exempt  # Polled by Docker and load balancers
+def readiness_check():
+    """
+    Readiness check: models loaded and warmed up
 
-        text = data['text']
-        if not isinstance(text, str):
-            return jsonify({"error": "Text must be a string"}), 400
+    Unlike /api/health (process is up), this only returns 200 once the warmup
+    has run, so traffic is not routed to an instance whose first requests
+    would be slow.
+    ---
+    tags:
+      - System
+    responses:
+      200:
+        description: Ready to serve predictions
+      503:
+        description: Warmup still running, or no model could be warmed up
+    """
+    status = warmup.get_status()
+    return jsonify(status), 200 if status['ready'] else 503
 
-        if not text.strip():
-            return jsonify({"error": "Empty text provided"}), 400
+# /api/predict/roberta, /api/predict/lstm, /api/predict/both and /api/analyze/csv
+# are served by the predictions blueprint (routes/predictions.py)
 
-        if len(text) > MAX_TEXT_LENGTH:
-            return jsonify({"error": f"Text too long. Maximum length is {MAX_TEXT_LENGTH} characters"}), 400
+BATCH_MODELS = ('roberta', 'lstm', 'both', 'cascade')
+# Tokenizers to prefetch per model (default: all loaded)
+BATCH_TOKENIZERS = {'roberta': ['roberta'], 'lstm': ['mentalbert']}
 
-        roberta_result = predict_roberta_sentiment(text)
-        lstm_result = predict_lstm_sentiment(text)
+def batch_rate_limit_cost():
+    """
+    Rate-limit cost of a /api/predict/batch request: one unit per text and model
 
-        return jsonify({
-            "text": text,
-            "roberta": roberta_result,
-            "lstm": lstm_result
-        })
+    cascade is charged like both: the cost is taken before the first model
+    has run, so it must cover the worst case where every text escalates.
+    """
+    data = request.get_json(silent=True)
+    texts = data.get('texts') if isinstance(data, dict) else None
+    if not isinstance(texts, list) or not texts:
+        return 1
+
+    items = min(len(texts), config.PREDICT_BATCH_MAX_ITEMS)
+    return items * (2 if data.get('model') in ('both', 'cascade') else 1)
+
+def predict_batch_chunk(model, texts):
+    """Run one chunk of texts through the selected model(s) with batched inference"""
+    if model == 'roberta':
+        return predict_roberta_sentiment_chunk(texts)
+    if model == 'lstm':
+        return predict_lstm_sentiment_batch(texts)
+
+    # Both models concurrently (one forward pass each), or the cascade
+    roberta_results, lstm_results, run_infos = model_executor.predict_dual_batch(
+        predict_roberta_sentiment_chunk, predict_lstm_sentiment_batch, texts, model
+    )
+    return [
+        dict(
+            run_info,
+            roberta=roberta_result,
+            lstm=lstm_result,
+            consensus=model_executor.models_agree(roberta_result, lstm_result)
+        )
+        for roberta_result, lstm_result, run_info in zip(roberta_results, lstm_results, run_infos)
+    ]
 
-    except Exception as e:
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
+def is_failed_item(item):
+    """True if a batch result (or either half of a model=both result) is an error"""
+    return 'error' in item or any(isinstance(value, dict) and 'error' in value for value in item.values())
 
-@app.route('/api/analyze/csv', methods=['POST'])
-@limiter.limit("5 per hour")  # Very restrictive for CSV processing
-def analyze_csv():
-    """Analyze sentiment for a CSV file"""
-    # Configuration limits
-    MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-    MAX_ROWS = 1000
+@app.route('/api/predict/batch', methods=['POST'])
+@limiter.limit(config.PREDICT_BATCH_RATE_LIMIT, cost=batch_rate_limit_cost)
+def predict_batch():
+    """
+    Predict sentiment for many texts in one request
+    Every text is validated on its own and invalid texts get an error in their
+    slot, so one bad item does not fail the batch. Valid texts are scored in
+    chunks of CSV_INFERENCE_CHUNK_SIZE with one forward pass per model per chunk.
+    The rate limit counts predictions, not requests.
+    ---
+    tags:
+      - Predictions
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - texts
+          properties:
+            texts:
+              type: array
+              items:
+                type: string
+                maxLength: 5000
+              maxItems: 100
+            model:
+              type: string
+              enum: [roberta, lstm, both, cascade]
+              default: roberta
+    responses:
+      200:
+        description: One result per text, in request order
+        schema:
+          type: object
+          properties:
+            model:
+              type: string
+            total:
+              type: integer
+            succeeded:
+              type: integer
+            failed:
+              type: integer
+            results:
+              type: array
+              items:
+                type: object
+      400:
+        description: Invalid request (not a list, empty, too many texts, unknown model)
+      503:
+        description: Predictions not available on this server
+    """
     MAX_TEXT_LENGTH = 5000
 
     try:
-        # Check if file is present
-        if 'file' not in request.files:
-            return jsonify({"error": "No file provided"}), 400
-
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({"error": "No file selected"}), 400
-
-        if not file.filename.lower().endswith('.csv'):
-            return jsonify({"error": "File must be a CSV"}), 400
-
-        # Read and validate file size
-        try:
-            csv_content = file.read()
-
-            # Check file size
-            if len(csv_content) > MAX_FILE_SIZE:
-                return jsonify({"error": f"File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB"}), 400
-
-            # Decode and parse CSV
-            csv_content = csv_content.decode('utf-8')
-            df = pd.read_csv(io.StringIO(csv_content))
-        except Exception as e:
-            return jsonify({"error": f"Error reading CSV: {str(e)}"}), 400
-
-        # Find text column
-        text_column = None
-        possible_text_columns = ['text', 'content', 'message', 'comment', 'review', 'description']
-
-        for col in df.columns:
-            if col.lower() in possible_text_columns:
-                text_column = col
-                break
-
-        if text_column is None:
-            # Take the first column if no obvious text column found
-            text_column = df.columns[0]
-
-        # Filter out empty/null texts
-        df = df.dropna(subset=[text_column])
-        df = df[df[text_column].str.strip() != '']
-
-        if len(df) == 0:
-            return jsonify({"error": "No valid text data found in CSV"}), 400
-
-        # Check row count
-        if len(df) > MAX_ROWS:
-            return jsonify({"error": f"Too many rows. Maximum is {MAX_ROWS} rows. Your file has {len(df)} rows."}), 400
-
-        # Analyze each text entry
-        results = []
-        for idx, row in df.iterrows():
-            text = str(row[text_column]).strip()
-            if not text:
-                continue
-
-            # Validate text length
-            if len(text) > MAX_TEXT_LENGTH:
-                results.append({
-                    "row": int(idx + 1),
-                    "text": text[:100] + "...",
-                    "sentiment": "Error",
-                    "confidence": 0.0,
-                    "error": f"Text too long (max {MAX_TEXT_LENGTH} characters)"
-                })
-                continue
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or 'texts' not in data:
+            return jsonify({"error": "No texts provided"}), 400
+
+        texts = data['texts']
+        model = data.get('model', 'roberta')
+
+        if not isinstance(texts, list):
+            return jsonify({"error": "texts must be a list of strings"}), 400
+
+        if not texts:
+            return jsonify({"error": "Empty texts list provided"}), 400
+
+        if len(texts) > config.PREDICT_BATCH_MAX_ITEMS:
+            return jsonify({"error": f"Too many texts. Maximum is {config.PREDICT_BATCH_MAX_ITEMS} per request"}), 400
+
+        if model not in BATCH_MODELS:
+            return jsonify({"error": f"Unknown model '{model}'. Expected one of: {', '.join(BATCH_MODELS)}"}), 400
+
+        if not model_registry.predictions_available():
+            return jsonify({"error": "Predictions are not available on this server (ML_ENABLED=False)"}), 503
+
+        # Validate every text first (same rules as the single-text endpoints)
+        results = [None] * len(texts)
+        pending = []  # (index, text)
+        for index, text in enumerate(texts):
+            if not isinstance(text, str):
+                results[index] = {"index": index, "error": "Text must be a string"}
+            elif not text.strip():
+                results[index] = {"index": index, "error": "Empty text provided"}
+            elif len(text) > MAX_TEXT_LENGTH:
+                results[index] = {"index": index, "error": f"Text too long. Maximum length is {MAX_TEXT_LENGTH} characters"}
+            else:
+                pending.append((index, text))
 
+        # The next chunk is tokenized in the background while this one runs the model(s)
+        chunk_size = max(1, config.CSV_INFERENCE_CHUNK_SIZE)
+        chunks = [pending[start:start + chunk_size] for start in range(0, len(pending), chunk_size)]
+        tokenizers = BATCH_TOKENIZERS.get(model)
+        for chunk in tokenization.pipelined(chunks, lambda chunk: [text for _, text in chunk], tokenizers):
             try:
-                # Get predictions from both models
-                roberta_result = predict_roberta_sentiment(text)
-                lstm_result = predict_lstm_sentiment(text)
-
-                # Determine overall sentiment (you can customize this logic)
-                overall_sentiment = roberta_result.get('sentiment', 'Neutral')
-                confidence = roberta_result.get('confidence', 0.5)
-
-                # Check if models agree
-                agreement = (roberta_result.get('sentiment') == lstm_result.get('sentiment'))
-
-                results.append({
-                    "row": int(idx + 1),
-                    "text": text,
-                    "sentiment": overall_sentiment,
-                    "confidence": float(confidence),
-                    "roberta": roberta_result,
-                    "lstm": lstm_result,
-                    "agreement": agreement
-                })
-
+                chunk_results = predict_batch_chunk(model, [text for _, text in chunk])
             except Exception as e:
-                # Include failed predictions with error info
-                results.append({
-                    "row": int(idx + 1),
-                    "text": text,
-                    "sentiment": "Error",
-                    "confidence": 0.0,
-                    "error": str(e),
-                    "roberta": {"error": str(e)},
-                    "lstm": {"error": str(e)},
-                    "agreement": False
-                })
+                logger.error(f"Batch prediction error: {e}")
+                chunk_results = [{"error": f"Prediction error: {str(e)}"} for _ in chunk]
+
+            for (index, _), result in zip(chunk, chunk_results):
+                results[index] = dict(result, index=index)
+
+        failed = sum(1 for item in results if is_failed_item(item))
 
         return jsonify({
-            "success": True,
-            "total_entries": len(results),
-            "text_column": text_column,
+            "model": model,
+            "total": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
             "results": results
         })
 
     except Exception as e:
+        logger.error(f"Batch prediction error: {e}")
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
 # Authentication endpoints
@@ -830,6 +758,7 @@ def auth_github():
         # If code is provided, exchange it for user info
         if code:
             import os
+            import requests  # Only the GitHub code exchange needs it
             client_id = os.environ.get('GITHUB_CLIENT_ID')
             client_secret = os.environ.get('GITHUB_CLIENT_SECRET')
 
@@ -1167,13 +1096,15 @@ def notifications_insights(current_user):
     user_id = current_user['user_id']
 
     try:
-        # Get user's journal entries from database
-        entries = db.get_journal_entries(user_id)
+        # Last 10 entries, only the fields the insights read
+        recent_entries, _ = db.list_journal_entries(
+            user_id, limit=10, fields=['sentiment', 'mood_score', 'text', 'date']
+        )
 
         # Get user's test results
         test_results = db.get_user_test_history(user_id)
 
-        if len(entries) == 0 and len(test_results) == 0:
+        if len(recent_entries) == 0 and len(test_results) == 0:
             return jsonify({
                 "success": True,
                 "insight": {
@@ -1185,8 +1116,6 @@ def notifications_insights(current_user):
             })
 
         # Generate AI-powered insights based on recent entries
-        recent_entries = entries[:10]  # Last 10 entries
-
         # Analyze sentiment patterns
         sentiment_trend = analyze_sentiment_trend(recent_entries)
         mood_pattern = analyze_mood_pattern(recent_entries)
@@ -1235,10 +1164,10 @@ def journal_analytics(current_user):
     user_id = current_user['user_id']
 
     try:
-        # Get user's journal entries from database
-        entries = db.get_journal_entries(user_id)
+        # Totals come from the user_rollups row
+        user_stats = db.get_user_stats(user_id)
 
-        if len(entries) == 0:
+        if user_stats['total_entries'] == 0:
             return jsonify({
                 "success": True,
                 "analytics": {
@@ -1257,8 +1186,8 @@ def journal_analytics(current_user):
                 }
             })
 
-        # Get comprehensive analytics from database
-        user_stats = db.get_user_stats(user_id)
+        # Themes are counted over every entry's text; no other column is read
+        entries, _ = db.list_journal_entries(user_id, limit=user_stats['total_entries'], fields=['sentiment', 'text'])
         weekly_trend = db.get_weekly_mood_trend(user_id, 7)
         time_patterns = db.get_time_patterns(user_id)
 
@@ -1587,6 +1516,7 @@ def identify_patterns(entries):
 
     # Time-based patterns
     from datetime import datetime
+    import pandas as pd
     time_sentiments = {}
 
     for entry in entries:
@@ -1787,7 +1717,7 @@ def dashboard_stats(current_user):
     try:
         # Get comprehensive stats from database
         user_stats = db.get_user_stats(user_id)
-        entries = db.get_journal_entries(user_id)
+        entries = db.get_journal_entries(user_id, limit=1)
 
         return jsonify({
             "success": True,
@@ -2050,22 +1980,28 @@ if __name__ == '__main__':
     logger.info("MOODTRACKER API v2.0 - Loading Models...")
     logger.info("=" * 60)
 
-    # Load models on startup
-    roberta_loaded = load_roberta_model()
-
-    # Load MentalBERT-LSTM model using simple model
-    from simple_model import load_models
-    lstm_loaded = load_models()
+    if inference_client.is_enabled():
+        # Models are owned by the model server
+        logger.info(f"Forwarding predictions to model server at {config.INFERENCE_SERVER_ADDRESS}")
+        roberta_loaded = lstm_loaded = inference_client.get_status().get('reachable', False)
+    elif not config.ML_ENABLED:
+        # No-ML process: auth, journal reads and tests only
+        logger.info("ML_ENABLED=False - serving without models")
+        roberta_loaded = lstm_loaded = False
+    else:
+        # Load models on startup
+        roberta_loaded = load_roberta_model()
 
-    # Set models in predictions blueprint
-    from routes.predictions import set_models
-    set_models(roberta_model, roberta_tokenizer, lstm_loaded)
-    logger.info("✓ Models configured in predictions blueprint")
+        # Load MentalBERT-LSTM model using simple model
+        lstm_loaded = load_lstm_model()
 
-    if not roberta_loaded and not lstm_loaded:
+    if not roberta_loaded and not lstm_loaded and config.ML_ENABLED:
         logger.warning("⚠ No models could be loaded!")
         logger.warning("⚠ The API will start but predictions may not work properly.")
 
+    # /api/ready returns 503 until this finishes
+    warmup.start_background()
+
     logger.info("=" * 60)
     logger.info("MODEL STATUS:")
     logger.info("=" * 60)
@@ -2077,6 +2013,7 @@ if __name__ == '__main__':
     logger.info("  [URL]  http://localhost:5001")
     logger.info("  [DOCS] http://localhost:5001/api/docs (Swagger UI)")
     logger.info("  [TEST] http://localhost:5001/api/health")
+    logger.info("  [READY] http://localhost:5001/api/ready")
     logger.info("=" * 60)
     logger.info("  Architecture: Modular Blueprints (Phase 3)")
     logger.info("  Security: Argon2 password hashing")
@@ -168,39 +168,31 @@ def load_roberta_model():
         print("PyTorch not available - RoBERTa model will use mock predictions")
         return False
 
-    try:
-        model_path = os.path.join("..", "Fine_tuned_RoBERTa", "roberta_sentiment_model")
-        tokenizer_path = os.path.join("..", "Fine_tuned_RoBERTa", "roberta_tokenizer")
-
-        roberta_tokenizer = RobertaTokenizer.from_pretrained(tokenizer_path)
-        roberta_model = RobertaForSequenceClassification.from_pretrained(model_path)
-        roberta_model.eval()
-
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        roberta_model.to(device)
-
-        print("RoBERTa model loaded successfully!")
-        return True
-    except Exception as e:
-        print(f"Error loading RoBERTa model: {e}")
+    # Shared with the other prediction paths (one copy per process)
+    import model_registry
+    roberta = model_registry.get_model('roberta')
+    if roberta is None:
+        print("Error loading RoBERTa model (see model registry log)")
         return False
 
+    roberta_model, roberta_tokenizer = roberta
+    print("RoBERTa model loaded successfully!")
+    return True
+
 def load_lstm_model():
     """Load the MentalBERT-based LSTM model"""
     global lstm_model
-    if not TENSORFLOW_AVAILABLE:
-        print("TensorFlow not available - LSTM model will use mock predictions")
-        return False
 
-    try:
-        model_path = "../mentalbert_lstm_model_full.keras"
-        lstm_model = tf.keras.models.load_model(model_path)
-        print("LSTM model loaded successfully!")
-        return True
-    except Exception as e:
-        print(f"Error loading LSTM model: {e}")
+    # Same LSTM head the MentalBERT-LSTM predictions use (shared model registry)
+    import model_registry
+    lstm_model = model_registry.get_model('lstm_head')
+    if lstm_model is None:
+        print("Error loading LSTM model (see model registry log)")
         return False
 
+    print("LSTM model loaded successfully!")
+    return True
+
 def get_mock_sentiment_data(text, model_type="both"):
     """Generate mock sentiment analysis data"""
     sentiment_options = ["Positive", "Negative", "Neutral"]
@@ -0,0 +1,221 @@
+"""
+Dynamic Micro-Batching Scheduler
+
+Collects concurrent single-text prediction requests into small batches so each
+model runs one tokenizer call and one forward pass per batch instead of one per
+HTTP request. Every caller still blocks until its own slice of the batch result
+is ready, so endpoint contracts do not change.
+
+Configured via config_manager.BaseConfig:
+- INFERENCE_BATCHING_ENABLED
+- INFERENCE_BATCH_MAX_SIZE
+- INFERENCE_BATCH_MAX_WAIT_MS
+"""
+import os
+import threading
+import time
+import logging
+from collections import deque
+
+from config_manager import get_config
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+
+class _PendingItem:
+    """A single queued item waiting for its batch to run"""
+
+    __slots__ = ('item', 'event', 'result', 'error')
+
+    def __init__(self, item):
+        self.item = item
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Gathers items for up to `max_batch_size` items or `max_wait_ms` milliseconds,
+    then calls `batch_fn(items)` once and hands each caller its own result.
+
+    `batch_fn` must take a list of items and return a list of results of the
+    same length and order.
+    """
+
+    def __init__(self, name, batch_fn, max_batch_size=16, max_wait_ms=10.0):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._worker = None
+        self._worker_pid = None
+
+        # Stats
+        self._batches = 0
+        self._items = 0
+        self._errors = 0
+        self._max_queue_depth = 0
+        self._max_observed_batch = 0
+        self._batch_size_histogram = {}
+
+    def submit(self, item):
+        """Queue an item and block until its result is available"""
+        pending = _PendingItem(item)
+
+        with self._cond:
+            self._ensure_worker()
+            self._queue.append(pending)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+            self._cond.notify()
+
+        pending.event.wait()
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _ensure_worker(self):
+        """Start the worker thread lazily (and again in a forked child)"""
+        pid = os.getpid()
+        if self._worker is not None and self._worker.is_alive() and self._worker_pid == pid:
+            return
+
+        self._worker_pid = pid
+        self._worker = threading.Thread(
+            target=self._run,
+            name=f"microbatcher-{self.name}",
+            daemon=True
+        )
+        self._worker.start()
+
+    def _run(self):
+        """Worker loop: wait for items, fill a batch, run it"""
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+
+                # First item arrived - wait up to max_wait for the batch to fill
+                deadline = time.monotonic() + self.max_wait
+                while len(self._queue) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch_size = min(len(self._queue), self.max_batch_size)
+                batch = [self._queue.popleft() for _ in range(batch_size)]
+
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        """Run batch_fn once and distribute results to waiting callers"""
+        try:
+            results = self.batch_fn([pending.item for pending in batch])
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"Batch function for '{self.name}' returned {len(results)} results for {len(batch)} items"
+                )
+            for pending, result in zip(batch, results):
+                pending.result = result
+        except Exception as e:
+            logger.error(f"Micro-batch '{self.name}' failed: {e}")
+            self._errors += 1
+            for pending in batch:
+                pending.error = e
+        finally:
+            size = len(batch)
+            self._batches += 1
+            self._items += size
+            self._max_observed_batch = max(self._max_observed_batch, size)
+            self._batch_size_histogram[size] = self._batch_size_histogram.get(size, 0) + 1
+            for pending in batch:
+                pending.event.set()
+
+    def get_stats(self):
+        """Return queue-depth and batch-size statistics"""
+        return {
+            'queue_depth': len(self._queue),
+            'max_queue_depth': self._max_queue_depth,
+            'batches': self._batches,
+            'items': self._items,
+            'errors': self._errors,
+            'avg_batch_size': round(self._items / self._batches, 2) if self._batches else 0,
+            'max_batch_size_observed': self._max_observed_batch,
+            'batch_size_histogram': dict(sorted(self._batch_size_histogram.items())),
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0
+        }
+
+
+# Global batcher registry (one batcher per model name)
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    """Drop batchers inherited from the parent process (their locks and queues belong to it)"""
+    global _batchers_lock
+    _batchers.clear()
+    _batchers_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_batcher(name, batch_fn):
+    """Get (or create) the batcher for a model using the current configuration"""
+    batcher = _batchers.get(name)
+    if batcher is not None:
+        return batcher
+
+    with _batchers_lock:
+        batcher = _batchers.get(name)
+        if batcher is None:
+            batcher = MicroBatcher(
+                name,
+                batch_fn,
+                max_batch_size=config.INFERENCE_BATCH_MAX_SIZE,
+                max_wait_ms=config.INFERENCE_BATCH_MAX_WAIT_MS
+            )
+            _batchers[name] = batcher
+            logger.info(
+                f"✓ Micro-batching enabled for '{name}' "
+                f"(max {batcher.max_batch_size} items / {batcher.max_wait * 1000:.0f}ms)"
+            )
+        return batcher
+
+
+def submit(name, batch_fn, item):
+    """
+    Run a single item through the named model's batcher
+
+    Falls back to calling batch_fn([item]) directly when batching is disabled.
+
+    Args:
+        name (str): Model name used to pick the batcher
+        batch_fn: Function taking a list of items and returning a list of results
+        item: The item to predict
+
+    Returns:
+        The result for this item
+    """
+    if not config.INFERENCE_BATCHING_ENABLED:
+        return batch_fn([item])[0]
+
+    return get_batcher(name, batch_fn).submit(item)
+
+
+def get_batching_stats():
+    """Get statistics for all active batchers"""
+    return {
+        'enabled': config.INFERENCE_BATCHING_ENABLED,
+        'batchers': {name: batcher.get_stats() for name, batcher in _batchers.items()}
+    }
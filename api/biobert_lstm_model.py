@@ -11,6 +11,11 @@ from transformers import AutoTokenizer, AutoModel
 import torch
 import logging
 
+import model_registry
+from embedding_utils import validate_embedding_mode, tokenize_for_embedding, pool_embeddings
+from lstm_head import load_lstm_head
+from onnx_backend import load_onnx_encoder
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,7 +23,14 @@ logger = logging.getLogger(__name__)
 class MentalBERTLSTMModel:
     def __init__(self, lstm_model_path="../mentalbert_lstm_model.keras",
                  mentalbert_path="../mentalbert_sentiment_model",
-                 max_length=300):
+                 max_length=300,
+                 embedding_mode="padded",
+                 lstm_head_npz_path=None,
+                 lstm_head_backend="auto",
+                 encoder_backend="pytorch",
+                 onnx_model_dir=None,
+                 onnx_quantized=False,
+                 use_registry=False):
         """
         Initialize MentalBERT-LSTM model exactly as per user's implementation
 
@@ -26,13 +38,29 @@ class MentalBERTLSTMModel:
             lstm_model_path: Path to the trained LSTM model (.keras file)
             mentalbert_path: Path to the fine-tuned MentalBERT model
             max_length: Maximum sequence length (300 as per user's code)
+            embedding_mode: "padded" (pad to max_length, plain mean - matches the
+                trained LSTM head) or "dynamic" (pad to longest, masked mean)
+            lstm_head_npz_path: Path to the NumPy export of the LSTM head (optional)
+            lstm_head_backend: "auto", "numpy" or "keras"
+            encoder_backend: "pytorch" or "onnx" (MentalBERT runtime)
+            onnx_model_dir: Directory holding the exported ONNX models
+            onnx_quantized: Use the INT8 ONNX export
+            use_registry: Take MentalBERT and the LSTM head from the shared
+                model registry instead of loading another copy
         """
         self.max_length = max_length
+        self.embedding_mode = validate_embedding_mode(embedding_mode)
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
         # Use absolute paths directly as provided by user
         self.lstm_model_path = lstm_model_path
         self.mentalbert_path = mentalbert_path
+        self.lstm_head_npz_path = lstm_head_npz_path
+        self.lstm_head_backend = (lstm_head_backend or "auto").lower()
+        self.encoder_backend = (encoder_backend or "pytorch").lower()
+        self.onnx_model_dir = onnx_model_dir
+        self.onnx_quantized = onnx_quantized
+        self.use_registry = use_registry
 
         # Initialize model components
         self.mentalbert_model = None
@@ -46,12 +74,24 @@ class MentalBERTLSTMModel:
 
     def _load_mentalbert(self):
         """Load MentalBERT model and tokenizer - user's fine-tuned model"""
+        if self.use_registry:
+            shared = model_registry.get_model('mentalbert')
+            if shared is not None:
+                # Shared encoder lives on CPU
+                self.mentalbert_tokenizer, self.mentalbert_model = shared
+                self.device = torch.device("cpu")
+                logger.info("MentalBERT model taken from the shared model registry")
+                return True
+
         try:
             logger.info(f"Loading MentalBERT model from: {self.mentalbert_path}")
 
             # Load the fine-tuned MentalBERT model as per user's code
             self.mentalbert_tokenizer = AutoTokenizer.from_pretrained(self.mentalbert_path, local_files_only=True)
-            self.mentalbert_model = AutoModel.from_pretrained(self.mentalbert_path, local_files_only=True)
+            if self.encoder_backend == 'onnx':
+                self.mentalbert_model = load_onnx_encoder('mentalbert', self.onnx_model_dir, self.onnx_quantized)
+            else:
+                self.mentalbert_model = AutoModel.from_pretrained(self.mentalbert_path, local_files_only=True)
             self.mentalbert_model.to(self.device)
             self.mentalbert_model.eval()
 
@@ -78,7 +118,20 @@ class MentalBERTLSTMModel:
 
     def _load_lstm_model(self):
         """Load the trained LSTM model - user's specific model"""
+        if self.use_registry:
+            shared = model_registry.get_model('lstm_head')
+            if shared is not None:
+                self.lstm_model = shared
+                logger.info("LSTM model taken from the shared model registry")
+                return True
+
         try:
+            if self.lstm_head_backend != 'keras' and self.lstm_head_npz_path and os.path.exists(self.lstm_head_npz_path):
+                # NumPy engine - no TensorFlow import needed
+                self.lstm_model = load_lstm_head(self.lstm_model_path, self.lstm_head_npz_path, self.lstm_head_backend)
+                logger.info("LSTM model loaded successfully (NumPy engine)")
+                return True
+
             import tensorflow as tf
             if os.path.exists(self.lstm_model_path):
                 logger.info(f"Loading LSTM model from: {self.lstm_model_path}")
@@ -113,13 +166,12 @@ class MentalBERTLSTMModel:
             # Set model to evaluation mode
             self.mentalbert_model.eval()
 
-            # Tokenize exactly as per user's code
-            inputs = self.mentalbert_tokenizer(
-                text,
-                padding="max_length",
-                truncation=True,
-                max_length=self.max_length,  # 300 as per user's code
-                return_tensors="pt"
+            # Tokenize as per user's code ("padded") or to the text's own length ("dynamic")
+            inputs = tokenize_for_embedding(
+                self.mentalbert_tokenizer,
+                [text],
+                self.embedding_mode,
+                max_length=self.max_length  # 300 as per user's code
             )
 
             # Move inputs to device
@@ -128,8 +180,8 @@ class MentalBERTLSTMModel:
             # Get embeddings with no gradient computation
             with torch.no_grad():
                 output = self.mentalbert_model(**inputs)
-                # Mean pooling as per user's implementation
-                embedding = output.last_hidden_state.mean(dim=1)
+                # Mean pooling as per user's implementation (masked in dynamic mode)
+                embedding = pool_embeddings(output.last_hidden_state, inputs['attention_mask'], self.embedding_mode)
 
             # Convert to numpy and return
             return embedding.cpu().numpy()
@@ -333,7 +385,19 @@ def load_biobert_lstm_model():
     try:
         if mentalbert_lstm_instance is None:
             logger.info("Initializing MentalBERT-LSTM model...")
-            mentalbert_lstm_instance = MentalBERTLSTMModel()
+            from config_manager import get_config
+            config = get_config()
+            mentalbert_lstm_instance = MentalBERTLSTMModel(
+                lstm_model_path=config.LSTM_MODEL_PATH,
+                mentalbert_path=config.MENTALBERT_MODEL_PATH,
+                embedding_mode=config.MENTALBERT_EMBEDDING_MODE,
+                lstm_head_npz_path=config.LSTM_HEAD_NPZ_PATH,
+                lstm_head_backend=config.LSTM_HEAD_BACKEND,
+                encoder_backend=config.ENCODER_BACKEND,
+                onnx_model_dir=config.ONNX_MODEL_DIR,
+                onnx_quantized=config.ONNX_QUANTIZED,
+                use_registry=True
+            )
 
             if mentalbert_lstm_instance.is_loaded():
                 logger.info("MentalBERT-LSTM model loaded successfully!")
@@ -12,6 +12,13 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def api_path(path):
+    """Resolve a path relative to api/ (absolute paths are kept), whatever the working directory"""
+    return os.path.normpath(os.path.join(API_DIR, path)) if path else path
+
 
 class BaseConfig:
     """Base configuration shared across all environments"""
@@ -30,6 +37,17 @@ class BaseConfig:
     USERS_DATABASE_PATH = os.getenv('USERS_DATABASE_PATH', './api/users_database.json')
     JOURNAL_DATABASE_PATH = os.getenv('JOURNAL_DATABASE_PATH', './data/journal.db')
 
+    # SQLite connections (api/db_connections.py): one persistent WAL connection per thread
+    DB_SYNCHRONOUS = os.getenv('DB_SYNCHRONOUS', 'NORMAL')  # NORMAL is durable in WAL mode except on power loss
+    DB_CACHE_SIZE_KB = int(os.getenv('DB_CACHE_SIZE_KB', '16384'))  # Page cache per connection
+    DB_MMAP_SIZE_MB = int(os.getenv('DB_MMAP_SIZE_MB', '128'))
+    DB_BUSY_TIMEOUT_MS = int(os.getenv('DB_BUSY_TIMEOUT_MS', '5000'))  # Wait for a locked database instead of failing
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', '256'))  # Prepared statements per connection
+
+    # Journal entry listing (GET /api/journal/entries): keyset-paginated pages
+    JOURNAL_PAGE_SIZE = int(os.getenv('JOURNAL_PAGE_SIZE', '50'))
+    JOURNAL_MAX_PAGE_SIZE = int(os.getenv('JOURNAL_MAX_PAGE_SIZE', '200'))
+
     # API
     API_HOST = os.getenv('API_HOST', '0.0.0.0')
     API_PORT = int(os.getenv('API_PORT', '5001'))
@@ -48,10 +66,90 @@ class BaseConfig:
     MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', '10485760'))  # 10MB
     MAX_CSV_ROWS = int(os.getenv('MAX_CSV_ROWS', '1000'))
 
-    # ML Models
-    ROBERTA_MODEL_PATH = os.getenv('ROBERTA_MODEL_PATH', '../Fine_tuned_RoBERTa/roberta_sentiment_model')
-    ROBERTA_TOKENIZER_PATH = os.getenv('ROBERTA_TOKENIZER_PATH', '../Fine_tuned_RoBERTa/roberta_tokenizer')
-    LSTM_MODEL_PATH = os.getenv('LSTM_MODEL_PATH', '../mentalbert_lstm_model.keras')
+    # ML Models (relative paths are relative to api/)
+    ROBERTA_MODEL_PATH = api_path(os.getenv('ROBERTA_MODEL_PATH', '../Fine_tuned_RoBERTa/roberta_sentiment_model'))
+    ROBERTA_TOKENIZER_PATH = api_path(os.getenv('ROBERTA_TOKENIZER_PATH', '../Fine_tuned_RoBERTa/roberta_tokenizer'))
+    LSTM_MODEL_PATH = api_path(os.getenv('LSTM_MODEL_PATH', '../mentalbert_lstm_model.keras'))
+    LSTM_HEAD_NPZ_PATH = api_path(os.getenv('LSTM_HEAD_NPZ_PATH', '../mentalbert_lstm_head.npz'))
+    LSTM_HEAD_BACKEND = os.getenv('LSTM_HEAD_BACKEND', 'auto')  # auto, numpy or keras
+    MENTALBERT_MODEL_PATH = api_path(os.getenv('MENTALBERT_MODEL_PATH', '../mentalbert_sentiment_model'))
+    # Memory-map model.safetensors (api/convert_safetensors.py) so workers share the weights via the page cache
+    MODEL_WEIGHTS_MMAP = os.getenv('MODEL_WEIGHTS_MMAP', 'True').lower() == 'true'
+
+    # Encoder runtime: 'pytorch' or 'onnx' (export with api/export_onnx.py)
+    ENCODER_BACKEND = os.getenv('ENCODER_BACKEND', 'pytorch')
+    ONNX_MODEL_DIR = api_path(os.getenv('ONNX_MODEL_DIR', '../onnx_models'))
+    ONNX_QUANTIZED = os.getenv('ONNX_QUANTIZED', 'False').lower() == 'true'
+    # PyTorch encoder precision on CPU (api/precision.py): 'fp32', 'bf16' (autocast) or 'int8' (dynamic quantization)
+    ENCODER_PRECISION = os.getenv('ENCODER_PRECISION', 'fp32')
+    # Compare against fp32 on load and keep fp32 if the reduced precision drifts too far
+    PRECISION_PARITY_CHECK = os.getenv('PRECISION_PARITY_CHECK', 'True').lower() == 'true'
+    PRECISION_MAX_PROB_ERROR = float(os.getenv('PRECISION_MAX_PROB_ERROR', '0.05'))  # RoBERTa probabilities
+    PRECISION_MIN_COSINE = float(os.getenv('PRECISION_MIN_COSINE', '0.99'))  # MentalBERT embeddings
+
+    # Inference Micro-Batching
+    INFERENCE_BATCHING_ENABLED = os.getenv('INFERENCE_BATCHING_ENABLED', 'True').lower() == 'true'
+    INFERENCE_BATCH_MAX_SIZE = int(os.getenv('INFERENCE_BATCH_MAX_SIZE', '16'))
+    INFERENCE_BATCH_MAX_WAIT_MS = float(os.getenv('INFERENCE_BATCH_MAX_WAIT_MS', '10'))
+    CSV_INFERENCE_CHUNK_SIZE = int(os.getenv('CSV_INFERENCE_CHUNK_SIZE', '32'))
+
+    # /api/predict/batch: texts per request, and the rate limit in model predictions
+    # (a batch of N texts costs N, or 2N with model=both or cascade)
+    PREDICT_BATCH_MAX_ITEMS = int(os.getenv('PREDICT_BATCH_MAX_ITEMS', '100'))
+    PREDICT_BATCH_RATE_LIMIT = os.getenv('PREDICT_BATCH_RATE_LIMIT', '300 per minute')
+
+    # Dual-model paths (/api/predict/both, CSV) run RoBERTa and LSTM concurrently
+    DUAL_MODEL_CONCURRENCY = os.getenv('DUAL_MODEL_CONCURRENCY', 'True').lower() == 'true'
+    MODEL_EXECUTOR_WORKERS = int(os.getenv('MODEL_EXECUTOR_WORKERS', '4'))
+    # 'both' always runs both models; 'cascade' runs the first model and the second only when needed
+    DUAL_MODEL_MODE = os.getenv('DUAL_MODEL_MODE', 'both')
+    CASCADE_FIRST_MODEL = os.getenv('CASCADE_FIRST_MODEL', 'roberta')  # roberta or lstm
+    CASCADE_CONFIDENCE_THRESHOLD = float(os.getenv('CASCADE_CONFIDENCE_THRESHOLD', '0.85'))
+    CASCADE_MIN_MARGIN = float(os.getenv('CASCADE_MIN_MARGIN', '0.2'))  # Top-two score gap below this = ambiguous
+    CASCADE_MAX_WORDS = int(os.getenv('CASCADE_MAX_WORDS', '200'))  # Longer texts always get both models
+
+    # Thread budget (api/thread_budget.py): split cores across workers and runtimes
+    THREAD_BUDGET_ENABLED = os.getenv('THREAD_BUDGET_ENABLED', 'True').lower() == 'true'
+    MODEL_INTRA_OP_THREADS = int(os.getenv('MODEL_INTRA_OP_THREADS', '0'))  # 0 = auto (cores per worker, halved when concurrent)
+    MODEL_INTEROP_THREADS = int(os.getenv('MODEL_INTEROP_THREADS', '1'))
+    THREAD_AFFINITY = os.getenv('THREAD_AFFINITY', 'False').lower() == 'true'  # Pin each worker to its own cores
+
+    # Gunicorn (api/gunicorn.conf.py)
+    GUNICORN_WORKERS = int(os.getenv('GUNICORN_WORKERS', '4'))
+    GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', '2'))
+    GUNICORN_TIMEOUT = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+    # Load all models in the gunicorn master before forking so workers share the weights
+    MODEL_PRELOAD = os.getenv('MODEL_PRELOAD', 'False').lower() == 'true'
+
+    # False = no-ML process: auth, journal reads and tests only, never imports torch/TF
+    # (predictions still work when INFERENCE_SERVER_ADDRESS points to a model server)
+    ML_ENABLED = os.getenv('ML_ENABLED', 'True').lower() == 'true'
+
+    # Standalone model server (api/model_server.py): unix:/path.sock or tcp:host:port, empty = in-process
+    INFERENCE_SERVER_ADDRESS = os.getenv('INFERENCE_SERVER_ADDRESS', '')
+    INFERENCE_SERVER_TIMEOUT = float(os.getenv('INFERENCE_SERVER_TIMEOUT', '30'))
+
+    # Warmup before serving (api/warmup.py); /api/ready reports when it is done
+    MODEL_WARMUP_ENABLED = os.getenv('MODEL_WARMUP_ENABLED', 'True').lower() == 'true'
+    MODEL_WARMUP_LENGTHS = [int(n) for n in os.getenv('MODEL_WARMUP_LENGTHS', '8,64,256').split(',')]  # Words per synthetic text
+    MODEL_WARMUP_ROUNDS = int(os.getenv('MODEL_WARMUP_ROUNDS', '2'))
+
+    # MentalBERT embeddings: 'padded' (matches the trained LSTM head) or 'dynamic'
+    # (pad to longest in batch + attention-mask mean pooling)
+    MENTALBERT_EMBEDDING_MODE = os.getenv('MENTALBERT_EMBEDDING_MODE', 'padded')
+
+    # Tokenization (api/tokenization.py): fast Rust tokenizers, token-id LRU and
+    # background tokenization of the next CSV/batch chunk
+    TOKENIZER_USE_FAST = os.getenv('TOKENIZER_USE_FAST', 'True').lower() == 'true'
+    TOKENIZER_CACHE_SIZE = int(os.getenv('TOKENIZER_CACHE_SIZE', '4096'))  # Cached texts (all tokenizers), 0 = off
+    TOKENIZER_PREFETCH = os.getenv('TOKENIZER_PREFETCH', 'True').lower() == 'true'
+
+    # Long texts (api/long_text.py): 'window' covers the whole text with overlapping
+    # encoder windows in one batched pass, 'truncate' keeps only the first 512/300 tokens
+    LONG_TEXT_MODE = os.getenv('LONG_TEXT_MODE', 'window')
+    LONG_TEXT_STRIDE = int(os.getenv('LONG_TEXT_STRIDE', '64'))  # Tokens shared by consecutive windows
+    LONG_TEXT_MAX_WINDOWS = int(os.getenv('LONG_TEXT_MAX_WINDOWS', '8'))  # Per text
+    LONG_TEXT_AGGREGATION = os.getenv('LONG_TEXT_AGGREGATION', 'weighted')  # weighted (by window tokens) or mean
 
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -68,6 +166,14 @@ class BaseConfig:
     CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', 'moodtracker_')
     CACHE_REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 
+    # Prediction cache (in-process LRU in front of Redis)
+    PREDICTION_CACHE_ENABLED = os.getenv('PREDICTION_CACHE_ENABLED', 'True').lower() == 'true'
+    PREDICTION_CACHE_TTL = int(os.getenv('PREDICTION_CACHE_TTL', '86400'))  # 24 hours
+    PREDICTION_CACHE_LOCAL_SIZE = int(os.getenv('PREDICTION_CACHE_LOCAL_SIZE', '2048'))
+    PREDICTION_CACHE_VERSION = os.getenv('PREDICTION_CACHE_VERSION', '1')  # Bump to invalidate all entries
+    # Concurrent identical predictions share one model call (api/single_flight.py)
+    SINGLE_FLIGHT_ENABLED = os.getenv('SINGLE_FLIGHT_ENABLED', 'True').lower() == 'true'
+
     # Security Headers
     ENABLE_SECURITY_HEADERS = os.getenv('ENABLE_SECURITY_HEADERS', 'True').lower() == 'true'
 
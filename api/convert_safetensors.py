@@ -0,0 +1,70 @@
+"""
+Safetensors Conversion Script
+Converts the fine-tuned RoBERTa and MentalBERT model directories to
+safetensors (one-time), so workers can memory-map the weights instead of
+loading a private copy each (see model_weights.py)
+
+Usage:
+    python convert_safetensors.py [--remove-bin] [roberta|mentalbert ...]
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config_manager import get_config
+from model_weights import convert_model_dir
+
+MODELS = ('roberta', 'mentalbert')
+
+
+def main(names, remove_legacy):
+    """Convert each model directory and verify the converted weights"""
+    from transformers import AutoModel, RobertaForSequenceClassification
+
+    config = get_config()
+    model_dirs = {
+        'roberta': (RobertaForSequenceClassification, config.ROBERTA_MODEL_PATH),
+        'mentalbert': (AutoModel, config.MENTALBERT_MODEL_PATH),
+    }
+
+    print("=" * 60)
+    print("SAFETENSORS CONVERSION")
+    print("=" * 60)
+
+    for step, name in enumerate(names, start=1):
+        model_class, model_dir = model_dirs[name]
+
+        print(f"\n[{step}/{len(names)}] {name}: {model_dir}")
+        report = convert_model_dir(model_class, model_dir, remove_legacy)
+        print(f"  [OK] Written: {report['path']} ({report['size_mb']:.1f} MB)")
+        print(f"  [OK] Verified {report['tensors']} tensors against the original weights")
+        if remove_legacy:
+            print("  [OK] Removed pytorch_model.bin")
+
+    print("\n" + "=" * 60)
+    print("CONVERSION COMPLETE!")
+    print("=" * 60)
+    print("\nWorkers now memory-map the weights (MODEL_WEIGHTS_MMAP=True).")
+    return True
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    remove_legacy = '--remove-bin' in args
+    names = [arg for arg in args if not arg.startswith('--')] or list(MODELS)
+
+    unknown = [name for name in names if name not in MODELS]
+    if unknown:
+        print(f"Unknown model(s): {', '.join(unknown)}. Expected: {', '.join(MODELS)}")
+        sys.exit(1)
+
+    try:
+        success = main(names, remove_legacy)
+        sys.exit(0 if success else 1)
+    except Exception as e:
+        print(f"\n[FATAL ERROR]: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
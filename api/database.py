@@ -1,17 +1,46 @@
-import sqlite3
 import json
+import base64
 from datetime import datetime, timedelta
 import os
+import threading
+
+from db_connections import ConnectionManager
+
+# Days of per-day entry counts kept in user_rollups.recent_days ("this week")
+RECENT_DAYS = 7
+
+DEFAULT_DB_PATH = "mood_tracking.db"  # Relative to the working directory
+
+# Journal entry fields -> column; JSON columns are decoded only if requested
+ENTRY_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'sentiment': 'sentiment',
+    'confidence': 'confidence',
+    'mood_score': 'mood_score',
+    'scores': 'scores',
+    'tags': 'tags',
+    'analysis': 'analysis',
+    'date': 'date',
+    'created_at': 'created_at'
+}
+JSON_FIELDS = {'scores': dict, 'tags': list, 'analysis': dict}  # field -> empty value
+
 
 class MoodTrackingDB:
-    def __init__(self, db_path="mood_tracking.db"):
+    def __init__(self, db_path=DEFAULT_DB_PATH):
         self.db_path = db_path
+        # Persistent per-thread connections (WAL, tuned pragmas, statement cache)
+        self._connections = ConnectionManager(db_path)
         self.init_database()
 
     def init_database(self):
         """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            self._create_schema(conn.cursor())
+            conn.commit()
+
+    def _create_schema(self, cursor):
 
         # Create users table
         cursor.execute('''
@@ -38,14 +67,42 @@ class MoodTrackingDB:
                 tags TEXT, -- JSON string of tags
                 analysis TEXT, -- JSON string of AI analysis
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                date TEXT NOT NULL -- ISO date string for the entry
+                date TEXT NOT NULL, -- ISO date string for the entry
+                entry_day TEXT -- ISO day of date (YYYY-MM-DD), for per-day queries
             )
         ''')
 
+        # Add entry_day to databases created before it existed
+        cursor.execute('PRAGMA table_info(journal_entries)')
+        if 'entry_day' not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE journal_entries ADD COLUMN entry_day TEXT')
+            cursor.execute('UPDATE journal_entries SET entry_day = DATE(date)')
+
         # Create indexes for better performance
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_entries ON journal_entries(user_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_entry_date ON journal_entries(date)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_date ON journal_entries(user_id, date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_entry_day ON journal_entries(user_id, entry_day)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_created ON journal_entries(user_id, created_at, id)')
+
+        # Create user_rollups table (dashboard statistics, updated with every journal write)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_rollups'")
+        backfill_rollups = cursor.fetchone() is None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user_rollups (
+                user_id TEXT PRIMARY KEY,
+                total_entries INTEGER NOT NULL DEFAULT 0,
+                sentiment_counts TEXT NOT NULL DEFAULT '{}', -- JSON string of sentiment -> entry count
+                mood_sum REAL NOT NULL DEFAULT 0,
+                last_entry_day TEXT, -- ISO date of the latest entry
+                streak_days INTEGER NOT NULL DEFAULT 0, -- consecutive days ending at last_entry_day
+                recent_days TEXT NOT NULL DEFAULT '{}', -- JSON string of ISO date -> entry count (last RECENT_DAYS days)
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        if backfill_rollups:
+            # First start on a database that predates the table
+            self._rebuild_all_rollups(cursor)
 
         # Create psychological_tests table
         cursor.execute('''
@@ -115,279 +172,474 @@ class MoodTrackingDB:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_test_results ON user_test_results(user_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_test_completed_at ON user_test_results(completed_at)')
 
-        conn.commit()
-        conn.close()
+    def connection(self):
+        """
+        Context manager yielding this thread's persistent connection
+
+        Writes commit explicitly; an exception rolls back the open transaction.
+        """
+        return self._connections.connection()
 
     def get_connection(self):
-        """Get a database connection"""
-        return sqlite3.connect(self.db_path)
+        """Open a separate connection with the same pragmas (the caller closes it)"""
+        return self._connections.open()
+
+    def get_connection_stats(self):
+        """Connection reuse and pragmas of this process, for /api/health"""
+        return self._connections.get_stats()
 
     def create_user(self, user_id, email=None, name=None):
         """Create or update a user"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            self._upsert_user(conn.cursor(), user_id, email, name)
+            conn.commit()
 
+    def _upsert_user(self, cursor, user_id, email=None, name=None):
         cursor.execute('''
             INSERT OR REPLACE INTO users (user_id, email, name, last_login)
             VALUES (?, ?, ?, CURRENT_TIMESTAMP)
         ''', (user_id, email, name))
 
-        conn.commit()
-        conn.close()
-
     def create_journal_entry(self, user_id, text, sentiment, confidence, mood_score, scores, tags, analysis):
         """Create a new journal entry"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        # Ensure user exists
-        self.create_user(user_id)
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        entry_date = datetime.now().isoformat()
+            # Ensure user exists (same transaction as the entry)
+            self._upsert_user(cursor, user_id)
 
-        cursor.execute('''
-            INSERT INTO journal_entries
-            (user_id, text, sentiment, confidence, mood_score, scores, tags, analysis, date)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            user_id,
-            text,
-            sentiment,
-            confidence,
-            mood_score,
-            json.dumps(scores),
-            json.dumps(tags),
-            json.dumps(analysis),
-            entry_date
-        ))
+            entry_date = datetime.now().isoformat()
 
-        entry_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+            cursor.execute('''
+                INSERT INTO journal_entries
+                (user_id, text, sentiment, confidence, mood_score, scores, tags, analysis, date, entry_day)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                user_id,
+                text,
+                sentiment,
+                confidence,
+                mood_score,
+                json.dumps(scores),
+                json.dumps(tags),
+                json.dumps(analysis),
+                entry_date,
+                entry_date[:10]
+            ))
+
+            entry_id = cursor.lastrowid
+            self._add_to_rollup(cursor, user_id, sentiment, mood_score, entry_date[:10])
+            conn.commit()
 
         return entry_id
 
     def get_journal_entries(self, user_id, limit=None, offset=0):
         """Get journal entries for a user"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        query = '''
-            SELECT id, text, sentiment, confidence, mood_score, scores, tags, analysis, date, created_at
+            query = '''
+                SELECT id, text, sentiment, confidence, mood_score, scores, tags, analysis, date, created_at
+                FROM journal_entries
+                WHERE user_id = ?
+                ORDER BY created_at DESC, id DESC
+            '''
+
+            params = [user_id]
+
+            if limit:
+                query += ' LIMIT ? OFFSET ?'
+                params.extend([limit, offset])
+
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+        return [self._entry_from_row(user_id, list(ENTRY_FIELDS), row) for row in rows]
+
+    def list_journal_entries(self, user_id, limit=50, cursor=None, fields=None):
+        """
+        One page of a user's journal entries, newest first
+
+        Keyset pagination on (created_at, id): every page is one range scan
+        on idx_user_created, however far back it starts.
+
+        Args:
+            user_id (str): User ID
+            limit (int): Entries per page
+            cursor (str): next_cursor of the previous page (None for the first page)
+            fields (list): Entry fields to return (default: all); JSON fields
+                are only selected and decoded if listed here
+
+        Returns:
+            (entries, next_cursor) - next_cursor is None on the last page
+
+        Raises:
+            ValueError: Unknown field or invalid cursor
+        """
+        fields = list(ENTRY_FIELDS) if not fields else ['id'] + [field for field in fields if field != 'id']
+        unknown = [field for field in fields if field not in ENTRY_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+        # created_at is always read for the cursor
+        columns = [ENTRY_FIELDS[field] for field in fields] + ['created_at']
+        query = f'''
+            SELECT {', '.join(columns)}
             FROM journal_entries
             WHERE user_id = ?
-            ORDER BY created_at DESC
         '''
-
         params = [user_id]
 
-        if limit:
-            query += ' LIMIT ? OFFSET ?'
-            params.extend([limit, offset])
-
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-
-        entries = []
-        for row in rows:
-            entry = {
-                'id': row[0],
-                'user_id': user_id,
-                'text': row[1],
-                'sentiment': row[2],
-                'confidence': row[3],
-                'mood_score': row[4],
-                'scores': json.loads(row[5]) if row[5] else {},
-                'tags': json.loads(row[6]) if row[6] else [],
-                'analysis': json.loads(row[7]) if row[7] else {},
-                'date': row[8],
-                'created_at': row[9]
-            }
-            entries.append(entry)
-
-        conn.close()
-        return entries
+        if cursor:
+            created_at, entry_id = self._decode_cursor(cursor)
+            query += ' AND (created_at, id) < (?, ?)'
+            params.extend([created_at, entry_id])
+
+        # One extra row tells whether there is a next page
+        query += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+        params.append(limit + 1)
+
+        with self.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1][-1], rows[-1][0])
+
+        return [self._entry_from_row(user_id, fields, row) for row in rows], next_cursor
+
+    def _entry_from_row(self, user_id, fields, row):
+        entry = {'user_id': user_id}
+        for field, value in zip(fields, row):
+            if field in JSON_FIELDS:
+                value = json.loads(value) if value else JSON_FIELDS[field]()
+            entry[field] = value
+        return entry
+
+    def _encode_cursor(self, created_at, entry_id):
+        return base64.urlsafe_b64encode(json.dumps([created_at, entry_id]).encode('utf-8')).decode('ascii')
+
+    def _decode_cursor(self, cursor):
+        try:
+            created_at, entry_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (ValueError, TypeError, UnicodeError):
+            raise ValueError("Invalid cursor")
+        if not isinstance(created_at, str) or not isinstance(entry_id, int):
+            raise ValueError("Invalid cursor")
+        return created_at, entry_id
 
     def delete_journal_entry(self, user_id, entry_id):
         """Delete a journal entry"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            DELETE FROM journal_entries
-            WHERE id = ? AND user_id = ?
-        ''', (entry_id, user_id))
+            cursor.execute('''
+                DELETE FROM journal_entries
+                WHERE id = ? AND user_id = ?
+            ''', (entry_id, user_id))
 
-        deleted_count = cursor.rowcount
-        conn.commit()
-        conn.close()
+            deleted_count = cursor.rowcount
+            if deleted_count:
+                self._rebuild_rollup(cursor, user_id)
+            conn.commit()
 
         return deleted_count > 0
 
     def get_user_stats(self, user_id):
-        """Get statistics for a user"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        # Total entries
-        cursor.execute('SELECT COUNT(*) FROM journal_entries WHERE user_id = ?', (user_id,))
-        total_entries = cursor.fetchone()[0]
+        """
+        Get statistics for a user (one primary-key lookup on user_rollups)
 
-        # Sentiment distribution
-        cursor.execute('''
-            SELECT sentiment, COUNT(*)
-            FROM journal_entries
-            WHERE user_id = ?
-            GROUP BY sentiment
-        ''', (user_id,))
-        sentiment_counts = dict(cursor.fetchall())
+        entries_this_week counts the last RECENT_DAYS calendar days, today
+        included, rather than a rolling 7x24h window
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        # Average mood score
-        cursor.execute('''
-            SELECT AVG(mood_score)
-            FROM journal_entries
-            WHERE user_id = ?
-        ''', (user_id,))
-        avg_mood = cursor.fetchone()[0] or 0
+            cursor.execute('''
+                SELECT total_entries, sentiment_counts, mood_sum, last_entry_day, streak_days, recent_days
+                FROM user_rollups
+                WHERE user_id = ?
+            ''', (user_id,))
+            row = cursor.fetchone()
 
-        # Entries this week
-        week_ago = (datetime.now() - timedelta(days=7)).isoformat()
-        cursor.execute('''
-            SELECT COUNT(*)
-            FROM journal_entries
-            WHERE user_id = ? AND date >= ?
-        ''', (user_id, week_ago))
-        entries_this_week = cursor.fetchone()[0]
+        if row is None:
+            return {
+                'total_entries': 0,
+                'sentiment_distribution': {},
+                'average_mood': 0,
+                'entries_this_week': 0,
+                'streak': 0
+            }
 
-        # Calculate streak
-        streak = self.calculate_streak(user_id)
+        total_entries, sentiment_counts, mood_sum, last_entry_day, streak_days, recent_days = row
+        today = datetime.now().date()
 
-        conn.close()
+        # Entries in the last RECENT_DAYS days, today included
+        week_start = (today - timedelta(days=RECENT_DAYS - 1)).isoformat()
+        entries_this_week = sum(count for day, count in json.loads(recent_days).items() if day >= week_start)
 
         return {
             'total_entries': total_entries,
-            'sentiment_distribution': sentiment_counts,
-            'average_mood': round(avg_mood, 1),
+            'sentiment_distribution': json.loads(sentiment_counts),
+            'average_mood': round(mood_sum / total_entries, 1) if total_entries else 0,
             'entries_this_week': entries_this_week,
-            'streak': streak
+            'streak': self._running_streak(last_entry_day, streak_days)
         }
 
     def calculate_streak(self, user_id):
         """Calculate consecutive days with journal entries"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            last_day, streak_days = self._streak_ending_by(conn.cursor(), user_id, datetime.now().date().isoformat())
 
-        # Get all unique dates with entries
-        cursor.execute('''
-            SELECT DISTINCT DATE(date) as entry_date
-            FROM journal_entries
-            WHERE user_id = ?
-            ORDER BY entry_date DESC
-        ''', (user_id,))
+        return self._running_streak(last_day, streak_days)
 
-        entry_dates = [row[0] for row in cursor.fetchall()]
-        conn.close()
+    def _streak_ending_by(self, cursor, user_id, until_day):
+        """
+        Latest entry day up to until_day and the number of consecutive days
+        ending on it
 
-        if not entry_dates:
+        Gaps and islands: numbering the distinct days newest first, day +
+        row number is the same for every day of one consecutive run.
+        """
+        cursor.execute('''
+            WITH islands AS (
+                SELECT entry_day,
+                       julianday(entry_day) + ROW_NUMBER() OVER (ORDER BY entry_day DESC) AS island
+                FROM (
+                    SELECT DISTINCT entry_day
+                    FROM journal_entries
+                    WHERE user_id = ? AND entry_day <= ?
+                )
+            )
+            SELECT MAX(entry_day), COUNT(*)
+            FROM islands
+            WHERE island = (SELECT island FROM islands ORDER BY entry_day DESC LIMIT 1)
+        ''', (user_id, until_day))
+        return cursor.fetchone()
+
+    def _running_streak(self, last_day, streak_days):
+        # A streak is still running if its last day is today or yesterday
+        yesterday = (datetime.now().date() - timedelta(days=1)).isoformat()
+        if last_day is None or last_day < yesterday:
             return 0
+        return streak_days
 
-        streak = 0
-        current_date = datetime.now().date()
-
-        # Check for consecutive days going backwards
-        for i in range(30):  # Check up to 30 days
-            check_date = current_date - timedelta(days=i)
-            check_date_str = check_date.isoformat()
+    def get_average_sentiment_score(self, user_id):
+        """
+        Average sentiment of a user's entries on a 0-1 scale (Negative 0,
+        Neutral 0.5, Positive 1), or None without entries
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-            if check_date_str in entry_dates:
-                streak += 1
-            elif i > 0:  # Don't break on first day if no entry
-                break
+            cursor.execute('''
+                SELECT AVG(CASE sentiment WHEN 'Positive' THEN 1.0 WHEN 'Negative' THEN 0.0 ELSE 0.5 END)
+                FROM journal_entries
+                WHERE user_id = ?
+            ''', (user_id,))
+            average = cursor.fetchone()[0]
 
-        return streak
+        return round(average, 3) if average is not None else None
 
     def get_weekly_mood_trend(self, user_id, days=7):
-        """Get mood trend for the last N days"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        """Get mood trend for the last N days (one range scan on idx_user_entry_day)"""
+        today = datetime.now().date()
+        first_day = (today - timedelta(days=days - 1)).isoformat()
 
-        trend_data = []
-
-        for i in range(days):
-            date = datetime.now().date() - timedelta(days=days-1-i)
-            date_str = date.isoformat()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
             cursor.execute('''
-                SELECT AVG(mood_score)
+                SELECT entry_day, AVG(mood_score)
                 FROM journal_entries
-                WHERE user_id = ? AND DATE(date) = ?
-            ''', (user_id, date_str))
+                WHERE user_id = ? AND entry_day BETWEEN ? AND ?
+                GROUP BY entry_day
+            ''', (user_id, first_day, today.isoformat()))
+            daily_moods = dict(cursor.fetchall())
 
-            avg_mood = cursor.fetchone()[0]
+        # Days without entries are included with no average
+        trend_data = []
+        for i in range(days):
+            date_str = (today - timedelta(days=days - 1 - i)).isoformat()
+            avg_mood = daily_moods.get(date_str)
 
             trend_data.append({
                 'date': date_str,
                 'average_mood': round(avg_mood, 1) if avg_mood else None
             })
 
-        conn.close()
         return trend_data
 
     def get_time_patterns(self, user_id):
         """Get patterns by time of day"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
+            cursor.execute('''
+                SELECT
+                    CASE
+                        WHEN CAST(strftime('%H', date) AS INTEGER) < 12 THEN 'morning'
+                        WHEN CAST(strftime('%H', date) AS INTEGER) < 18 THEN 'afternoon'
+                        ELSE 'evening'
+                    END as time_period,
+                    AVG(mood_score) as avg_mood,
+                    COUNT(*) as entry_count,
+                    sentiment
+                FROM journal_entries
+                WHERE user_id = ?
+                GROUP BY time_period, sentiment
+            ''', (user_id,))
+
+            patterns = {}
+            for row in cursor.fetchall():
+                period = row[0]
+                if period not in patterns:
+                    patterns[period] = {
+                        'average_mood': 0,
+                        'entry_count': 0,
+                        'sentiment_counts': {}
+                    }
+
+                patterns[period]['sentiment_counts'][row[3]] = row[2]
+
+            # Calculate overall averages per period
+            cursor.execute('''
+                SELECT
+                    CASE
+                        WHEN CAST(strftime('%H', date) AS INTEGER) < 12 THEN 'morning'
+                        WHEN CAST(strftime('%H', date) AS INTEGER) < 18 THEN 'afternoon'
+                        ELSE 'evening'
+                    END as time_period,
+                    AVG(mood_score) as avg_mood,
+                    COUNT(*) as entry_count
+                FROM journal_entries
+                WHERE user_id = ?
+                GROUP BY time_period
+            ''', (user_id,))
+
+            for row in cursor.fetchall():
+                period = row[0]
+                if period in patterns:
+                    patterns[period]['average_mood'] = round(row[1], 1)
+                    patterns[period]['entry_count'] = row[2]
+
+        return patterns
+
+    # ============================================
+    # USER ROLLUPS
+    # ============================================
+
+    def _add_to_rollup(self, cursor, user_id, sentiment, mood_score, day):
+        """Count a new entry in the user's rollup (inside the entry's transaction)"""
         cursor.execute('''
-            SELECT
-                CASE
-                    WHEN CAST(strftime('%H', date) AS INTEGER) < 12 THEN 'morning'
-                    WHEN CAST(strftime('%H', date) AS INTEGER) < 18 THEN 'afternoon'
-                    ELSE 'evening'
-                END as time_period,
-                AVG(mood_score) as avg_mood,
-                COUNT(*) as entry_count,
-                sentiment
-            FROM journal_entries
+            SELECT total_entries, sentiment_counts, mood_sum, last_entry_day, streak_days, recent_days
+            FROM user_rollups
             WHERE user_id = ?
-            GROUP BY time_period, sentiment
         ''', (user_id,))
+        row = cursor.fetchone()
+
+        if row is None:
+            total_entries, sentiment_counts, mood_sum, last_entry_day, streak_days, recent_days = 0, '{}', 0, None, 0, '{}'
+        else:
+            total_entries, sentiment_counts, mood_sum, last_entry_day, streak_days, recent_days = row
+            if day < last_entry_day:
+                # Entry dated before the latest one (clock change): recount
+                self._rebuild_rollup(cursor, user_id)
+                return
+
+        sentiment_counts = json.loads(sentiment_counts)
+        sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
+
+        if day != last_entry_day:
+            previous_day = (datetime.fromisoformat(day) - timedelta(days=1)).date().isoformat()
+            streak_days = streak_days + 1 if last_entry_day == previous_day else 1
 
-        patterns = {}
-        for row in cursor.fetchall():
-            period = row[0]
-            if period not in patterns:
-                patterns[period] = {
-                    'average_mood': 0,
-                    'entry_count': 0,
-                    'sentiment_counts': {}
-                }
+        cutoff = (datetime.fromisoformat(day) - timedelta(days=RECENT_DAYS - 1)).date().isoformat()
+        recent_days = {d: count for d, count in json.loads(recent_days).items() if d >= cutoff}
+        recent_days[day] = recent_days.get(day, 0) + 1
 
-            patterns[period]['sentiment_counts'][row[3]] = row[2]
+        self._write_rollup(cursor, user_id, total_entries + 1, sentiment_counts, mood_sum + mood_score,
+                           day, streak_days, recent_days)
 
-        # Calculate overall averages per period
+    def _rebuild_rollup(self, cursor, user_id):
+        """Recount a user's rollup from journal_entries (after deletes, backfill)"""
         cursor.execute('''
-            SELECT
-                CASE
-                    WHEN CAST(strftime('%H', date) AS INTEGER) < 12 THEN 'morning'
-                    WHEN CAST(strftime('%H', date) AS INTEGER) < 18 THEN 'afternoon'
-                    ELSE 'evening'
-                END as time_period,
-                AVG(mood_score) as avg_mood,
-                COUNT(*) as entry_count
+            SELECT COUNT(*), SUM(mood_score), MAX(entry_day)
             FROM journal_entries
             WHERE user_id = ?
-            GROUP BY time_period
         ''', (user_id,))
+        total_entries, mood_sum, last_entry_day = cursor.fetchone()
 
-        for row in cursor.fetchall():
-            period = row[0]
-            if period in patterns:
-                patterns[period]['average_mood'] = round(row[1], 1)
-                patterns[period]['entry_count'] = row[2]
+        if not total_entries:
+            cursor.execute('DELETE FROM user_rollups WHERE user_id = ?', (user_id,))
+            return
 
-        conn.close()
-        return patterns
+        cursor.execute('''
+            SELECT sentiment, COUNT(*)
+            FROM journal_entries
+            WHERE user_id = ?
+            GROUP BY sentiment
+        ''', (user_id,))
+        sentiment_counts = dict(cursor.fetchall())
+
+        cutoff = (datetime.now().date() - timedelta(days=RECENT_DAYS - 1)).isoformat()
+        cursor.execute('''
+            SELECT entry_day, COUNT(*)
+            FROM journal_entries
+            WHERE user_id = ? AND entry_day >= ?
+            GROUP BY entry_day
+        ''', (user_id, cutoff))
+        recent_days = dict(cursor.fetchall())
+
+        _, streak_days = self._streak_ending_by(cursor, user_id, last_entry_day)
+
+        self._write_rollup(cursor, user_id, total_entries, sentiment_counts, mood_sum,
+                           last_entry_day, streak_days, recent_days)
+
+    def _write_rollup(self, cursor, user_id, total_entries, sentiment_counts, mood_sum,
+                      last_entry_day, streak_days, recent_days):
+        cursor.execute('''
+            INSERT OR REPLACE INTO user_rollups
+            (user_id, total_entries, sentiment_counts, mood_sum, last_entry_day, streak_days, recent_days, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ''', (
+            user_id,
+            total_entries,
+            json.dumps(sentiment_counts),
+            mood_sum,
+            last_entry_day,
+            streak_days,
+            json.dumps(recent_days)
+        ))
+
+    def _rebuild_all_rollups(self, cursor):
+        cursor.execute('DELETE FROM user_rollups')
+        cursor.execute('SELECT DISTINCT user_id FROM journal_entries')
+        user_ids = [row[0] for row in cursor.fetchall()]
+        for user_id in user_ids:
+            self._rebuild_rollup(cursor, user_id)
+        return len(user_ids)
+
+    def rebuild_user_rollups(self, user_id=None):
+        """
+        Recount user_rollups from journal_entries
+
+        Args:
+            user_id (str): Only this user (default: every user)
+
+        Returns:
+            Number of users recounted
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            if user_id is None:
+                count = self._rebuild_all_rollups(cursor)
+            else:
+                self._rebuild_rollup(cursor, user_id)
+                count = 1
+            conn.commit()
+        return count
 
     # ============================================
     # PSYCHOLOGICAL TESTS METHODS
@@ -395,241 +647,231 @@ class MoodTrackingDB:
 
     def create_test(self, test_type, test_name, description, total_questions, max_score):
         """Create a new psychological test"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            INSERT INTO psychological_tests (test_type, test_name, description, total_questions, max_score)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (test_type, test_name, description, total_questions, max_score))
+            cursor.execute('''
+                INSERT INTO psychological_tests (test_type, test_name, description, total_questions, max_score)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (test_type, test_name, description, total_questions, max_score))
 
-        test_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+            test_id = cursor.lastrowid
+            conn.commit()
         return test_id
 
     def add_test_question(self, test_id, question_number, question_text):
         """Add a question to a test"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            INSERT INTO test_questions (test_id, question_number, question_text)
-            VALUES (?, ?, ?)
-        ''', (test_id, question_number, question_text))
+            cursor.execute('''
+                INSERT INTO test_questions (test_id, question_number, question_text)
+                VALUES (?, ?, ?)
+            ''', (test_id, question_number, question_text))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
     def add_response_option(self, test_id, option_text, option_value):
         """Add a response option for a test"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            INSERT INTO test_response_options (test_id, option_text, option_value)
-            VALUES (?, ?, ?)
-        ''', (test_id, option_text, option_value))
+            cursor.execute('''
+                INSERT INTO test_response_options (test_id, option_text, option_value)
+                VALUES (?, ?, ?)
+            ''', (test_id, option_text, option_value))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
     def add_score_threshold(self, test_id, min_score, max_score, severity_level, description, recommendations):
         """Add score threshold for a test"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            INSERT INTO test_score_thresholds (test_id, min_score, max_score, severity_level, description, recommendations)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (test_id, min_score, max_score, severity_level, description, recommendations))
+            cursor.execute('''
+                INSERT INTO test_score_thresholds (test_id, min_score, max_score, severity_level, description, recommendations)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (test_id, min_score, max_score, severity_level, description, recommendations))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
     def get_all_tests(self):
         """Get all available psychological tests"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            SELECT id, test_type, test_name, description, total_questions, max_score
-            FROM psychological_tests
-            ORDER BY test_name
-        ''')
-
-        tests = []
-        for row in cursor.fetchall():
-            tests.append({
-                'id': row[0],
-                'test_type': row[1],
-                'test_name': row[2],
-                'description': row[3],
-                'total_questions': row[4],
-                'max_score': row[5]
-            })
+            cursor.execute('''
+                SELECT id, test_type, test_name, description, total_questions, max_score
+                FROM psychological_tests
+                ORDER BY test_name
+            ''')
+
+            tests = []
+            for row in cursor.fetchall():
+                tests.append({
+                    'id': row[0],
+                    'test_type': row[1],
+                    'test_name': row[2],
+                    'description': row[3],
+                    'total_questions': row[4],
+                    'max_score': row[5]
+                })
 
-        conn.close()
         return tests
 
     def get_test_with_questions(self, test_id):
         """Get test details with all questions and options"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        # Get test info
-        cursor.execute('''
-            SELECT id, test_type, test_name, description, total_questions, max_score
-            FROM psychological_tests
-            WHERE id = ?
-        ''', (test_id,))
-
-        test_row = cursor.fetchone()
-        if not test_row:
-            conn.close()
-            return None
-
-        test = {
-            'id': test_row[0],
-            'test_type': test_row[1],
-            'test_name': test_row[2],
-            'description': test_row[3],
-            'total_questions': test_row[4],
-            'max_score': test_row[5]
-        }
+            # Get test info
+            cursor.execute('''
+                SELECT id, test_type, test_name, description, total_questions, max_score
+                FROM psychological_tests
+                WHERE id = ?
+            ''', (test_id,))
+
+            test_row = cursor.fetchone()
+            if not test_row:
+                return None
+
+            test = {
+                'id': test_row[0],
+                'test_type': test_row[1],
+                'test_name': test_row[2],
+                'description': test_row[3],
+                'total_questions': test_row[4],
+                'max_score': test_row[5]
+            }
 
-        # Get questions
-        cursor.execute('''
-            SELECT id, question_number, question_text
-            FROM test_questions
-            WHERE test_id = ?
-            ORDER BY question_number
-        ''', (test_id,))
-
-        questions = []
-        for row in cursor.fetchall():
-            questions.append({
-                'id': row[0],
-                'question_number': row[1],
-                'question_text': row[2]
-            })
+            # Get questions
+            cursor.execute('''
+                SELECT id, question_number, question_text
+                FROM test_questions
+                WHERE test_id = ?
+                ORDER BY question_number
+            ''', (test_id,))
+
+            questions = []
+            for row in cursor.fetchall():
+                questions.append({
+                    'id': row[0],
+                    'question_number': row[1],
+                    'question_text': row[2]
+                })
+
+            test['questions'] = questions
+
+            # Get response options
+            cursor.execute('''
+                SELECT option_text, option_value
+                FROM test_response_options
+                WHERE test_id = ?
+                ORDER BY option_value
+            ''', (test_id,))
 
-        test['questions'] = questions
+            options = []
+            for row in cursor.fetchall():
+                options.append({
+                    'text': row[0],
+                    'value': row[1]
+                })
 
-        # Get response options
-        cursor.execute('''
-            SELECT option_text, option_value
-            FROM test_response_options
-            WHERE test_id = ?
-            ORDER BY option_value
-        ''', (test_id,))
-
-        options = []
-        for row in cursor.fetchall():
-            options.append({
-                'text': row[0],
-                'value': row[1]
-            })
-
-        test['response_options'] = options
+            test['response_options'] = options
 
-        conn.close()
         return test
 
     def save_test_result(self, user_id, test_id, total_score, severity_level, answers, has_crisis):
         """Save user's test result"""
         import json
 
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            INSERT INTO user_test_results (user_id, test_id, total_score, severity_level, answers, has_crisis_indicators)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (user_id, test_id, total_score, severity_level, json.dumps(answers), has_crisis))
+            cursor.execute('''
+                INSERT INTO user_test_results (user_id, test_id, total_score, severity_level, answers, has_crisis_indicators)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (user_id, test_id, total_score, severity_level, json.dumps(answers), has_crisis))
 
-        result_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+            result_id = cursor.lastrowid
+            conn.commit()
         return result_id
 
     def get_user_test_history(self, user_id, test_id=None, limit=None):
         """Get user's test history"""
         import json
 
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        if test_id:
-            query = '''
-                SELECT r.id, r.test_id, t.test_name, r.total_score, r.severity_level,
-                       r.answers, r.has_crisis_indicators, r.completed_at
-                FROM user_test_results r
-                JOIN psychological_tests t ON r.test_id = t.id
-                WHERE r.user_id = ? AND r.test_id = ?
-                ORDER BY r.completed_at DESC
-            '''
-            params = (user_id, test_id)
-        else:
-            query = '''
-                SELECT r.id, r.test_id, t.test_name, r.total_score, r.severity_level,
-                       r.answers, r.has_crisis_indicators, r.completed_at
-                FROM user_test_results r
-                JOIN psychological_tests t ON r.test_id = t.id
-                WHERE r.user_id = ?
-                ORDER BY r.completed_at DESC
-            '''
-            params = (user_id,)
-
-        if limit:
-            query += ' LIMIT ?'
-            params = params + (limit,)
-
-        cursor.execute(query, params)
-
-        results = []
-        for row in cursor.fetchall():
-            # Get interpretation for this score
-            interpretation_query = '''
-                SELECT description
-                FROM test_score_thresholds
-                WHERE test_id = ? AND ? BETWEEN min_score AND max_score
-            '''
-            cursor.execute(interpretation_query, (row[1], row[3]))
-            interpretation_row = cursor.fetchone()
-            interpretation = interpretation_row[0] if interpretation_row else None
-
-            results.append({
-                'id': row[0],
-                'test_id': row[1],
-                'test_name': row[2],
-                'score': row[3],
-                'total_score': row[3],
-                'severity_level': row[4],
-                'answers': json.loads(row[5]),
-                'has_crisis_indicators': bool(row[6]),
-                'completed_at': row[7],
-                'interpretation': interpretation
-            })
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            if test_id:
+                query = '''
+                    SELECT r.id, r.test_id, t.test_name, r.total_score, r.severity_level,
+                           r.answers, r.has_crisis_indicators, r.completed_at
+                    FROM user_test_results r
+                    JOIN psychological_tests t ON r.test_id = t.id
+                    WHERE r.user_id = ? AND r.test_id = ?
+                    ORDER BY r.completed_at DESC
+                '''
+                params = (user_id, test_id)
+            else:
+                query = '''
+                    SELECT r.id, r.test_id, t.test_name, r.total_score, r.severity_level,
+                           r.answers, r.has_crisis_indicators, r.completed_at
+                    FROM user_test_results r
+                    JOIN psychological_tests t ON r.test_id = t.id
+                    WHERE r.user_id = ?
+                    ORDER BY r.completed_at DESC
+                '''
+                params = (user_id,)
+
+            if limit:
+                query += ' LIMIT ?'
+                params = params + (limit,)
+
+            cursor.execute(query, params)
+
+            results = []
+            for row in cursor.fetchall():
+                # Get interpretation for this score
+                interpretation_query = '''
+                    SELECT description
+                    FROM test_score_thresholds
+                    WHERE test_id = ? AND ? BETWEEN min_score AND max_score
+                '''
+                cursor.execute(interpretation_query, (row[1], row[3]))
+                interpretation_row = cursor.fetchone()
+                interpretation = interpretation_row[0] if interpretation_row else None
+
+                results.append({
+                    'id': row[0],
+                    'test_id': row[1],
+                    'test_name': row[2],
+                    'score': row[3],
+                    'total_score': row[3],
+                    'severity_level': row[4],
+                    'answers': json.loads(row[5]),
+                    'has_crisis_indicators': bool(row[6]),
+                    'completed_at': row[7],
+                    'interpretation': interpretation
+                })
 
-        conn.close()
         return results
 
     def get_score_interpretation(self, test_id, score):
         """Get interpretation for a test score"""
         import json
 
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            SELECT severity_level, description, recommendations
-            FROM test_score_thresholds
-            WHERE test_id = ? AND ? BETWEEN min_score AND max_score
-        ''', (test_id, score))
+            cursor.execute('''
+                SELECT severity_level, description, recommendations
+                FROM test_score_thresholds
+                WHERE test_id = ? AND ? BETWEEN min_score AND max_score
+            ''', (test_id, score))
 
-        row = cursor.fetchone()
-        conn.close()
+            row = cursor.fetchone()
 
         if row:
             return {
@@ -638,4 +880,28 @@ class MoodTrackingDB:
                 'recommendations': json.loads(row[2]) if row[2] else []
             }
 
-        return None
\ No newline at end of file
+        return None
+
+# Shared instances (app.py and every blueprint use the same one, so the schema
+# setup runs once per process instead of once per module)
+_shared_dbs = {}
+_shared_dbs_lock = threading.Lock()
+
+
+def get_db(db_path=DEFAULT_DB_PATH):
+    """Get the process-wide MoodTrackingDB for a database path"""
+    if db_path not in _shared_dbs:
+        with _shared_dbs_lock:
+            if db_path not in _shared_dbs:
+                _shared_dbs[db_path] = MoodTrackingDB(db_path)
+    return _shared_dbs[db_path]
+
+
+def set_db(db, db_path=DEFAULT_DB_PATH):
+    """
+    Make get_db(db_path) return db, e.g. an in-memory database in tests
+
+    app.py and the blueprints call get_db() at import, so call this first.
+    """
+    with _shared_dbs_lock:
+        _shared_dbs[db_path] = db
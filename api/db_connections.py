@@ -0,0 +1,164 @@
+"""
+SQLite Connection Manager
+
+MoodTrackingDB used to open (and close) a new sqlite3 connection in every
+method call: each call paid for opening the file, reading the schema and
+preparing its statements again, and without WAL a writer in one gunicorn
+worker blocked every reader in the others.
+
+ConnectionManager keeps one persistent connection per thread:
+- WAL journal mode, so readers never block the writer or each other
+- Tuned pragmas: synchronous, cache_size, mmap_size, busy_timeout
+  (DB_SYNCHRONOUS, DB_CACHE_SIZE_KB, DB_MMAP_SIZE_MB, DB_BUSY_TIMEOUT_MS)
+- sqlite3's per-connection prepared statement cache (DB_STATEMENT_CACHE_SIZE)
+  is kept warm across calls, so repeated queries skip SQL parsing
+- Fork safety: a child process (gunicorn worker) never uses connections
+  opened by its parent; it opens its own on first use
+
+An in-memory database (":memory:") exists only inside one connection, so it
+is served by a single connection shared by all threads under a lock.
+"""
+import os
+import sqlite3
+import logging
+import threading
+import weakref
+from contextlib import contextmanager
+
+from config_manager import get_config
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+# Every manager, so fork handlers can reset them
+_managers = weakref.WeakSet()
+
+
+class ConnectionManager:
+    """Thread-local persistent SQLite connections with WAL and tuned pragmas"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.shared = db_path == ':memory:'
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._connections = {}  # thread -> connection
+        self._inherited = []
+        self._shared_connection = None
+        self._stats = {'opened': 0, 'checkouts': 0, 'rollbacks': 0}
+        self.journal_mode = None
+        _managers.add(self)
+
+    def open(self):
+        """Open a new connection with the configured pragmas (the caller owns it)"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=config.DB_BUSY_TIMEOUT_MS / 1000.0,
+            cached_statements=config.DB_STATEMENT_CACHE_SIZE,
+            # Each connection is used by one thread at a time (or under the lock), but
+            # connections of finished threads are closed from another thread
+            check_same_thread=False
+        )
+        if not self.shared:
+            # Stays 'delete' on filesystems without shared-memory support
+            self.journal_mode = conn.execute('PRAGMA journal_mode=WAL').fetchone()[0]
+            conn.execute(f'PRAGMA mmap_size={config.DB_MMAP_SIZE_MB * 1024 * 1024}')
+        synchronous = config.DB_SYNCHRONOUS.upper()
+        conn.execute(f"PRAGMA synchronous={synchronous if synchronous in SYNCHRONOUS_MODES else 'NORMAL'}")
+        conn.execute(f'PRAGMA cache_size={-config.DB_CACHE_SIZE_KB}')  # Negative = KiB
+        conn.execute(f'PRAGMA busy_timeout={config.DB_BUSY_TIMEOUT_MS}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+
+    def _get(self):
+        if self.shared:
+            if self._shared_connection is None:
+                self._shared_connection = self._open_tracked()
+            return self._shared_connection
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._open_tracked()
+        return conn
+
+    def _open_tracked(self):
+        conn = self.open()
+        with self._lock:
+            self._close_finished_threads()
+            self._connections[threading.current_thread()] = conn
+            self._stats['opened'] += 1
+        return conn
+
+    def _close_finished_threads(self):
+        # Threads of the flask dev server live for one request
+        for thread in [thread for thread in self._connections if not thread.is_alive()]:
+            self._connections.pop(thread).close()
+
+    @contextmanager
+    def connection(self):
+        """
+        This thread's connection
+
+        Writes must still commit; a transaction left open by an exception is
+        rolled back so the next call starts clean.
+        """
+        if self.shared:
+            self._lock.acquire()
+        try:
+            conn = self._get()
+            self._stats['checkouts'] += 1
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                    self._stats['rollbacks'] += 1
+                raise
+        finally:
+            if self.shared:
+                self._lock.release()
+
+    def close_all(self):
+        """Close every connection opened by this process (shutdown, tests)"""
+        with self._lock:
+            for conn in self._connections.values():
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections = {}
+            self._shared_connection = None
+            self._local = threading.local()
+
+    def _reset_after_fork(self):
+        # The parent's connections stay open but unused: closing them here could
+        # checkpoint or delete the WAL that the parent is still using. An
+        # in-memory database has no file, so the child keeps its copy.
+        self._inherited = [conn for conn in self._connections.values() if conn is not self._shared_connection]
+        self._connections = {thread: conn for thread, conn in self._connections.items() if conn is self._shared_connection}
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._stats = {'opened': 0, 'checkouts': 0, 'rollbacks': 0}
+
+    def get_stats(self):
+        """Open connections and checkouts of this process, for /api/health"""
+        return dict(
+            self._stats,
+            path=self.db_path,
+            connections=len(self._connections),
+            journal_mode='memory' if self.shared else self.journal_mode,
+            synchronous=config.DB_SYNCHRONOUS.upper(),
+            statement_cache_size=config.DB_STATEMENT_CACHE_SIZE
+        )
+
+
+def _reset_after_fork():
+    for manager in _managers:
+        manager._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
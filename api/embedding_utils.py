@@ -0,0 +1,63 @@
+"""
+MentalBERT Embedding Helpers
+
+Shared tokenization and pooling for the MentalBERT embedding extractors in
+simple_model.py and biobert_lstm_model.py.
+
+Embedding modes:
+- "padded":  every text is padded to max_length and the mean is taken over all
+             positions, pad tokens included. This reproduces the embeddings the
+             existing LSTM head (mentalbert_lstm_model.keras) was trained on.
+- "dynamic": texts are padded only to the longest sequence in the batch and the
+             mean is weighted by the attention mask, so pad positions are ignored.
+             Much cheaper for short journal entries.
+
+Works on the tensors it is given, so importing it does not import torch.
+"""
+EMBEDDING_MODES = ('padded', 'dynamic')
+
+
+def validate_embedding_mode(mode):
+    """Return a valid embedding mode or raise ValueError"""
+    mode = (mode or 'padded').lower()
+    if mode not in EMBEDDING_MODES:
+        raise ValueError(f"Unknown embedding mode '{mode}'. Expected one of: {', '.join(EMBEDDING_MODES)}")
+    return mode
+
+
+def tokenize_for_embedding(tokenizer, texts, mode, max_length=300):
+    """
+    Tokenize texts for embedding extraction
+
+    Args:
+        tokenizer: HuggingFace tokenizer
+        texts (list): Input texts
+        mode (str): "padded" or "dynamic"
+        max_length (int): Truncation length (300 as per user's code)
+
+    Returns:
+        Dict of PyTorch tensors
+    """
+    padding = "max_length" if mode == 'padded' else "longest"
+    return tokenizer(list(texts), padding=padding, truncation=True, max_length=max_length, return_tensors="pt")
+
+
+def pool_embeddings(last_hidden_state, attention_mask, mode):
+    """
+    Mean-pool token embeddings into one vector per text
+
+    Args:
+        last_hidden_state: Tensor (batch, seq_len, hidden)
+        attention_mask: Tensor (batch, seq_len)
+        mode (str): "padded" (plain mean) or "dynamic" (masked mean)
+
+    Returns:
+        Tensor (batch, hidden)
+    """
+    if mode == 'padded':
+        return last_hidden_state.mean(dim=1)
+
+    mask = attention_mask.unsqueeze(-1).to(last_hidden_state.dtype)
+    summed = (last_hidden_state * mask).sum(dim=1)
+    counts = mask.sum(dim=1).clamp(min=1.0)
+    return summed / counts
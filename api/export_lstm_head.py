@@ -0,0 +1,73 @@
+"""
+LSTM Head Export Script
+Converts the Keras MentalBERT-LSTM head to a compact .npz file for the
+TensorFlow-free NumPy serving path (see lstm_head.py)
+
+Usage:
+    python export_lstm_head.py [keras_path] [npz_path]
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from config_manager import get_config
+from lstm_head import export_keras_head, parity_error, NumpyLSTMHead
+
+# Max allowed absolute difference between Keras and NumPy probabilities
+PARITY_TOLERANCE = 1e-4
+
+
+def main(keras_path, npz_path):
+    """Export the Keras head and verify the NumPy forward pass against it"""
+    print("=" * 60)
+    print("LSTM HEAD EXPORT")
+    print("=" * 60)
+
+    import tensorflow as tf
+
+    print(f"\n[1/3] Loading Keras model from: {keras_path}")
+    keras_model = tf.keras.models.load_model(keras_path)
+    keras_model.summary()
+
+    print(f"\n[2/3] Exporting weights to: {npz_path}")
+    head = export_keras_head(keras_model)
+    head.save(npz_path)
+    size_kb = os.path.getsize(npz_path) / 1024
+    print(f"  [OK] {len(head.layers)} layers, {size_kb:.1f} KB")
+
+    print("\n[3/3] Verifying NumPy forward pass against Keras...")
+    reloaded = NumpyLSTMHead.load(npz_path)
+    rng = np.random.default_rng(0)
+    input_shape = tuple(keras_model.input_shape[1:])
+    samples = rng.normal(0, 0.5, size=(64,) + input_shape).astype(np.float32)
+    error = parity_error(keras_model, reloaded, samples)
+    print(f"  Max abs probability difference: {error:.2e} (tolerance {PARITY_TOLERANCE:.0e})")
+
+    if error > PARITY_TOLERANCE:
+        print("\n[ERROR] NumPy head does not match the Keras model")
+        return False
+
+    print("\n" + "=" * 60)
+    print("EXPORT COMPLETE!")
+    print("=" * 60)
+    print("\nSet LSTM_HEAD_BACKEND=numpy (or auto) to serve without TensorFlow.")
+    return True
+
+
+if __name__ == "__main__":
+    config = get_config()
+    keras_path = sys.argv[1] if len(sys.argv) > 1 else config.LSTM_MODEL_PATH
+    npz_path = sys.argv[2] if len(sys.argv) > 2 else config.LSTM_HEAD_NPZ_PATH
+
+    try:
+        success = main(keras_path, npz_path)
+        sys.exit(0 if success else 1)
+    except Exception as e:
+        print(f"\n[FATAL ERROR]: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
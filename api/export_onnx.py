@@ -0,0 +1,78 @@
+"""
+ONNX Export Script
+Converts the fine-tuned RoBERTa and MentalBERT model directories to ONNX
+(optionally with INT8 dynamic quantization) and records the parity error
+against the PyTorch outputs on a reference text set
+
+Usage:
+    python export_onnx.py [--quantize] [roberta|mentalbert ...]
+
+Then set ENCODER_BACKEND=onnx (and ONNX_QUANTIZED=True for the INT8 models).
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config_manager import get_config
+from onnx_backend import ENCODERS, get_onnx_path, export_encoder, quantize_encoder, measure_parity
+
+
+def main(names, quantize):
+    """Export each model, optionally quantize it, and print its parity report"""
+    config = get_config()
+    model_dirs = {
+        'roberta': (config.ROBERTA_MODEL_PATH, config.ROBERTA_TOKENIZER_PATH),
+        'mentalbert': (config.MENTALBERT_MODEL_PATH, config.MENTALBERT_MODEL_PATH),
+    }
+
+    print("=" * 60)
+    print("ONNX EXPORT")
+    print("=" * 60)
+
+    for step, name in enumerate(names, start=1):
+        model_dir, tokenizer_dir = model_dirs[name]
+        onnx_path = get_onnx_path(name, config.ONNX_MODEL_DIR)
+
+        print(f"\n[{step}/{len(names)}] {name}: {model_dir}")
+        export_encoder(name, model_dir, tokenizer_dir, onnx_path)
+        print(f"  [OK] Exported: {onnx_path} ({os.path.getsize(onnx_path) / 1024 / 1024:.1f} MB)")
+
+        report = measure_parity(name, model_dir, tokenizer_dir, onnx_path)
+        print(f"  [OK] FP32 parity: max abs error {report['max_abs_error']:.2e}")
+
+        if quantize:
+            int8_path = quantize_encoder(onnx_path, get_onnx_path(name, config.ONNX_MODEL_DIR, quantized=True))
+            print(f"  [OK] Quantized: {int8_path} ({os.path.getsize(int8_path) / 1024 / 1024:.1f} MB)")
+
+            report = measure_parity(name, model_dir, tokenizer_dir, int8_path)
+            print(f"  [OK] INT8 parity: max abs error {report['max_abs_error']:.2e}")
+            if 'label_agreement' in report:
+                print(f"  [OK] INT8 label agreement: {report['label_agreement']:.1%}")
+
+    print("\n" + "=" * 60)
+    print("EXPORT COMPLETE!")
+    print("=" * 60)
+    print("\nSet ENCODER_BACKEND=onnx to serve with ONNX Runtime.")
+    return True
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    quantize = '--quantize' in args
+    names = [arg for arg in args if not arg.startswith('--')] or list(ENCODERS)
+
+    unknown = [name for name in names if name not in ENCODERS]
+    if unknown:
+        print(f"Unknown model(s): {', '.join(unknown)}. Expected: {', '.join(ENCODERS)}")
+        sys.exit(1)
+
+    try:
+        success = main(names, quantize)
+        sys.exit(0 if success else 1)
+    except Exception as e:
+        print(f"\n[FATAL ERROR]: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,103 @@
+"""
+Gunicorn Configuration
+
+Usage (from the repository root):
+    gunicorn --config api/gunicorn.conf.py
+
+Settings come from config_manager (GUNICORN_WORKERS, GUNICORN_THREADS,
+GUNICORN_TIMEOUT, MODEL_PRELOAD) and PORT.
+
+With MODEL_PRELOAD=True the app and all model weights are loaded once in the
+master process before workers are forked. Workers share the weight pages
+copy-on-write instead of each holding a full copy, so more workers fit per
+node. Fork-unsafe state (micro-batcher threads and locks, the Redis
+connection pool, registry/cache locks) is re-created in each worker by
+os.register_at_fork hooks in those modules. SQLite connections are persistent
+per thread (db_connections.py), so the ones the preloading master opened are
+inherited; each worker leaves them open but unused and opens its own on first
+use. Check the sharing with memory_report.py.
+
+With INFERENCE_SERVER_ADDRESS set the workers hold no models at all and
+forward predictions to model_server.py.
+
+Each worker gets a slot and its share of the cores (thread_budget.py) and
+warms up its models before accepting connections (warmup.py).
+"""
+import os
+import sys
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Import the app from api/ but keep the launch directory as the working
+# directory: relative data paths (mood_tracking.db, USERS_DATABASE_PATH) stay
+# where `gunicorn api.app:app` from the repository root put them. Model paths
+# are resolved against api/ by config_manager.
+pythonpath = API_DIR
+sys.path.insert(0, API_DIR)
+
+from config_manager import get_config  # noqa: E402
+
+config = get_config()
+
+wsgi_app = 'app:app'
+bind = f"0.0.0.0:{os.getenv('PORT', str(config.API_PORT))}"
+workers = config.GUNICORN_WORKERS
+threads = config.GUNICORN_THREADS
+timeout = config.GUNICORN_TIMEOUT
+accesslog = '-'
+errorlog = '-'
+
+preload_app = config.MODEL_PRELOAD
+
+if preload_app:
+    # Rust tokenizers disable their thread pool after a fork anyway; say so up front
+    os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+
+
+def when_ready(server):
+    """Master is up and about to fork: load the weights it will share"""
+    if not preload_app or config.INFERENCE_SERVER_ADDRESS or not config.ML_ENABLED:
+        # Models live in the model server when one is configured; no-ML processes have none
+        return
+
+    import model_registry
+
+    status = model_registry.preload_models()
+    memory = model_registry.get_process_memory() or {}
+    server.log.info(
+        f"Preloaded models in master (pid {os.getpid()}): "
+        f"{', '.join(f'{name}={loaded}' for name, loaded in status.items())}; "
+        f"RSS {memory.get('rss_mb')} MB"
+    )
+
+
+def pre_fork(server, worker):
+    """Give the new worker the lowest free slot (replacement workers reuse the slot of the one they replace)"""
+    taken = {getattr(other, 'slot', None) for other in server.WORKERS.values()}
+    worker.slot = next(slot for slot in range(server.num_workers + 1) if slot not in taken)
+
+
+def post_fork(server, worker):
+    """Give the worker its share of the cores before it serves anything"""
+    import thread_budget
+
+    layout = thread_budget.configure_worker(worker.slot, server.num_workers)
+    server.log.info(
+        f"Worker {worker.pid} (slot {layout['worker_index']}): "
+        f"{layout['intra_op_threads']} intra-op / {layout['inter_op_threads']} inter-op threads"
+        + (f", cores {layout['pinned_cores']}" if layout['pinned_cores'] else "")
+        + (", shared model weights" if preload_app else "")
+    )
+
+
+def post_worker_init(worker):
+    """Warm up the models before the worker accepts its first connection"""
+    import warmup
+
+    # Heartbeat between models so a slow warmup is not mistaken for a hung worker
+    ready = warmup.run_warmup(on_progress=worker.notify)
+    status = warmup.get_status()
+    worker.log.info(
+        f"Worker {worker.pid} warmup {'done' if ready else 'FAILED'} in {status['total_time_s']}s: "
+        + ', '.join(f"{name}={info.get('warmup_time_s', info.get('error'))}" for name, info in status['models'].items())
+    )
@@ -0,0 +1,121 @@
+"""
+Import-Time Report
+Shows what importing the API costs, per top-level package, to keep startup
+fast and to verify that ML frameworks are only imported when a prediction
+backend is first used
+
+Uses CPython's -X importtime in a fresh interpreter, so the numbers do not
+depend on what the current process has already imported.
+
+Usage:
+    python import_report.py [module ...]    (default: app)
+
+Run with ML_ENABLED=False to see the startup of a no-ML process.
+"""
+import os
+import sys
+import subprocess
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Packages that should only be imported when actually needed
+HEAVY_MODULES = ('torch', 'transformers', 'tensorflow', 'keras', 'onnxruntime', 'pandas')
+
+# Set by app.py once it has finished importing
+_app_import_s = None
+
+
+def record_app_import(seconds):
+    global _app_import_s
+    _app_import_s = round(seconds, 3)
+
+
+def get_loaded_heavy_modules():
+    """Heavy packages imported by this process so far"""
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def get_import_status():
+    """App import time and loaded heavy packages, for /api/health"""
+    from config_manager import get_config
+
+    return {
+        'ml_enabled': get_config().ML_ENABLED,
+        'app_import_s': _app_import_s,
+        'heavy_modules_loaded': get_loaded_heavy_modules()
+    }
+
+
+def parse_importtime(output):
+    """
+    Sum -X importtime self times per top-level package
+
+    Args:
+        output (str): stderr of `python -X importtime ...`
+
+    Returns:
+        dict of package -> microseconds, most expensive first
+    """
+    totals = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Column header
+
+        package = parts[2].strip().split('.')[0]
+        totals[package] = totals.get(package, 0) + int(parts[0])
+
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def measure_imports(module):
+    """
+    Import a module in a fresh interpreter and time every import
+
+    Returns:
+        dict of package -> microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=API_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.splitlines()[-1] if result.stderr else ''}")
+    return parse_importtime(result.stderr)
+
+
+def main(modules, top=15):
+    """Print the per-package import cost of each module"""
+    print("=" * 60)
+    print("IMPORT-TIME REPORT")
+    print("=" * 60)
+
+    for module in modules:
+        totals = measure_imports(module)
+        total_us = sum(totals.values())
+
+        print(f"\nimport {module}: {total_us / 1000:.0f} ms\n")
+        print(f"{'package':<30}{'ms':>10}{'share':>10}")
+        for package, us in list(totals.items())[:top]:
+            print(f"{package:<30}{us / 1000:>10.1f}{us / total_us:>10.0%}")
+
+        heavy = [name for name in HEAVY_MODULES if name in totals]
+        if heavy:
+            print(f"\n[WARN] Heavy packages imported: {', '.join(heavy)}")
+        else:
+            print("\n[OK] No heavy packages imported")
+
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        success = main(sys.argv[1:] or ['app'])
+        sys.exit(0 if success else 1)
+    except Exception as e:
+        print(f"\n[FATAL ERROR]: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,278 @@
+"""
+Inference Server Client
+
+Client shim for the standalone model server (model_server.py). When
+INFERENCE_SERVER_ADDRESS is set, the web workers send prediction requests to
+the model server instead of loading and running the models themselves, so
+web concurrency and model memory/CPU can be scaled independently.
+
+Addresses:
+- unix:/path/to/socket   Unix domain socket (same host)
+- tcp:host:port          Local or remote TCP
+
+Wire format (both directions): a fixed 6-byte header followed by a UTF-8
+JSON body
+
+    !BBI  protocol version | op (request) or status (response) | body length
+
+Each web thread keeps one persistent connection.
+"""
+import os
+import json
+import socket
+import struct
+import logging
+import threading
+import time
+
+from config_manager import get_config
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+PROTOCOL_VERSION = 1
+HEADER = struct.Struct('!BBI')
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+# Request ops
+OP_PING = 0
+OP_PREDICT = 1
+OP_STATS = 2
+
+# Response status
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+
+class InferenceServerError(Exception):
+    """Model server unreachable or returned an error"""
+
+
+# ============================================
+# FRAMING
+# ============================================
+
+def _recv_exact(sock, size):
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(remaining)
+        if not chunk:
+            raise ConnectionError("Connection closed by peer")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def send_frame(sock, code, payload):
+    """Send one frame (op or status code + JSON payload)"""
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    sock.sendall(HEADER.pack(PROTOCOL_VERSION, code, len(body)) + body)
+
+
+def recv_frame(sock):
+    """
+    Receive one frame
+
+    Returns:
+        (code, payload), or (None, None) if the peer closed the connection
+        cleanly between frames
+    """
+    header = sock.recv(HEADER.size)
+    if not header:
+        return None, None
+    if len(header) < HEADER.size:
+        header += _recv_exact(sock, HEADER.size - len(header))
+
+    version, code, length = HEADER.unpack(header)
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported protocol version: {version}")
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame too large: {length} bytes")
+
+    return code, json.loads(_recv_exact(sock, length).decode('utf-8'))
+
+
+def parse_address(address):
+    """
+    Parse an INFERENCE_SERVER_ADDRESS value
+
+    Returns:
+        (socket family, address) for socket.connect / bind
+    """
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    if address.startswith('tcp:'):
+        host, _, port = address[len('tcp:'):].rpartition(':')
+        return socket.AF_INET, (host or '127.0.0.1', int(port))
+    raise ValueError(f"Invalid inference server address: {address} (expected unix:/path or tcp:host:port)")
+
+
+# ============================================
+# CLIENT
+# ============================================
+
+class InferenceClient:
+    """Blocking client with one persistent connection per thread"""
+
+    def __init__(self, address, timeout=30.0):
+        self.address = address
+        self.family, self.sock_address = parse_address(address)
+        self.timeout = timeout
+        self._local = threading.local()
+
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'errors': 0, 'total_latency_ms': 0.0}
+
+    def _connect(self):
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.sock_address)
+        if self.family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = None
+
+    def request(self, op, payload):
+        """
+        Send one request and wait for its response (reconnects once if the
+        persistent connection was dropped)
+        """
+        start = time.perf_counter()
+
+        for attempt in range(2):
+            try:
+                if getattr(self._local, 'sock', None) is None:
+                    self._local.sock = self._connect()
+
+                send_frame(self._local.sock, op, payload)
+                status, response = recv_frame(self._local.sock)
+                if status is None:
+                    raise ConnectionError("Connection closed by model server")
+                break
+
+            except socket.timeout as e:
+                # The server may still be working on it - do not send it twice
+                self._close()
+                self._record(start, error=True)
+                raise InferenceServerError(f"Model server timed out after {self.timeout}s: {e}")
+
+            except (OSError, ConnectionError, ValueError) as e:
+                self._close()
+                if attempt == 1:
+                    self._record(start, error=True)
+                    raise InferenceServerError(f"Model server unavailable at {self.address}: {e}")
+
+        self._record(start, error=status != STATUS_OK)
+        if status != STATUS_OK:
+            raise InferenceServerError(response.get('error', 'Unknown model server error'))
+        return response
+
+    def _record(self, start, error):
+        with self._stats_lock:
+            self._stats['requests'] += 1
+            self._stats['errors'] += int(error)
+            self._stats['total_latency_ms'] += (time.perf_counter() - start) * 1000.0
+
+    def predict(self, model_name, texts):
+        """Predict a list of texts with a model on the server"""
+        return self.request(OP_PREDICT, {'model': model_name, 'texts': list(texts)})['results']
+
+    def ping(self):
+        return self.request(OP_PING, {}).get('pid')
+
+    def get_stats(self):
+        """Client-side request counters"""
+        with self._stats_lock:
+            requests = self._stats['requests']
+            return {
+                'address': self.address,
+                'requests': requests,
+                'errors': self._stats['errors'],
+                'avg_latency_ms': round(self._stats['total_latency_ms'] / requests, 2) if requests else 0.0
+            }
+
+
+# Global client (None when models run in-process)
+_client = None
+_client_lock = threading.Lock()
+_serving_locally = False
+
+
+def _reset_after_fork():
+    """Forked workers open their own connections"""
+    global _client, _client_lock
+    _client = None
+    _client_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def run_models_locally():
+    """Called by model_server.py: this process owns the models, never forward"""
+    global _serving_locally
+    _serving_locally = True
+
+
+def is_enabled():
+    """True when predictions are served by a separate model server"""
+    return bool(config.INFERENCE_SERVER_ADDRESS) and not _serving_locally
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = InferenceClient(config.INFERENCE_SERVER_ADDRESS, config.INFERENCE_SERVER_TIMEOUT)
+                logger.info(f"✓ Using model server at {config.INFERENCE_SERVER_ADDRESS}")
+    return _client
+
+
+def predict_one(model_name, text):
+    """
+    Predict one text on the model server
+
+    Errors are returned as {"error": ...} like the local prediction functions.
+    """
+    try:
+        return get_client().predict(model_name, [text])[0]
+    except InferenceServerError as e:
+        logger.error(f"Model server prediction failed: {e}")
+        return {"error": f"Inference server error: {str(e)}"}
+
+
+def predict_many(model_name, texts):
+    """Batch version of predict_one (one request for all texts)"""
+    try:
+        return get_client().predict(model_name, texts)
+    except InferenceServerError as e:
+        logger.error(f"Model server batch prediction failed: {e}")
+        return [{"error": f"Inference server error: {str(e)}"} for _ in texts]
+
+
+def get_status():
+    """Model server status for /api/health"""
+    if not is_enabled():
+        return {'enabled': False}
+
+    client = get_client()
+    status = dict(client.get_stats(), enabled=True)
+    try:
+        status['server'] = client.request(OP_STATS, {})
+        status['reachable'] = True
+    except InferenceServerError as e:
+        status['reachable'] = False
+        status['error'] = str(e)
+    return status
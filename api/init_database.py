@@ -31,6 +31,7 @@ def verify_tables():
     required_tables = [
         'users',
         'journal_entries',
+        'user_rollups',
         'psychological_tests',
         'test_questions',
         'test_response_options',
@@ -0,0 +1,148 @@
+"""
+Sliding-Window Inference for Long Texts
+
+RoBERTa reads at most 512 tokens and the MentalBERT embeddings 300, while
+journal entries may be up to MAX_TEXT_LENGTH (5000) characters, so plain
+truncation ignores the end of long entries.
+
+With LONG_TEXT_MODE=window each text is split into overlapping windows of
+the model's maximum length (LONG_TEXT_STRIDE tokens of overlap, at most
+LONG_TEXT_MAX_WINDOWS per text). The windows of all texts in a batch go
+through the encoder in a single forward pass, and the per-window outputs
+(RoBERTa logits, MentalBERT embeddings) are averaged back into one row per
+text - weighted by the number of tokens in each window
+(LONG_TEXT_AGGREGATION=weighted) or equally (mean).
+
+Texts that fit in one window are tokenized exactly as with truncation, so
+their predictions are unchanged. LONG_TEXT_MODE=truncate restores plain
+truncation.
+"""
+import logging
+
+import tokenization
+from config_manager import get_config
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+LONG_TEXT_MODES = ('window', 'truncate')
+AGGREGATIONS = ('weighted', 'mean')
+
+
+def split_windows(n_tokens, window, stride):
+    """
+    Start/end offsets of overlapping windows covering n_tokens tokens
+
+    Args:
+        n_tokens (int): Number of content tokens
+        window (int): Content tokens per window
+        stride (int): Tokens shared by consecutive windows (at most half a window)
+
+    Returns:
+        List of (start, end); one window when the text fits
+    """
+    step = max(1, window - min(stride, window // 2))
+    spans = []
+    start = 0
+    while True:
+        end = min(start + window, n_tokens)
+        spans.append((start, end))
+        if end >= n_tokens:
+            return spans
+        start += step
+
+
+class WindowedBatch:
+    """Which text each encoder row belongs to, and how much it counts"""
+
+    def __init__(self, window_map, weights, counts):
+        self.window_map = window_map    # encoder row -> text index
+        self.weights = weights          # encoder row -> content tokens
+        self.counts = counts            # text index -> number of windows
+
+    @property
+    def n_texts(self):
+        return len(self.counts)
+
+    def is_identity(self):
+        return len(self.window_map) == self.n_texts
+
+
+def tokenize_windows(tokenizer, texts, max_length, pad_to_max_length=False, cache_name=None):
+    """
+    Tokenize texts for the encoder, splitting long texts into windows
+
+    Args:
+        tokenizer: HuggingFace tokenizer (slow or fast)
+        texts (list): Input texts
+        max_length (int): Encoder input length including special tokens
+        pad_to_max_length (bool): Pad every row to max_length (MentalBERT
+            "padded" embeddings) instead of to the longest row
+        cache_name (str): Token-id cache namespace (tokenization.py), or None
+
+    Returns:
+        (dict of PyTorch tensors, WindowedBatch)
+    """
+    import torch
+
+    window = max_length - tokenizer.num_special_tokens_to_add(pair=False)
+    token_ids = tokenization.encode(cache_name, tokenizer, texts)
+
+    rows, window_map, weights, counts = [], [], [], []
+    for index, ids in enumerate(token_ids):
+        if config.LONG_TEXT_MODE == 'truncate':
+            spans = [(0, min(len(ids), window))]
+        else:
+            spans = split_windows(len(ids), window, config.LONG_TEXT_STRIDE)[:max(1, config.LONG_TEXT_MAX_WINDOWS)]
+        counts.append(len(spans))
+        for start, end in spans:
+            rows.append(tokenizer.build_inputs_with_special_tokens(ids[start:end]))
+            window_map.append(index)
+            weights.append(max(1, end - start))
+
+    length = max_length if pad_to_max_length else max(len(row) for row in rows)
+    pad_id = tokenizer.pad_token_id
+    inputs = {
+        'input_ids': torch.tensor([row + [pad_id] * (length - len(row)) for row in rows], dtype=torch.long),
+        'attention_mask': torch.tensor([[1] * len(row) + [0] * (length - len(row)) for row in rows], dtype=torch.long)
+    }
+    if 'token_type_ids' in getattr(tokenizer, 'model_input_names', ()):
+        # BERT models (MentalBERT) take segment ids; their ONNX export requires them
+        inputs['token_type_ids'] = torch.zeros_like(inputs['input_ids'])
+    return inputs, WindowedBatch(window_map, weights, counts)
+
+
+def aggregate_windows(values, batch):
+    """
+    Combine per-window rows into one row per text
+
+    Args:
+        values: Tensor (encoder rows, ...) - logits or pooled embeddings
+        batch (WindowedBatch): From tokenize_windows
+
+    Returns:
+        Tensor (texts, ...)
+    """
+    if batch.is_identity():
+        return values
+
+    import torch
+
+    weights = batch.weights if config.LONG_TEXT_AGGREGATION == 'weighted' else [1] * len(batch.weights)
+    weights = torch.tensor(weights, dtype=values.dtype, device=values.device)
+    index = torch.tensor(batch.window_map, dtype=torch.long, device=values.device)
+
+    shape = (batch.n_texts,) + tuple(values.shape[1:])
+    weighted = values * weights.view(-1, *([1] * (values.dim() - 1)))
+    totals = torch.zeros(shape, dtype=values.dtype, device=values.device).index_add_(0, index, weighted)
+    norms = torch.zeros(batch.n_texts, dtype=values.dtype, device=values.device).index_add_(0, index, weights)
+
+    return totals / norms.view(-1, *([1] * (values.dim() - 1)))
+
+
+def get_runtime_tag():
+    """Settings that change long-text outputs (part of the prediction cache identity)"""
+    if config.LONG_TEXT_MODE == 'truncate':
+        return 'truncate'
+    return f"window:{config.LONG_TEXT_STRIDE}:{config.LONG_TEXT_MAX_WINDOWS}:{config.LONG_TEXT_AGGREGATION}"
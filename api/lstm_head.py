@@ -0,0 +1,399 @@
+"""
+Pure-NumPy Inference Engine for the Keras LSTM Head
+
+The MentalBERT-LSTM classifier is a small Keras model on top of a 768-d
+MentalBERT embedding. Loading it through TensorFlow costs seconds of import
+time and hundreds of MB of RSS per worker, so export_lstm_head.py extracts the
+layer weights into a compact .npz file and NumpyLSTMHead replays the forward
+pass with NumPy only.
+
+NumpyLSTMHead.predict() mirrors keras.Model.predict(), so it can be used as a
+drop-in replacement wherever the Keras model was used.
+
+Supported layers: InputLayer, Dense, LSTM, Bidirectional(LSTM), Dropout,
+Reshape, Flatten, BatchNormalization, LayerNormalization,
+GlobalAveragePooling1D, GlobalMaxPooling1D.
+"""
+import os
+import json
+import math
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SPEC_KEY = '__spec__'
+FORMAT_VERSION = 1
+
+# Layers that are the identity at inference time
+IDENTITY_LAYERS = ('Dropout', 'SpatialDropout1D', 'GaussianNoise', 'GaussianDropout',
+                   'AlphaDropout', 'ActivityRegularization', 'Masking')
+
+
+# ============================================
+# ACTIVATIONS
+# ============================================
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _softmax(x):
+    shifted = x - np.max(x, axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / np.sum(exp, axis=-1, keepdims=True)
+
+
+_erf = np.vectorize(math.erf, otypes=[np.float32])
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'tanh': np.tanh,
+    'sigmoid': _sigmoid,
+    # Keras 2 hard_sigmoid; Keras 3 uses relu6(x + 3) / 6 (see get_activation)
+    'hard_sigmoid': lambda x: np.clip(0.2 * x + 0.5, 0.0, 1.0),
+    'softmax': _softmax,
+    'elu': lambda x: np.where(x > 0, x, np.exp(np.minimum(x, 0)) - 1),
+    'selu': lambda x: 1.0507009873554805 * np.where(x > 0, x, 1.6732632423543772 * (np.exp(np.minimum(x, 0)) - 1)),
+    'softplus': lambda x: np.logaddexp(0, x),
+    'softsign': lambda x: x / (1 + np.abs(x)),
+    'swish': lambda x: x * _sigmoid(x),
+    'silu': lambda x: x * _sigmoid(x),
+    'gelu': lambda x: 0.5 * x * (1 + _erf(x / math.sqrt(2))),
+}
+
+
+def get_activation(name, keras_version=2):
+    """Look up a NumPy activation by its Keras name"""
+    if name == 'hard_sigmoid' and keras_version >= 3:
+        return lambda x: np.clip(x / 6.0 + 0.5, 0.0, 1.0)
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation: {name}")
+    return ACTIVATIONS[name]
+
+
+# ============================================
+# LAYER KERNELS
+# ============================================
+
+def _lstm(x, kernel, recurrent_kernel, bias, spec, keras_version):
+    """Run a Keras-compatible LSTM over x of shape (batch, steps, features)"""
+    units = spec['units']
+    activation = get_activation(spec['activation'], keras_version)
+    recurrent_activation = get_activation(spec['recurrent_activation'], keras_version)
+
+    batch, steps, _ = x.shape
+    h = np.zeros((batch, units), dtype=np.float32)
+    c = np.zeros((batch, units), dtype=np.float32)
+
+    # Input projection for every step at once
+    projected = x @ kernel
+    if bias is not None:
+        projected = projected + bias
+
+    time_order = range(steps - 1, -1, -1) if spec.get('go_backwards') else range(steps)
+    outputs = []
+    for t in time_order:
+        z = projected[:, t, :] + h @ recurrent_kernel
+
+        # Keras gate order: input, forget, cell, output
+        i = recurrent_activation(z[:, :units])
+        f = recurrent_activation(z[:, units:2 * units])
+        candidate = activation(z[:, 2 * units:3 * units])
+        o = recurrent_activation(z[:, 3 * units:])
+
+        c = f * c + i * candidate
+        h = o * activation(c)
+        outputs.append(h)
+
+    if spec.get('return_sequences'):
+        return np.stack(outputs, axis=1)
+    return h
+
+
+def _merge(forward, backward, mode):
+    """Merge Bidirectional outputs like Keras"""
+    if mode == 'concat':
+        return np.concatenate([forward, backward], axis=-1)
+    if mode == 'sum':
+        return forward + backward
+    if mode == 'mul':
+        return forward * backward
+    if mode == 'ave':
+        return (forward + backward) / 2.0
+    raise ValueError(f"Unsupported Bidirectional merge_mode: {mode}")
+
+
+# ============================================
+# INFERENCE ENGINE
+# ============================================
+
+class NumpyLSTMHead:
+    """NumPy forward pass for an exported Keras LSTM head"""
+
+    def __init__(self, spec, weights):
+        """
+        Args:
+            spec (dict): Model spec written by export_keras_head
+            weights (dict): Weight arrays keyed by "<layer index>/<name>"
+        """
+        if spec.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported LSTM head format version: {spec.get('format_version')}")
+
+        self.spec = spec
+        self.layers = spec['layers']
+        self.input_shape = spec.get('input_shape')
+        self.keras_version = spec.get('keras_version', 2)
+        self.weights = {key: np.asarray(value, dtype=np.float32) for key, value in weights.items()}
+
+    @classmethod
+    def load(cls, npz_path):
+        """Load an exported head from a .npz file"""
+        with np.load(npz_path, allow_pickle=False) as data:
+            spec = json.loads(str(data[SPEC_KEY]))
+            weights = {key: data[key] for key in data.files if key != SPEC_KEY}
+
+        head = cls(spec, weights)
+        logger.info(f"NumPy LSTM head loaded from: {npz_path} ({len(head.layers)} layers)")
+        return head
+
+    def save(self, npz_path):
+        """Save the head to a compressed .npz file"""
+        np.savez_compressed(npz_path, **{SPEC_KEY: np.array(json.dumps(self.spec))}, **self.weights)
+
+    def _weight(self, index, name):
+        return self.weights.get(f"{index}/{name}")
+
+    def predict(self, x, verbose=0, batch_size=None):
+        """
+        Run the forward pass (same call signature as keras.Model.predict)
+
+        Args:
+            x: Input array, e.g. MentalBERT embeddings (batch, 768)
+
+        Returns:
+            numpy array of output probabilities (batch, num_classes)
+        """
+        x = np.asarray(x, dtype=np.float32)
+        if self.input_shape:
+            x = x.reshape((x.shape[0],) + tuple(self.input_shape))
+
+        for index, layer in enumerate(self.layers):
+            x = self._run_layer(index, layer, x)
+
+        return x
+
+    def _run_layer(self, index, layer, x):
+        layer_type = layer['type']
+
+        if layer_type in IDENTITY_LAYERS or layer_type == 'InputLayer':
+            return x
+
+        if layer_type == 'Dense':
+            x = x @ self._weight(index, 'kernel')
+            bias = self._weight(index, 'bias')
+            if bias is not None:
+                x = x + bias
+            return get_activation(layer['activation'], self.keras_version)(x)
+
+        if layer_type == 'Reshape':
+            return x.reshape((x.shape[0],) + tuple(layer['target_shape']))
+
+        if layer_type == 'Flatten':
+            return x.reshape((x.shape[0], -1))
+
+        if layer_type == 'GlobalAveragePooling1D':
+            return x.mean(axis=1)
+
+        if layer_type == 'GlobalMaxPooling1D':
+            return x.max(axis=1)
+
+        if layer_type == 'BatchNormalization':
+            mean = self._weight(index, 'moving_mean')
+            variance = self._weight(index, 'moving_variance')
+            x = (x - mean) / np.sqrt(variance + layer['epsilon'])
+            gamma = self._weight(index, 'gamma')
+            beta = self._weight(index, 'beta')
+            if gamma is not None:
+                x = x * gamma
+            if beta is not None:
+                x = x + beta
+            return x
+
+        if layer_type == 'LayerNormalization':
+            mean = x.mean(axis=-1, keepdims=True)
+            variance = x.var(axis=-1, keepdims=True)
+            x = (x - mean) / np.sqrt(variance + layer['epsilon'])
+            gamma = self._weight(index, 'gamma')
+            beta = self._weight(index, 'beta')
+            if gamma is not None:
+                x = x * gamma
+            if beta is not None:
+                x = x + beta
+            return x
+
+        if layer_type == 'LSTM':
+            if x.ndim == 2:
+                # A 2D input is treated as a single time step
+                x = x[:, np.newaxis, :]
+            return _lstm(
+                x,
+                self._weight(index, 'kernel'),
+                self._weight(index, 'recurrent_kernel'),
+                self._weight(index, 'bias'),
+                layer,
+                self.keras_version
+            )
+
+        if layer_type == 'Bidirectional':
+            if x.ndim == 2:
+                x = x[:, np.newaxis, :]
+            forward = _lstm(
+                x,
+                self._weight(index, 'forward/kernel'),
+                self._weight(index, 'forward/recurrent_kernel'),
+                self._weight(index, 'forward/bias'),
+                layer['forward'],
+                self.keras_version
+            )
+            backward = _lstm(
+                x,
+                self._weight(index, 'backward/kernel'),
+                self._weight(index, 'backward/recurrent_kernel'),
+                self._weight(index, 'backward/bias'),
+                layer['backward'],
+                self.keras_version
+            )
+            if layer['backward'].get('return_sequences'):
+                # Keras re-aligns the backward sequence before merging
+                backward = backward[:, ::-1, :]
+            return _merge(forward, backward, layer['merge_mode'])
+
+        raise ValueError(f"Unsupported layer type in LSTM head: {layer_type}")
+
+
+def load_lstm_head(keras_path, npz_path, backend='auto'):
+    """
+    Load the LSTM head with the configured backend
+
+    Args:
+        keras_path (str): Path to the .keras model
+        npz_path (str): Path to the exported .npz head
+        backend (str): "numpy", "keras" or "auto" (NumPy if the .npz exists,
+                       otherwise Keras)
+
+    Returns:
+        Object with a Keras-compatible predict() method
+    """
+    backend = (backend or 'auto').lower()
+
+    if backend in ('numpy', 'auto') and npz_path and os.path.exists(npz_path):
+        return NumpyLSTMHead.load(npz_path)
+
+    if backend == 'numpy':
+        raise FileNotFoundError(f"NumPy LSTM head not found at: {npz_path} (run export_lstm_head.py)")
+
+    # TensorFlow is only imported when the Keras backend is actually used
+    import tensorflow as tf
+    return tf.keras.models.load_model(keras_path)
+
+
+# ============================================
+# EXPORT (requires TensorFlow)
+# ============================================
+
+def _lstm_spec(lstm_layer):
+    """Extract the LSTM settings the NumPy kernel needs"""
+    config = lstm_layer.get_config()
+    return {
+        'units': config['units'],
+        'activation': config.get('activation', 'tanh'),
+        'recurrent_activation': config.get('recurrent_activation', 'sigmoid'),
+        'use_bias': config.get('use_bias', True),
+        'return_sequences': config.get('return_sequences', False),
+        'go_backwards': config.get('go_backwards', False)
+    }
+
+
+def _lstm_weights(lstm_layer, prefix):
+    weights = lstm_layer.get_weights()
+    names = ['kernel', 'recurrent_kernel', 'bias'][:len(weights)]
+    return {f"{prefix}{name}": value for name, value in zip(names, weights)}
+
+
+def export_keras_head(keras_model):
+    """
+    Convert a loaded Keras model into a NumpyLSTMHead
+
+    Args:
+        keras_model: tf.keras model (a linear stack of supported layers)
+
+    Returns:
+        NumpyLSTMHead with the model's weights
+    """
+    import tensorflow as tf
+
+    keras_version = int(str(getattr(tf.keras, '__version__', '2')).split('.')[0])
+
+    input_shape = list(keras_model.input_shape[1:]) if keras_model.input_shape else None
+
+    layers = []
+    weights = {}
+    for index, layer in enumerate(keras_model.layers):
+        layer_type = type(layer).__name__
+        config = layer.get_config()
+        spec = {'type': layer_type, 'name': layer.name}
+
+        if layer_type in IDENTITY_LAYERS or layer_type == 'InputLayer':
+            pass
+        elif layer_type == 'Dense':
+            spec['activation'] = config.get('activation', 'linear')
+            values = layer.get_weights()
+            weights[f"{index}/kernel"] = values[0]
+            if len(values) > 1:
+                weights[f"{index}/bias"] = values[1]
+        elif layer_type == 'Reshape':
+            spec['target_shape'] = list(config['target_shape'])
+        elif layer_type in ('Flatten', 'GlobalAveragePooling1D', 'GlobalMaxPooling1D'):
+            pass
+        elif layer_type in ('BatchNormalization', 'LayerNormalization'):
+            spec['epsilon'] = config.get('epsilon', 1e-3)
+            names = []
+            if config.get('scale', True):
+                names.append('gamma')
+            if config.get('center', True):
+                names.append('beta')
+            if layer_type == 'BatchNormalization':
+                names.extend(['moving_mean', 'moving_variance'])
+            for name, value in zip(names, layer.get_weights()):
+                weights[f"{index}/{name}"] = value
+        elif layer_type == 'LSTM':
+            spec.update(_lstm_spec(layer))
+            weights.update(_lstm_weights(layer, f"{index}/"))
+        elif layer_type == 'Bidirectional' and type(layer.forward_layer).__name__ == 'LSTM':
+            spec['merge_mode'] = config.get('merge_mode', 'concat')
+            spec['forward'] = _lstm_spec(layer.forward_layer)
+            spec['backward'] = _lstm_spec(layer.backward_layer)
+            weights.update(_lstm_weights(layer.forward_layer, f"{index}/forward/"))
+            weights.update(_lstm_weights(layer.backward_layer, f"{index}/backward/"))
+        else:
+            raise ValueError(f"Cannot export layer '{layer.name}' of type {layer_type}")
+
+        layers.append(spec)
+
+    spec = {
+        'format_version': FORMAT_VERSION,
+        'keras_version': keras_version,
+        'input_shape': input_shape,
+        'layers': layers
+    }
+    return NumpyLSTMHead(spec, weights)
+
+
+def parity_error(keras_model, head, samples):
+    """Return the max absolute difference between Keras and NumPy probabilities"""
+    expected = keras_model.predict(samples, verbose=0)
+    actual = head.predict(samples)
+    return float(np.max(np.abs(expected - actual)))
@@ -0,0 +1,101 @@
+"""
+Gunicorn Memory Report
+Shows how much memory the gunicorn master and its workers really use, to
+verify that MODEL_PRELOAD shares the model weights between workers
+
+RSS counts every shared page once per process; PSS divides shared pages
+between the processes mapping them. With preloaded models the workers' RSS
+stays high but their PSS and private memory drop, and the total PSS is far
+below the total RSS.
+
+Usage:
+    python memory_report.py [master_pid]
+
+Without a pid the oldest running gunicorn master is used (Linux only).
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_registry import get_process_memory
+
+
+def read_cmdline(pid):
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            return f.read().replace(b'\0', b' ').decode('utf-8', 'replace').strip()
+    except OSError:
+        return ''
+
+
+def read_parent_pid(pid):
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            # The command name may contain spaces; fields after it are fixed
+            return int(f.read().rsplit(')', 1)[1].split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def find_gunicorn_master():
+    """Oldest gunicorn process whose parent is not gunicorn"""
+    pids = [int(name) for name in os.listdir('/proc') if name.isdigit()]
+    gunicorn = {pid for pid in pids if 'gunicorn' in read_cmdline(pid)}
+    masters = sorted(pid for pid in gunicorn if read_parent_pid(pid) not in gunicorn)
+    return masters[0] if masters else None
+
+
+def find_workers(master_pid):
+    pids = [int(name) for name in os.listdir('/proc') if name.isdigit()]
+    return sorted(pid for pid in pids if read_parent_pid(pid) == master_pid)
+
+
+def main(master_pid):
+    """Print the per-process memory table and totals"""
+    print("=" * 60)
+    print("GUNICORN MEMORY REPORT")
+    print("=" * 60)
+
+    if master_pid is None:
+        print("\n[ERROR] No gunicorn master found (pass its pid)")
+        return False
+
+    workers = find_workers(master_pid)
+    print(f"\nMaster pid {master_pid}, {len(workers)} worker(s)\n")
+    print(f"{'process':<16}{'RSS MB':>10}{'PSS MB':>10}{'shared MB':>12}{'private MB':>12}")
+
+    totals = {'rss_mb': 0.0, 'pss_mb': 0.0, 'shared_mb': 0.0, 'private_mb': 0.0}
+    for role, pid in [('master', master_pid)] + [('worker', pid) for pid in workers]:
+        memory = get_process_memory(pid)
+        if memory is None:
+            print(f"{role} {pid:<9} (smaps_rollup unavailable)")
+            continue
+
+        for key in totals:
+            totals[key] += memory[key]
+        print(f"{role + ' ' + str(pid):<16}{memory['rss_mb']:>10.1f}{memory['pss_mb']:>10.1f}"
+              f"{memory['shared_mb']:>12.1f}{memory['private_mb']:>12.1f}")
+
+    print("-" * 60)
+    print(f"{'total':<16}{totals['rss_mb']:>10.1f}{totals['pss_mb']:>10.1f}"
+          f"{totals['shared_mb']:>12.1f}{totals['private_mb']:>12.1f}")
+
+    if totals['rss_mb']:
+        print(f"\n[OK] Real footprint (total PSS) is {totals['pss_mb'] / totals['rss_mb']:.0%} of total RSS")
+        print(f"[OK] {totals['rss_mb'] - totals['pss_mb']:.1f} MB saved by page sharing")
+
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        pid = int(sys.argv[1]) if len(sys.argv) > 1 else find_gunicorn_master()
+        success = main(pid)
+        sys.exit(0 if success else 1)
+    except Exception as e:
+        print(f"\n[FATAL ERROR]: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
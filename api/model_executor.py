@@ -0,0 +1,294 @@
+"""
+Concurrent Model Execution
+
+Runs RoBERTa and MentalBERT-LSTM side by side for the dual-model paths
+(/api/predict/both and CSV analysis) instead of one after the other, so
+latency approaches the slower model instead of the sum of both.
+
+PyTorch (and ONNX Runtime) release the GIL inside their kernels, so two
+threads really do run both encoders at once. To keep the two forward passes
+from fighting over cores, thread_budget halves each worker's intra-op pools
+while dual-model concurrency is enabled.
+
+The executor is bounded: when all its slots are busy the call runs the
+models sequentially on the request thread instead of queueing.
+
+Cascade mode (DUAL_MODEL_MODE=cascade, or "mode": "cascade" per request)
+runs only CASCADE_FIRST_MODEL and calls the second model when the first is
+unsure: confidence below CASCADE_CONFIDENCE_THRESHOLD, top-two score margin
+below CASCADE_MIN_MARGIN, more than CASCADE_MAX_WORDS words, or an error.
+"""
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config_manager import get_config
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+
+# ============================================
+# BOUNDED EXECUTOR
+# ============================================
+
+class BoundedExecutor:
+    """Thread pool that runs work inline instead of queueing when saturated"""
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+        self._stats = {'concurrent_runs': 0, 'sequential_runs': 0, 'errors': 0}
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='model-exec')
+        return self._pool
+
+    def run_all(self, calls):
+        """
+        Run calls concurrently and return their results in order
+
+        The first call is offloaded to the pool when a slot is free; the
+        rest run on the calling thread. Exceptions are re-raised after all
+        calls have finished.
+
+        Args:
+            calls (list): (function, args tuple) pairs
+
+        Returns:
+            List of results, one per call
+        """
+        offloaded = None
+        if len(calls) > 1 and self._slots.acquire(blocking=False):
+            fn, args = calls[0]
+            try:
+                offloaded = self._get_pool().submit(fn, *args)
+            except RuntimeError:
+                self._slots.release()
+                offloaded = None
+            else:
+                offloaded.add_done_callback(lambda _: self._slots.release())
+
+        results = []
+        first_error = None
+        start = 1 if offloaded is not None else 0
+        for fn, args in calls[start:]:
+            try:
+                results.append(fn(*args))
+            except Exception as e:
+                first_error = first_error or e
+                results.append(None)
+
+        if offloaded is not None:
+            self._stats['concurrent_runs'] += 1
+            try:
+                results.insert(0, offloaded.result())
+            except Exception as e:
+                first_error = e
+        else:
+            self._stats['sequential_runs'] += 1
+
+        if first_error is not None:
+            self._stats['errors'] += 1
+            raise first_error
+        return results
+
+    def get_stats(self):
+        return dict(self._stats, max_workers=self.max_workers)
+
+
+# Global executor (created lazily, re-created after fork)
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    """Pool threads do not survive a fork; the child builds its own executor"""
+    global _executor, _executor_lock, _cascade_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+    _cascade_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = BoundedExecutor(config.MODEL_EXECUTOR_WORKERS)
+    return _executor
+
+
+def run_both(roberta_fn, lstm_fn, *args):
+    """
+    Run the RoBERTa and LSTM prediction functions on the same arguments
+
+    Concurrently when DUAL_MODEL_CONCURRENCY is enabled, otherwise one
+    after the other.
+
+    Returns:
+        (roberta result, lstm result)
+    """
+    if not config.DUAL_MODEL_CONCURRENCY:
+        return roberta_fn(*args), lstm_fn(*args)
+
+    roberta_result, lstm_result = get_executor().run_all([(roberta_fn, args), (lstm_fn, args)])
+    return roberta_result, lstm_result
+
+
+# ============================================
+# CASCADE MODE
+# ============================================
+
+DUAL_MODEL_MODES = ('both', 'cascade')
+
+_cascade_stats = {'texts': 0, 'escalated': 0, 'reasons': {}}
+_cascade_lock = threading.Lock()
+
+
+def escalation_reason(result, text):
+    """
+    Why the second model is needed for a text, or None if the first model's
+    result is clear-cut
+
+    Args:
+        result (dict): First model's prediction (confidence, scores)
+        text (str): Input text
+    """
+    if not isinstance(result, dict) or 'error' in result:
+        return 'first_model_error'
+    if len(text.split()) > config.CASCADE_MAX_WORDS:
+        return 'long_text'
+    if float(result.get('confidence', 0.0)) < config.CASCADE_CONFIDENCE_THRESHOLD:
+        return 'low_confidence'
+
+    scores = sorted((float(score) for score in (result.get('scores') or {}).values()), reverse=True)
+    if len(scores) >= 2 and scores[0] - scores[1] < config.CASCADE_MIN_MARGIN:
+        return 'ambiguous'
+    return None
+
+
+def _record_cascade(reasons):
+    with _cascade_lock:
+        _cascade_stats['texts'] += len(reasons)
+        for reason in reasons:
+            if reason is not None:
+                _cascade_stats['escalated'] += 1
+                _cascade_stats['reasons'][reason] = _cascade_stats['reasons'].get(reason, 0) + 1
+
+
+def models_agree(roberta_result, lstm_result):
+    """True/False when both models ran, None when only one did"""
+    if roberta_result is None or lstm_result is None:
+        return None
+    return roberta_result.get('sentiment') == lstm_result.get('sentiment')
+
+
+def _run_info(mode, first, reason):
+    if mode == 'both':
+        return {'mode': 'both', 'models_run': ['roberta', 'lstm'], 'escalation_reason': None}
+
+    second = 'lstm' if first == 'roberta' else 'roberta'
+    return {
+        'mode': 'cascade',
+        'models_run': [first, second] if reason else [first],
+        'escalation_reason': reason
+    }
+
+
+def predict_dual(roberta_fn, lstm_fn, text, mode=None):
+    """
+    Predict one text with both models, or with the cascade
+
+    Args:
+        roberta_fn, lstm_fn: Single-text prediction functions
+        text (str): Input text
+        mode (str): "both" or "cascade" (default: DUAL_MODEL_MODE)
+
+    Returns:
+        (roberta result, lstm result, run info); a model that did not run
+        has None as its result
+    """
+    mode = mode or config.DUAL_MODEL_MODE
+    if mode == 'both':
+        roberta_result, lstm_result = run_both(roberta_fn, lstm_fn, text)
+        return roberta_result, lstm_result, _run_info('both', None, None)
+
+    first = config.CASCADE_FIRST_MODEL
+    first_fn, second_fn = (roberta_fn, lstm_fn) if first == 'roberta' else (lstm_fn, roberta_fn)
+
+    first_result = first_fn(text)
+    reason = escalation_reason(first_result, text)
+    second_result = second_fn(text) if reason else None
+    _record_cascade([reason])
+
+    if first == 'roberta':
+        return first_result, second_result, _run_info('cascade', first, reason)
+    return second_result, first_result, _run_info('cascade', first, reason)
+
+
+def predict_dual_batch(roberta_batch_fn, lstm_batch_fn, texts, mode=None):
+    """
+    Batch version of predict_dual: in cascade mode the second model gets one
+    batch with only the texts the first model was unsure about
+
+    Returns:
+        (roberta results, lstm results, run infos), one entry per text
+    """
+    mode = mode or config.DUAL_MODEL_MODE
+    if mode == 'both':
+        roberta_results, lstm_results = run_both(roberta_batch_fn, lstm_batch_fn, texts)
+        return roberta_results, lstm_results, [_run_info('both', None, None) for _ in texts]
+
+    first = config.CASCADE_FIRST_MODEL
+    first_fn, second_fn = (roberta_batch_fn, lstm_batch_fn) if first == 'roberta' else (lstm_batch_fn, roberta_batch_fn)
+
+    first_results = first_fn(texts)
+    reasons = [escalation_reason(result, text) for result, text in zip(first_results, texts)]
+    escalated = [i for i, reason in enumerate(reasons) if reason]
+
+    second_results = [None] * len(texts)
+    if escalated:
+        for i, result in zip(escalated, second_fn([texts[i] for i in escalated])):
+            second_results[i] = result
+    _record_cascade(reasons)
+
+    infos = [_run_info('cascade', first, reason) for reason in reasons]
+    if first == 'roberta':
+        return first_results, second_results, infos
+    return second_results, first_results, infos
+
+
+def get_cascade_stats():
+    """Share of texts that needed the second model, by reason"""
+    with _cascade_lock:
+        texts = _cascade_stats['texts']
+        return {
+            'default_mode': config.DUAL_MODEL_MODE,
+            'first_model': config.CASCADE_FIRST_MODEL,
+            'texts': texts,
+            'escalated': _cascade_stats['escalated'],
+            'escalation_rate': round(_cascade_stats['escalated'] / texts, 3) if texts else 0.0,
+            'reasons': dict(_cascade_stats['reasons'])
+        }
+
+
+def get_executor_stats():
+    """Get dual-model executor and cascade statistics"""
+    if not config.DUAL_MODEL_CONCURRENCY:
+        stats = {'enabled': False}
+    else:
+        stats = dict(get_executor().get_stats(), enabled=True)
+    stats['cascade'] = get_cascade_stats()
+    return stats
@@ -0,0 +1,409 @@
+"""
+Shared Model Registry
+
+Single place where model weights are loaded. Every prediction path
+(app.py, routes/predictions.py, simple_model.py, biobert_lstm_model.py and
+auth_api.py) obtains its models from here, so each process loads each model
+exactly once, on first use.
+
+Registered models:
+- roberta:    (RobertaForSequenceClassification or OnnxEncoder, tokenizer)
+- mentalbert: (tokenizer, AutoModel or OnnxEncoder) - kept on CPU
+PyTorch encoders may be INT8-quantized or run under bfloat16 autocast
+(ENCODER_PRECISION, see precision.py).
+- lstm_head:  NumpyLSTMHead or Keras model
+
+For each model the registry records load time, the process RSS growth during
+the load, the size of the weights and how they were loaded (safetensors
+memory map or pytorch_model.bin, see model_weights.py), reported in
+/api/health.
+
+Loaders import torch/transformers/TensorFlow themselves, so importing this
+module is cheap. With ML_ENABLED=False the registry refuses to load anything.
+
+With MODEL_PRELOAD (see gunicorn.conf.py) preload_models() loads everything
+in the gunicorn master; workers then share the weight pages copy-on-write.
+"""
+import gc
+import os
+import time
+import logging
+import threading
+
+import inference_client
+import long_text
+import model_weights
+import precision
+import prediction_cache
+import thread_budget
+import tokenization
+from config_manager import get_config
+from lstm_head import NumpyLSTMHead, load_lstm_head
+from onnx_backend import OnnxEncoder, load_onnx_encoder
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+
+# ============================================
+# MEMORY ACCOUNTING
+# ============================================
+
+def get_process_rss_mb():
+    """Current resident set size of this process in MB (None if unavailable)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+
+    try:
+        import resource
+        # ru_maxrss is the peak RSS (KB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / 1024 / (1024 if os.uname().sysname == 'Darwin' else 1), 1)
+    except Exception:
+        return None
+
+
+def get_process_memory(pid='self'):
+    """
+    Memory breakdown of a process in MB from /proc/<pid>/smaps_rollup (Linux)
+
+    PSS splits shared pages between the processes mapping them, so the sum of
+    PSS over gunicorn workers is their real combined footprint while the sum
+    of RSS counts shared model weights once per worker.
+
+    Returns:
+        dict with rss_mb, pss_mb, shared_mb, private_mb (None if unavailable)
+    """
+    values = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    values[parts[0].rstrip(':')] = int(parts[1])
+    except OSError:
+        return None
+
+    def to_mb(*keys):
+        return round(sum(values.get(key, 0) for key in keys) / 1024, 1)
+
+    return {
+        'rss_mb': to_mb('Rss'),
+        'pss_mb': to_mb('Pss'),
+        'shared_mb': to_mb('Shared_Clean', 'Shared_Dirty'),
+        'private_mb': to_mb('Private_Clean', 'Private_Dirty')
+    }
+
+
+def _packed_weights(module):
+    """INT8 weights of dynamically quantized Linear layers (neither parameters nor buffers)"""
+    if not hasattr(module, 'modules'):
+        return []
+    tensors = []
+    for submodule in module.modules():
+        packed = getattr(submodule, '_packed_params', None)
+        if hasattr(packed, '_weight_bias'):
+            tensors.extend(tensor for tensor in packed._weight_bias() if tensor is not None)
+    return tensors
+
+
+def estimate_weights_bytes(obj):
+    """
+    Size of a model's weights in bytes
+
+    Handles torch modules (parameters + buffers), ONNX sessions (file size),
+    the NumPy LSTM head, Keras models and tuples of those. Tokenizers and
+    other objects count as 0.
+    """
+    if obj is None:
+        return 0
+    if isinstance(obj, (tuple, list)):
+        return sum(estimate_weights_bytes(item) for item in obj)
+    if isinstance(obj, OnnxEncoder):
+        return os.path.getsize(obj.onnx_path)
+    if isinstance(obj, NumpyLSTMHead):
+        return sum(array.nbytes for array in obj.weights.values())
+    if hasattr(obj, 'parameters') and hasattr(obj, 'buffers'):
+        tensors = list(obj.parameters()) + list(obj.buffers()) + _packed_weights(obj)
+        return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+    if hasattr(obj, 'count_params'):
+        return int(obj.count_params()) * 4  # Keras float32 weights
+    return 0
+
+
+# ============================================
+# REGISTRY
+# ============================================
+
+class ModelRegistry:
+    """Lazily loads each registered model once per process"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._loaders = {}
+        self._models = {}
+        self._info = {}
+        self._locks = {}
+        self._registry_lock = threading.Lock()
+
+    def register(self, name, loader):
+        """
+        Register a loader for a model name
+
+        Args:
+            name (str): Model name
+            loader: Function with no arguments returning the loaded model
+                (raises on failure)
+        """
+        with self._registry_lock:
+            self._loaders[name] = loader
+            self._locks[name] = threading.Lock()
+            self._info[name] = {'loaded': False, 'error': None}
+
+    def get(self, name):
+        """
+        Return the loaded model, loading it on first use
+
+        Concurrent first requests wait for a single load. A failed load is
+        remembered and not retried until reload() is called, so a missing
+        model does not cost a load attempt on every request.
+
+        Returns:
+            The model, or None if it could not be loaded
+        """
+        if name in self._models:
+            return self._models[name]
+
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model: {name}")
+
+        with self._locks[name]:
+            if name in self._models:
+                return self._models[name]
+            if self._info[name]['error'] is not None:
+                return None
+            return self._load(name)
+
+    def _load(self, name):
+        if not self.enabled:
+            self._info[name] = {'loaded': False, 'error': 'ML disabled in this process (ML_ENABLED=False)'}
+            return None
+
+        rss_before = get_process_rss_mb()
+        start = time.perf_counter()
+
+        try:
+            model = self._loaders[name]()
+        except Exception as e:
+            logger.error(f"Error loading model '{name}': {e}")
+            self._info[name] = {'loaded': False, 'error': str(e)}
+            return None
+
+        load_time = time.perf_counter() - start
+        rss_after = get_process_rss_mb()
+
+        self._info[name] = {
+            'loaded': True,
+            'error': None,
+            'type': type(model[0] if isinstance(model, tuple) else model).__name__,
+            'load_time_s': round(load_time, 3),
+            'weights_mb': round(estimate_weights_bytes(model) / 1024 / 1024, 1),
+            'rss_delta_mb': round(rss_after - rss_before, 1) if rss_before is not None and rss_after is not None else None,
+            'rss_mb': rss_after,
+            'pid': os.getpid()
+        }
+        self._info[name].update(model_weights.get_load_info(name))
+        self._models[name] = model
+
+        info = self._info[name]
+        details = f"{info['weights_mb']} MB weights"
+        if 'weights_format' in info:
+            details += f", {info['weights_format']}{' (mmap)' if info['mmap'] else ''}"
+        logger.info(f"Model '{name}' loaded in {load_time:.2f}s ({details}; "
+                    f"RSS {rss_after} MB, +{info['rss_delta_mb']} MB)")
+        return model
+
+    def peek(self, name):
+        """Return the model if it is already loaded, without loading it"""
+        return self._models.get(name)
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def reload(self, name):
+        """Drop a model (and any remembered load failure) and load it again"""
+        with self._locks[name]:
+            self._models.pop(name, None)
+            self._info[name] = {'loaded': False, 'error': None}
+            return self._load(name)
+
+    def names(self):
+        return list(self._loaders)
+
+    def get_report(self):
+        """Per-model load time and memory footprint for /api/health"""
+        return {
+            'pid': os.getpid(),
+            'enabled': self.enabled,
+            'preloaded': self.preloaded_in_parent(),
+            'process_rss_mb': get_process_rss_mb(),
+            'process_memory': get_process_memory(),
+            'models': {name: dict(info) for name, info in self._info.items()}
+        }
+
+    def preloaded_in_parent(self):
+        """True if the loaded models were inherited from the process that forked this one"""
+        return any(info.get('pid') not in (None, os.getpid()) for info in self._info.values())
+
+    def _reset_locks_after_fork(self):
+        # A lock held by another thread at fork time would never be released in the child
+        self._registry_lock = threading.Lock()
+        self._locks = {name: threading.Lock() for name in self._loaders}
+
+
+# ============================================
+# MODEL LOADERS
+# ============================================
+
+def _get_device():
+    import torch
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+
+def _load_roberta():
+    """Fine-tuned RoBERTa classifier and its tokenizer"""
+    thread_budget.apply_layout()
+
+    from transformers import RobertaForSequenceClassification
+
+    tokenizer = tokenization.load_tokenizer('roberta', config.ROBERTA_TOKENIZER_PATH)
+    if config.ENCODER_BACKEND == 'onnx':
+        model = load_onnx_encoder('roberta', config.ONNX_MODEL_DIR, config.ONNX_QUANTIZED,
+                                  intra_op_threads=thread_budget.get_intra_op_threads())
+    else:
+        model = model_weights.load_pretrained('roberta', RobertaForSequenceClassification, config.ROBERTA_MODEL_PATH)
+    model.eval()
+    device = _get_device()
+    model.to(device)
+    if config.ENCODER_BACKEND != 'onnx':
+        model = precision.apply_precision('roberta', model, tokenizer, 'logits', device=device.type)
+
+    # Cached predictions are only valid for these exact weights and settings
+    prediction_cache.register_model(
+        'roberta',
+        [config.ROBERTA_MODEL_PATH, config.ROBERTA_TOKENIZER_PATH],
+        runtime=f"{config.ENCODER_BACKEND}:{config.ONNX_QUANTIZED}:{long_text.get_runtime_tag()}:"
+                f"{type(tokenizer).__name__}:{precision.get_active_precision('roberta')}"
+    )
+
+    return model, tokenizer
+
+
+def _load_mentalbert():
+    """Fine-tuned MentalBERT encoder and its tokenizer (CPU)"""
+    thread_budget.apply_layout()
+
+    from transformers import AutoModel
+
+    if not os.path.exists(config.MENTALBERT_MODEL_PATH):
+        raise FileNotFoundError(f"MentalBERT model not found at: {config.MENTALBERT_MODEL_PATH}")
+
+    tokenizer = tokenization.load_tokenizer('mentalbert', config.MENTALBERT_MODEL_PATH)
+    if config.ENCODER_BACKEND == 'onnx':
+        encoder = load_onnx_encoder('mentalbert', config.ONNX_MODEL_DIR, config.ONNX_QUANTIZED,
+                                    intra_op_threads=thread_budget.get_intra_op_threads())
+    else:
+        encoder = model_weights.load_pretrained('mentalbert', AutoModel, config.MENTALBERT_MODEL_PATH)
+    encoder.eval()
+    if config.ENCODER_BACKEND != 'onnx':
+        encoder = precision.apply_precision('mentalbert', encoder, tokenizer, 'last_hidden_state', max_length=300)
+
+    return tokenizer, encoder
+
+
+def _load_lstm_head():
+    """LSTM classification head (NumPy engine when an exported .npz is available)"""
+    thread_budget.apply_layout()
+
+    if not os.path.exists(config.LSTM_MODEL_PATH) and not os.path.exists(config.LSTM_HEAD_NPZ_PATH):
+        raise FileNotFoundError(f"LSTM model not found at: {config.LSTM_MODEL_PATH}")
+
+    return load_lstm_head(config.LSTM_MODEL_PATH, config.LSTM_HEAD_NPZ_PATH, config.LSTM_HEAD_BACKEND)
+
+
+# Global registry instance
+registry = ModelRegistry(enabled=config.ML_ENABLED)
+registry.register('roberta', _load_roberta)
+registry.register('mentalbert', _load_mentalbert)
+registry.register('lstm_head', _load_lstm_head)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=registry._reset_locks_after_fork)
+
+
+def _make_read_only(model):
+    """Disable gradients / writes on loaded weights so forked workers never dirty them"""
+    if isinstance(model, (tuple, list)):
+        for item in model:
+            _make_read_only(item)
+    elif isinstance(model, NumpyLSTMHead):
+        for array in model.weights.values():
+            array.setflags(write=False)
+    elif hasattr(model, 'parameters') and hasattr(model, 'requires_grad_'):
+        model.requires_grad_(False)
+
+
+def preload_models(names=None):
+    """
+    Load models now instead of on first request (gunicorn master, before fork)
+
+    Weights are made read-only and the objects created so far are moved out of
+    the garbage collector's view (gc.freeze), so collections in the workers do
+    not write to, and un-share, the pages holding them.
+
+    Returns:
+        dict of model name -> loaded (bool)
+    """
+    status = {}
+    for name in names or registry.names():
+        model = registry.get(name)
+        if model is not None:
+            _make_read_only(model)
+        status[name] = model is not None
+
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+
+    return status
+
+
+def predictions_available():
+    """True when this process can serve predictions (local models or a model server)"""
+    return config.ML_ENABLED or inference_client.is_enabled()
+
+
+def get_model(name):
+    """Get a model from the global registry, loading it on first use"""
+    return registry.get(name)
+
+
+def get_registry_report():
+    """Get per-model load time and memory footprint"""
+    return registry.get_report()
+
+
+def get_loaded_encoders():
+    """Already-loaded encoder modules by name (None if not loaded), for get_backend_info"""
+    roberta = registry.peek('roberta')
+    mentalbert = registry.peek('mentalbert')
+    return {
+        'roberta': roberta[0] if roberta else None,
+        'mentalbert': mentalbert[1] if mentalbert else None
+    }
@@ -0,0 +1,189 @@
+"""
+Standalone Model Server
+Owns the models and serves predictions to the web workers over a Unix domain
+socket or TCP (framing in inference_client.py)
+
+The web tier (gunicorn) and the inference tier can then be sized and pinned
+to cores independently, e.g.:
+
+    taskset -c 0-3 python api/model_server.py unix:/tmp/moodtracker-inference.sock
+    INFERENCE_SERVER_ADDRESS=unix:/tmp/moodtracker-inference.sock \\
+        taskset -c 4-7 gunicorn --config api/gunicorn.conf.py
+
+Single-text requests from all web workers go through the micro-batcher, so
+concurrent requests share forward passes; multi-text requests (CSV chunks)
+run as one batch. The prediction cache and model registry live here.
+
+Usage:
+    python model_server.py [address]    (default: INFERENCE_SERVER_ADDRESS)
+"""
+import os
+import sys
+import socket
+import logging
+import socketserver
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import batching
+import inference_client
+import model_registry
+import precision
+import prediction_cache
+import single_flight
+import tokenization
+import warmup
+from config_manager import get_config
+from inference_client import (
+    OP_PING, OP_PREDICT, OP_STATS, STATUS_OK, STATUS_ERROR,
+    send_frame, recv_frame, parse_address
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_model_handlers():
+    """Model name -> (single-text function, batch function)"""
+    import predictors
+    import simple_model
+
+    return {
+        'roberta': (predictors.predict_roberta_sentiment, predictors.predict_roberta_sentiment_chunk),
+        'mentalbert_lstm': (simple_model.predict_with_simple_model, simple_model.predict_with_simple_model_batch),
+    }
+
+
+class InferenceRequestHandler(socketserver.BaseRequestHandler):
+    """Serves frames on one persistent client connection until it closes"""
+
+    def handle(self):
+        if self.server.address_family == socket.AF_INET:
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        while True:
+            try:
+                op, payload = recv_frame(self.request)
+            except (OSError, ConnectionError, ValueError) as e:
+                logger.warning(f"Dropping client connection: {e}")
+                return
+
+            if op is None:
+                return
+
+            try:
+                send_frame(self.request, STATUS_OK, self.dispatch(op, payload))
+            except (OSError, ConnectionError):
+                return
+            except Exception as e:
+                logger.error(f"Model server request failed: {e}")
+                try:
+                    send_frame(self.request, STATUS_ERROR, {'error': str(e)})
+                except OSError:
+                    return
+
+    def dispatch(self, op, payload):
+        if op == OP_PING:
+            return {'pid': os.getpid()}
+
+        if op == OP_STATS:
+            return {
+                'pid': os.getpid(),
+                'model_registry': model_registry.get_registry_report(),
+                'inference_batching': batching.get_batching_stats(),
+                'prediction_cache': prediction_cache.get_cache_stats(),
+                'single_flight': single_flight.get_single_flight_stats(),
+                'tokenization': tokenization.get_stats(),
+                'precision': precision.get_precision_report(),
+                'warmup': warmup.get_status()
+            }
+
+        if op == OP_PREDICT:
+            model_name = payload.get('model')
+            texts = payload.get('texts') or []
+            if model_name not in self.server.handlers:
+                raise ValueError(f"Unknown model: {model_name}")
+
+            predict_one, predict_batch = self.server.handlers[model_name]
+            results = [predict_one(texts[0])] if len(texts) == 1 else predict_batch(texts)
+            return {'results': results}
+
+        raise ValueError(f"Unknown op: {op}")
+
+
+class ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def create_server(address, handlers):
+    """Bind a threaded server on a unix: or tcp: address"""
+    family, sock_address = parse_address(address)
+
+    if family == socket.AF_UNIX:
+        if os.path.exists(sock_address):
+            os.unlink(sock_address)  # Stale socket from a previous run
+        server = ThreadingUnixServer(sock_address, InferenceRequestHandler)
+    else:
+        server = ThreadingTCPServer(sock_address, InferenceRequestHandler)
+
+    server.handlers = handlers
+    return server
+
+
+def main(address):
+    """Load the models and serve until interrupted"""
+    print("=" * 60)
+    print("MOODTRACKER MODEL SERVER")
+    print("=" * 60)
+
+    # This process owns the models - never forward to another server
+    inference_client.run_models_locally()
+
+    print("\n[1/3] Loading models...")
+    status = model_registry.preload_models()
+    for name, loaded in status.items():
+        print(f"  [{'OK' if loaded else 'FAILED'}] {name}")
+
+    print("\n[2/3] Warming up models...")
+    warmup.run_warmup()
+    for name, info in warmup.get_status()['models'].items():
+        print(f"  [{'OK' if info['warmed'] else 'FAILED'}] {name}: {info.get('warmup_time_s', info.get('error'))}")
+
+    server = create_server(address, get_model_handlers())
+    print(f"\n[3/3] Serving on {address} (pid {os.getpid()})")
+    print("=" * 60)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+        family, sock_address = parse_address(address)
+        if family == socket.AF_UNIX and os.path.exists(sock_address):
+            os.unlink(sock_address)
+
+    return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    address = sys.argv[1] if len(sys.argv) > 1 else get_config().INFERENCE_SERVER_ADDRESS
+
+    if not address:
+        print("No address given and INFERENCE_SERVER_ADDRESS is not set")
+        sys.exit(1)
+
+    try:
+        success = main(address)
+        sys.exit(0 if success else 1)
+    except Exception as e:
+        print(f"\n[FATAL ERROR]: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,171 @@
+"""
+Low-RAM Model Weight Loading
+
+from_pretrained on a pytorch_model.bin first builds the model with randomly
+initialized weights and then torch.load()s a second full copy of the weights
+to copy into it, so every worker briefly needs about twice the model size.
+
+Model directories converted to safetensors (convert_safetensors.py) are
+loaded instead from a memory map of model.safetensors: the tensors handed to
+from_pretrained are views into a private (copy-on-write) mapping of the
+file, and with low_cpu_mem_usage (requires accelerate) the model is built
+on the meta device and takes those tensors as its parameters. The weights
+then live in the OS page cache - loaded from disk once, shared by every
+process that maps the file, and never copied unless written to.
+
+Directories without model.safetensors load as before (with
+low_cpu_mem_usage when accelerate is installed). MODEL_WEIGHTS_MMAP=False
+reads safetensors files into private memory instead of mapping them.
+"""
+import os
+import json
+import struct
+import logging
+import importlib.util
+
+from config_manager import get_config
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+SAFETENSORS_FILE = 'model.safetensors'
+LEGACY_WEIGHTS_FILE = 'pytorch_model.bin'
+
+# safetensors dtype -> torch dtype name
+SAFETENSORS_DTYPES = {
+    'F64': 'float64', 'F32': 'float32', 'F16': 'float16', 'BF16': 'bfloat16',
+    'I64': 'int64', 'I32': 'int32', 'I16': 'int16', 'I8': 'int8', 'U8': 'uint8', 'BOOL': 'bool'
+}
+
+# Model name -> how its weights were loaded
+_load_info = {}
+
+
+def get_safetensors_path(model_dir):
+    """model.safetensors of a model directory, or None if it has not been converted"""
+    path = os.path.join(model_dir, SAFETENSORS_FILE)
+    return path if os.path.exists(path) else None
+
+
+def read_safetensors_header(path):
+    """
+    Parse the header of a .safetensors file
+
+    Returns:
+        (offset of the data section, dict of tensor name -> {dtype, shape, data_offsets})
+    """
+    with open(path, 'rb') as f:
+        header_size = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(header_size))
+    header.pop('__metadata__', None)
+    return 8 + header_size, header
+
+
+def load_mmap_state_dict(path):
+    """
+    State dict whose tensors are views into a memory map of a .safetensors file
+
+    The mapping is private: pages come from the shared page cache and are only
+    copied if a tensor is written to. Tensors whose data is not aligned to
+    their element size are copied.
+    """
+    import torch
+
+    data_start, header = read_safetensors_header(path)
+    storage = torch.UntypedStorage.from_file(path, shared=False, nbytes=os.path.getsize(path))
+
+    state_dict = {}
+    for name, entry in header.items():
+        dtype = getattr(torch, SAFETENSORS_DTYPES[entry['dtype']])
+        start, end = entry['data_offsets']
+        offset = data_start + start
+        element_size = torch.empty((), dtype=dtype).element_size()
+
+        if offset % element_size == 0:
+            tensor = torch.empty((0,), dtype=dtype).set_(storage, offset // element_size, entry['shape'])
+        else:
+            raw = torch.empty((0,), dtype=torch.uint8).set_(storage, offset, (end - start,))
+            tensor = raw.clone().view(dtype).reshape(entry['shape'])
+        state_dict[name] = tensor
+
+    return state_dict
+
+
+def load_pretrained(name, model_class, model_dir):
+    """
+    from_pretrained with the lowest peak memory available
+
+    Args:
+        name (str): Model name for the load report, e.g. "roberta"
+        model_class: HuggingFace model class
+        model_dir (str): Fine-tuned model directory
+
+    Returns:
+        Loaded model
+    """
+    kwargs = {}
+    info = {'weights_format': 'pytorch_bin', 'mmap': False, 'low_cpu_mem_usage': False}
+
+    if importlib.util.find_spec('accelerate') is not None:
+        kwargs['low_cpu_mem_usage'] = True
+        info['low_cpu_mem_usage'] = True
+
+    safetensors_path = get_safetensors_path(model_dir)
+    if safetensors_path is not None:
+        info['weights_format'] = 'safetensors'
+        if config.MODEL_WEIGHTS_MMAP:
+            kwargs['state_dict'] = load_mmap_state_dict(safetensors_path)
+            info['mmap'] = True
+        else:
+            kwargs['use_safetensors'] = True
+    else:
+        logger.info(f"{name}: no {SAFETENSORS_FILE} in {model_dir} - run convert_safetensors.py for mmap loading")
+
+    model = model_class.from_pretrained(model_dir, **kwargs)
+    _load_info[name] = info
+    return model
+
+
+def get_load_info(name):
+    """How a model's weights were loaded (empty for models not loaded through here)"""
+    return dict(_load_info.get(name, {}))
+
+
+# ============================================
+# CONVERSION (requires torch + safetensors)
+# ============================================
+
+def convert_model_dir(model_class, model_dir, remove_legacy=False):
+    """
+    Write model.safetensors next to pytorch_model.bin and check that it
+    holds the same tensors
+
+    Args:
+        model_class: HuggingFace model class
+        model_dir (str): Fine-tuned model directory
+        remove_legacy (bool): Delete pytorch_model.bin afterwards
+
+    Returns:
+        dict with the safetensors path, size and number of tensors
+    """
+    import torch
+
+    model = model_class.from_pretrained(model_dir)
+    model.save_pretrained(model_dir, safe_serialization=True)
+
+    path = get_safetensors_path(model_dir)
+    if path is None:
+        raise RuntimeError(f"save_pretrained did not write {SAFETENSORS_FILE} (sharded checkpoints are not supported)")
+
+    expected = model.state_dict()
+    converted = load_mmap_state_dict(path)
+    for key, tensor in converted.items():
+        if key not in expected or not torch.equal(expected[key], tensor):
+            raise RuntimeError(f"Converted tensor '{key}' does not match the original weights")
+
+    legacy_path = os.path.join(model_dir, LEGACY_WEIGHTS_FILE)
+    if remove_legacy and os.path.exists(legacy_path):
+        os.remove(legacy_path)
+
+    return {'path': path, 'size_mb': round(os.path.getsize(path) / 1024 / 1024, 1), 'tensors': len(converted)}
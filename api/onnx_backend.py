@@ -0,0 +1,257 @@
+"""
+ONNX Runtime Encoder Backend
+
+Runs the fine-tuned RoBERTa classifier and the MentalBERT encoder through
+ONNX Runtime instead of eager PyTorch, optionally with INT8 dynamic
+quantization. Models are exported once with export_onnx.py.
+
+OnnxEncoder is call-compatible with the HuggingFace modules it replaces:
+model(**inputs) returns an object with .logits (RoBERTa) or
+.last_hidden_state (MentalBERT) as torch tensors. predict_roberta_sentiment
+and extract_embedding therefore work unchanged with either backend.
+
+Selected via config_manager.BaseConfig:
+- ENCODER_BACKEND: "pytorch" (default) or "onnx"
+- ONNX_MODEL_DIR: directory holding the exported .onnx files
+- ONNX_QUANTIZED: use the INT8 dynamically quantized export
+"""
+import os
+import json
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Model name -> (export task, output name)
+ENCODERS = {
+    'roberta': ('sequence-classification', 'logits'),
+    'mentalbert': ('feature-extraction', 'last_hidden_state'),
+}
+
+# Reference texts used to measure parity between the PyTorch and ONNX outputs
+REFERENCE_TEXTS = [
+    "I feel really happy and excited about life!",
+    "I'm struggling with depression and anxiety.",
+    "Today was an okay day, nothing special.",
+    "I can't sleep and everything feels overwhelming lately.",
+    "Had a great workout and dinner with friends.",
+    "Work was stressful but I managed to finish my project on time.",
+    "I feel lonely even when I'm surrounded by people.",
+    "The weather is cloudy.",
+]
+
+
+def get_onnx_path(name, model_dir, quantized=False):
+    """Return the .onnx file path for a model name"""
+    suffix = '.int8.onnx' if quantized else '.onnx'
+    return os.path.join(model_dir, f"{name}{suffix}")
+
+
+def get_parity_report_path(onnx_path):
+    """Parity reports are stored next to the exported model"""
+    return onnx_path + '.parity.json'
+
+
+class _EncoderOutput:
+    """Mimics the HuggingFace ModelOutput attributes used by the prediction code"""
+
+    def __init__(self, **outputs):
+        self.__dict__.update(outputs)
+
+
+class OnnxEncoder:
+    """ONNX Runtime session with the call interface of a HuggingFace model"""
+
+    def __init__(self, onnx_path, output_name, session_options=None, intra_op_threads=None):
+        import onnxruntime as ort
+
+        if not os.path.exists(onnx_path):
+            raise FileNotFoundError(f"ONNX model not found at: {onnx_path} (run export_onnx.py)")
+
+        if session_options is None:
+            session_options = ort.SessionOptions()
+            session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if intra_op_threads:
+                session_options.intra_op_num_threads = intra_op_threads
+
+        self.onnx_path = onnx_path
+        self.output_name = output_name
+        self.session = ort.InferenceSession(onnx_path, sess_options=session_options,
+                                            providers=['CPUExecutionProvider'])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+        self.parity = self._load_parity_report()
+
+        logger.info(f"ONNX encoder loaded from: {onnx_path}")
+
+    def _load_parity_report(self):
+        report_path = get_parity_report_path(self.onnx_path)
+        if not os.path.exists(report_path):
+            return None
+        with open(report_path) as f:
+            return json.load(f)
+
+    def __call__(self, **inputs):
+        import torch
+
+        feed = {
+            name: value.cpu().numpy().astype(np.int64) if hasattr(value, 'cpu') else np.asarray(value, dtype=np.int64)
+            for name, value in inputs.items()
+            if name in self.input_names
+        }
+        output = self.session.run([self.output_name], feed)[0]
+        return _EncoderOutput(**{self.output_name: torch.from_numpy(output)})
+
+    def eval(self):
+        """No-op (ONNX sessions are always in inference mode)"""
+        return self
+
+    def to(self, device):
+        """No-op (ONNX backend runs on CPU)"""
+        return self
+
+
+def load_onnx_encoder(name, model_dir, quantized=False, intra_op_threads=None):
+    """
+    Load an exported encoder
+
+    Args:
+        name (str): "roberta" or "mentalbert"
+        model_dir (str): Directory holding the exported models
+        quantized (bool): Load the INT8 variant
+        intra_op_threads (int): Session intra-op threads (None = ONNX Runtime default)
+
+    Returns:
+        OnnxEncoder
+    """
+    _, output_name = ENCODERS[name]
+    return OnnxEncoder(get_onnx_path(name, model_dir, quantized), output_name, intra_op_threads=intra_op_threads)
+
+
+def get_backend_info(backend, models):
+    """
+    Describe the active encoder backend for /api/health
+
+    Args:
+        backend (str): Configured ENCODER_BACKEND
+        models (dict): Model name -> loaded model (may be None)
+    """
+    info = {'backend': backend, 'models': {}}
+    for name, model in models.items():
+        if isinstance(model, OnnxEncoder):
+            info['models'][name] = {
+                'runtime': 'onnxruntime',
+                'path': model.onnx_path,
+                'parity': model.parity
+            }
+        elif model is not None:
+            info['models'][name] = {'runtime': 'pytorch'}
+    return info
+
+
+# ============================================
+# EXPORT AND PARITY (requires torch + onnx)
+# ============================================
+
+def export_encoder(name, model_dir, tokenizer_dir, onnx_path, opset=14):
+    """
+    Export a fine-tuned HuggingFace model directory to ONNX
+
+    Args:
+        name (str): "roberta" or "mentalbert"
+        model_dir (str): Fine-tuned model directory
+        tokenizer_dir (str): Tokenizer directory
+        onnx_path (str): Output .onnx file
+        opset (int): ONNX opset version
+    """
+    import torch
+    from transformers import AutoTokenizer, AutoModel, AutoModelForSequenceClassification
+
+    task, output_name = ENCODERS[name]
+    model_class = AutoModelForSequenceClassification if task == 'sequence-classification' else AutoModel
+
+    tokenizer = AutoTokenizer.from_pretrained(tokenizer_dir)
+    model = model_class.from_pretrained(model_dir)
+    model.config.return_dict = False
+    model.eval()
+
+    dummy = dict(tokenizer(REFERENCE_TEXTS[:2], padding=True, return_tensors="pt"))
+    input_names = list(dummy.keys())
+
+    dynamic_axes = {input_name: {0: 'batch', 1: 'sequence'} for input_name in input_names}
+    dynamic_axes[output_name] = {0: 'batch', 1: 'sequence'} if output_name == 'last_hidden_state' else {0: 'batch'}
+
+    os.makedirs(os.path.dirname(os.path.abspath(onnx_path)), exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (dummy,),
+            onnx_path,
+            input_names=input_names,
+            output_names=[output_name],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True
+        )
+
+    logger.info(f"Exported {name} to: {onnx_path}")
+    return onnx_path
+
+
+def quantize_encoder(onnx_path, int8_path):
+    """Apply INT8 dynamic quantization (weights of MatMul/Gemm layers) to an exported model"""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QInt8)
+    logger.info(f"Quantized model written to: {int8_path}")
+    return int8_path
+
+
+def measure_parity(name, model_dir, tokenizer_dir, onnx_path, texts=None):
+    """
+    Compare ONNX outputs to the PyTorch model on a reference text set and
+    write the report next to the .onnx file
+
+    For RoBERTa the softmax probabilities are compared (plus label agreement);
+    for MentalBERT the mean-pooled embeddings are compared.
+
+    Returns:
+        dict with max/mean absolute error
+    """
+    import torch
+    from transformers import AutoTokenizer, AutoModel, AutoModelForSequenceClassification
+
+    texts = texts or REFERENCE_TEXTS
+    task, output_name = ENCODERS[name]
+    model_class = AutoModelForSequenceClassification if task == 'sequence-classification' else AutoModel
+
+    tokenizer = AutoTokenizer.from_pretrained(tokenizer_dir)
+    torch_model = model_class.from_pretrained(model_dir)
+    torch_model.eval()
+    onnx_model = OnnxEncoder(onnx_path, output_name)
+
+    inputs = tokenizer(texts, padding=True, truncation=True, max_length=512, return_tensors="pt")
+    with torch.no_grad():
+        expected = getattr(torch_model(**inputs), output_name)
+    actual = getattr(onnx_model(**inputs), output_name)
+
+    report = {'reference_texts': len(texts), 'quantized': onnx_path.endswith('.int8.onnx')}
+    if output_name == 'logits':
+        expected = torch.softmax(expected, dim=-1)
+        actual = torch.softmax(actual, dim=-1)
+        report['label_agreement'] = float((expected.argmax(-1) == actual.argmax(-1)).float().mean())
+        report['compared'] = 'probabilities'
+    else:
+        mask = inputs['attention_mask'].unsqueeze(-1).float()
+        expected = (expected * mask).sum(1) / mask.sum(1)
+        actual = (actual * mask).sum(1) / mask.sum(1)
+        report['compared'] = 'mean_pooled_embeddings'
+
+    diff = (expected - actual).abs()
+    report['max_abs_error'] = float(diff.max())
+    report['mean_abs_error'] = float(diff.mean())
+
+    with open(get_parity_report_path(onnx_path), 'w') as f:
+        json.dump(report, f, indent=2)
+
+    return report
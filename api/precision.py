@@ -0,0 +1,329 @@
+"""
+Reduced-Precision PyTorch Encoders
+
+Runs the PyTorch RoBERTa classifier and MentalBERT encoder in a cheaper
+numeric precision on CPU, without exporting to another runtime:
+
+- "int8": torch.ao.quantization.quantize_dynamic on the Linear layers (INT8
+  weights, activations quantized on the fly). About a quarter of the weight
+  memory of the Linear layers and faster matmuls on x86/ARM.
+- "bf16": CPU bfloat16 autocast. Only used on CPUs with native bfloat16
+  instructions (AVX512-BF16, AMX or ARM BF16); elsewhere it is emulated and
+  slower than float32.
+- "fp32": unchanged (default).
+
+When a model is loaded the reduced-precision model is compared against the
+float32 model on onnx_backend.REFERENCE_TEXTS (RoBERTa: softmax
+probabilities and label agreement, MentalBERT: cosine similarity of the
+pooled embeddings). If it misses PRECISION_MAX_PROB_ERROR /
+PRECISION_MIN_COSINE, or the CPU cannot run the precision, the float32 model
+is kept and the reason is reported in /api/health.
+
+Selected via config_manager.BaseConfig:
+- ENCODER_PRECISION: "fp32", "bf16" or "int8" (ENCODER_BACKEND=pytorch only)
+- PRECISION_PARITY_CHECK, PRECISION_MAX_PROB_ERROR, PRECISION_MIN_COSINE
+
+Usage (parity and speed of every precision on this machine):
+    python precision.py
+"""
+import sys
+import time
+import logging
+
+from config_manager import get_config
+from onnx_backend import REFERENCE_TEXTS
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+PRECISIONS = ('fp32', 'bf16', 'int8')
+
+# /proc/cpuinfo flags of CPUs with native bfloat16 arithmetic
+BF16_CPU_FLAGS = ('avx512_bf16', 'amx_bf16', 'bf16')
+
+# Quantized kernel engines in order of preference
+QUANTIZED_ENGINES = ('x86', 'fbgemm', 'qnnpack')
+
+# Model name -> precision report of the loaded model
+_reports = {}
+
+
+def parse_cpu_flags(cpuinfo):
+    """CPU feature flags from /proc/cpuinfo text ("flags" on x86, "Features" on ARM)"""
+    flags = set()
+    for line in cpuinfo.splitlines():
+        key, _, value = line.partition(':')
+        if key.strip() in ('flags', 'Features'):
+            flags.update(value.split())
+    return flags
+
+
+def _read_cpu_flags():
+    try:
+        with open('/proc/cpuinfo') as f:
+            return parse_cpu_flags(f.read())
+    except OSError:
+        return set()
+
+
+def bf16_supported():
+    """True if the CPU has native bfloat16 instructions"""
+    return any(flag in _read_cpu_flags() for flag in BF16_CPU_FLAGS)
+
+
+def select_quantized_engine():
+    """Pick (and activate) a quantized kernel engine; None if torch has none"""
+    import torch
+
+    supported = torch.backends.quantized.supported_engines
+    for engine in QUANTIZED_ENGINES:
+        if engine in supported:
+            torch.backends.quantized.engine = engine
+            return engine
+    return None
+
+
+def unavailable_reason(precision, device='cpu'):
+    """
+    Why a precision cannot be used here (None if it can)
+
+    Args:
+        precision (str): "fp32", "bf16" or "int8"
+        device (str): Device type the model runs on
+    """
+    if precision not in PRECISIONS:
+        return f"unknown precision '{precision}' (expected one of: {', '.join(PRECISIONS)})"
+    if precision == 'fp32':
+        return None
+    if device != 'cpu':
+        return f"reduced precision is only applied on CPU (model runs on {device})"
+    if precision == 'bf16' and not bf16_supported():
+        return "CPU has no native bfloat16 instructions (AVX512-BF16/AMX/ARM BF16)"
+    if precision == 'int8' and select_quantized_engine() is None:
+        return "torch has no quantized CPU engine"
+    return None
+
+
+class AutocastEncoder:
+    """HuggingFace module run under CPU bfloat16 autocast, returning float32 outputs"""
+
+    def __init__(self, module):
+        self.module = module
+
+    def __call__(self, **inputs):
+        import torch
+
+        with torch.autocast(device_type='cpu', dtype=torch.bfloat16):
+            output = self.module(**inputs)
+
+        for name in ('logits', 'last_hidden_state'):
+            value = getattr(output, name, None)
+            if value is not None:
+                setattr(output, name, value.float())
+        return output
+
+    def eval(self):
+        self.module.eval()
+        return self
+
+    def to(self, device):
+        self.module.to(device)
+        return self
+
+    # Used by model_registry for weight size and read-only weights
+    def parameters(self):
+        return self.module.parameters()
+
+    def buffers(self):
+        return self.module.buffers()
+
+    def requires_grad_(self, requires_grad=True):
+        self.module.requires_grad_(requires_grad)
+        return self
+
+
+def convert(model, precision):
+    """
+    Reduced-precision version of a float32 model
+
+    int8 returns a quantized copy (the float32 model is left unchanged),
+    bf16 wraps the same module in an autocast context.
+    """
+    import torch
+
+    if precision == 'int8':
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if precision == 'bf16':
+        return AutocastEncoder(model)
+    return model
+
+
+def _run_reference(model, inputs, output_name):
+    import torch
+
+    with torch.no_grad():
+        start = time.perf_counter()
+        output = getattr(model(**inputs), output_name)
+        return output.float(), (time.perf_counter() - start) * 1000.0
+
+
+def measure_parity(reference_model, model, tokenizer, output_name, texts=None, max_length=512):
+    """
+    Compare a reduced-precision model to its float32 model on reference texts
+
+    Each model runs the texts twice and the second run is timed.
+
+    Args:
+        reference_model: float32 model
+        model: Reduced-precision model
+        tokenizer: Tokenizer of the model
+        output_name (str): "logits" (RoBERTa) or "last_hidden_state" (MentalBERT)
+
+    Returns:
+        dict with errors, label agreement / cosine similarity and timings
+    """
+    import torch
+
+    texts = texts or REFERENCE_TEXTS
+    inputs = tokenizer(texts, padding=True, truncation=True, max_length=max_length, return_tensors="pt")
+
+    _run_reference(reference_model, inputs, output_name)
+    expected, fp32_ms = _run_reference(reference_model, inputs, output_name)
+    _run_reference(model, inputs, output_name)
+    actual, reduced_ms = _run_reference(model, inputs, output_name)
+
+    report = {
+        'reference_texts': len(texts),
+        'fp32_ms': round(fp32_ms, 1),
+        'reduced_ms': round(reduced_ms, 1),
+        'speedup': round(fp32_ms / reduced_ms, 2) if reduced_ms else None
+    }
+    if output_name == 'logits':
+        expected = torch.softmax(expected, dim=-1)
+        actual = torch.softmax(actual, dim=-1)
+        report['compared'] = 'probabilities'
+        report['label_agreement'] = float((expected.argmax(-1) == actual.argmax(-1)).float().mean())
+    else:
+        mask = inputs['attention_mask'].unsqueeze(-1).float()
+        expected = (expected * mask).sum(1) / mask.sum(1)
+        actual = (actual * mask).sum(1) / mask.sum(1)
+        report['compared'] = 'mean_pooled_embeddings'
+        report['min_cosine_similarity'] = float(torch.nn.functional.cosine_similarity(expected, actual, dim=-1).min())
+
+    diff = (expected - actual).abs()
+    report['max_abs_error'] = float(diff.max())
+    report['mean_abs_error'] = float(diff.mean())
+    return report
+
+
+def parity_failure(report):
+    """Why a parity report misses the configured tolerances (None if it passes)"""
+    if report['compared'] == 'probabilities' and report['max_abs_error'] > config.PRECISION_MAX_PROB_ERROR:
+        return f"max probability error {report['max_abs_error']:.4f} > {config.PRECISION_MAX_PROB_ERROR}"
+    if report['compared'] == 'mean_pooled_embeddings' and report['min_cosine_similarity'] < config.PRECISION_MIN_COSINE:
+        return f"min cosine similarity {report['min_cosine_similarity']:.4f} < {config.PRECISION_MIN_COSINE}"
+    return None
+
+
+def apply_precision(name, model, tokenizer, output_name, device='cpu', precision=None, max_length=512):
+    """
+    Convert a loaded float32 model to the configured precision
+
+    Falls back to the float32 model when the precision is unavailable here or
+    fails the parity check.
+
+    Args:
+        name (str): Model name ("roberta" or "mentalbert")
+        model: float32 HuggingFace module in eval mode
+        tokenizer: Its tokenizer (for the parity check)
+        output_name (str): "logits" or "last_hidden_state"
+        device (str): Device type the model runs on
+        precision (str): Requested precision (default: ENCODER_PRECISION)
+
+    Returns:
+        The model to serve
+    """
+    precision = (precision or config.ENCODER_PRECISION).lower()
+    report = {'requested': precision, 'active': 'fp32', 'parity': None, 'fallback_reason': None}
+    _reports[name] = report
+
+    reason = unavailable_reason(precision, device)
+    if reason is not None or precision == 'fp32':
+        if reason:
+            logger.warning(f"⚠ {name}: {precision} unavailable - using fp32 ({reason})")
+            report['fallback_reason'] = reason
+        return model
+
+    converted = convert(model, precision)
+
+    if config.PRECISION_PARITY_CHECK:
+        report['parity'] = measure_parity(model, converted, tokenizer, output_name, max_length=max_length)
+        failure = parity_failure(report['parity'])
+        if failure is not None:
+            logger.warning(f"⚠ {name}: {precision} failed the parity check - using fp32 ({failure})")
+            report['fallback_reason'] = failure
+            return model
+
+    report['active'] = precision
+    logger.info(f"✓ {name} running in {precision}")
+    return converted
+
+
+def get_active_precision(name):
+    """Precision the loaded model actually runs in (part of the prediction cache identity)"""
+    return _reports.get(name, {}).get('active', 'fp32')
+
+
+def get_precision_report():
+    """Requested/active precision and parity per model, for /api/health"""
+    return {
+        'configured': config.ENCODER_PRECISION,
+        'bf16_supported': bf16_supported(),
+        'models': {name: dict(report) for name, report in _reports.items()}
+    }
+
+
+def main():
+    """Print the parity and speed of every precision for both encoders"""
+    from transformers import AutoTokenizer, AutoModel, RobertaForSequenceClassification
+
+    print("=" * 60)
+    print("ENCODER PRECISION REPORT")
+    print("=" * 60)
+    print(f"bf16 native: {bf16_supported()}")
+
+    encoders = [
+        ('roberta', RobertaForSequenceClassification, config.ROBERTA_MODEL_PATH, config.ROBERTA_TOKENIZER_PATH, 'logits', 512),
+        ('mentalbert', AutoModel, config.MENTALBERT_MODEL_PATH, config.MENTALBERT_MODEL_PATH, 'last_hidden_state', 300),
+    ]
+    for name, model_class, model_dir, tokenizer_dir, output_name, max_length in encoders:
+        print(f"\n{name}:")
+        tokenizer = AutoTokenizer.from_pretrained(tokenizer_dir)
+        model = model_class.from_pretrained(model_dir)
+        model.eval()
+
+        for precision in PRECISIONS[1:]:
+            reason = unavailable_reason(precision)
+            if reason:
+                print(f"  [WARN] {precision}: {reason}")
+                continue
+
+            report = measure_parity(model, convert(model, precision), tokenizer, output_name, max_length=max_length)
+            failure = parity_failure(report)
+            status = f"[WARN] {failure}" if failure else "[OK]"
+            print(f"  {status} {precision}: max abs error {report['max_abs_error']:.2e}, "
+                  f"{report['fp32_ms']:.0f} ms -> {report['reduced_ms']:.0f} ms ({report['speedup']}x)")
+
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        success = main()
+        sys.exit(0 if success else 1)
+    except Exception as e:
+        print(f"\n[FATAL ERROR]: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
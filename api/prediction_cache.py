@@ -0,0 +1,321 @@
+"""
+Content-Addressed Prediction Cache
+
+Caches model predictions keyed by model identity plus a hash of the
+normalized input text, so repeated texts (duplicate CSV rows, retries,
+re-analysis of saved entries) skip the models entirely.
+
+Two tiers:
+- In-process LRU (per worker, bounded by PREDICTION_CACHE_LOCAL_SIZE)
+- Redis (shared across workers, expires after PREDICTION_CACHE_TTL seconds),
+  using the redis client created in app.py when Redis is available
+
+Model identity is a fingerprint of the model's weight files plus the runtime
+settings that change its outputs. Loading (or swapping) a model re-registers
+its identity, which drops its local entries and moves Redis lookups to a new
+key space, so stale predictions are never served.
+"""
+import os
+import copy
+import json
+import hashlib
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import single_flight
+from config_manager import get_config
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+
+def normalize_text(text):
+    """
+    Normalize text for cache keys (unicode NFC only)
+
+    Whitespace is kept as is: the BPE tokenizers encode spaces and newlines
+    as part of their tokens, so whitespace variants can score differently.
+    """
+    return unicodedata.normalize('NFC', text)
+
+
+def hash_text(text):
+    """Hash of the normalized text"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def fingerprint_weights(paths):
+    """
+    Fingerprint model weight files by name, size and modification time
+
+    Args:
+        paths (list): Model files or directories
+
+    Returns:
+        Short hex digest that changes whenever any weight file is replaced
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        if not path or not os.path.exists(path):
+            continue
+
+        if os.path.isdir(path):
+            files = sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(path)
+                for name in names
+            )
+        else:
+            files = [path]
+
+        for file_path in files:
+            stat = os.stat(file_path)
+            digest.update(f"{os.path.basename(file_path)}:{stat.st_size}:{int(stat.st_mtime)}\n".encode('utf-8'))
+
+    return digest.hexdigest()[:16]
+
+
+class PredictionCache:
+    """Two-tier (local LRU + Redis) prediction cache"""
+
+    def __init__(self, max_local_entries=2048, ttl=86400, key_prefix='moodtracker_', version='1'):
+        self.max_local_entries = max_local_entries
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self.version = version
+        self.redis_client = None
+
+        self._local = OrderedDict()  # (model, identity, text hash) -> (expires_at, json)
+        self._lock = threading.Lock()
+        self._identities = {}
+
+        self._stats = {
+            'local_hits': 0,
+            'redis_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'redis_errors': 0,
+            'invalidations': 0
+        }
+
+    # ============================================
+    # MODEL IDENTITY
+    # ============================================
+
+    def register_model(self, model_name, weight_paths, runtime=''):
+        """
+        Register (or re-register after a swap) the identity of a loaded model
+
+        Args:
+            model_name (str): Cache namespace, e.g. "roberta"
+            weight_paths (list): Weight files/directories of the loaded model
+            runtime (str): Settings that change outputs (backend, precision, ...)
+        """
+        identity = hashlib.sha256(
+            f"{self.version}:{fingerprint_weights(weight_paths)}:{runtime}".encode('utf-8')
+        ).hexdigest()[:16]
+
+        with self._lock:
+            previous = self._identities.get(model_name)
+            self._identities[model_name] = identity
+
+            if previous is not None and previous != identity:
+                # Model swapped - drop its local entries
+                for key in [key for key in self._local if key[0] == model_name]:
+                    del self._local[key]
+                self._stats['invalidations'] += 1
+                logger.info(f"Prediction cache invalidated for '{model_name}' (model changed)")
+
+        return identity
+
+    def get_identity(self, model_name):
+        return self._identities.get(model_name)
+
+    # ============================================
+    # LOOKUP AND STORE
+    # ============================================
+
+    def _redis_key(self, key):
+        model_name, identity, text_hash = key
+        return f"{self.key_prefix}pred:{model_name}:{identity}:{text_hash}"
+
+    def get(self, model_name, text):
+        """Return the cached result for text, or None"""
+        identity = self._identities.get(model_name)
+        if identity is None:
+            return None
+
+        key = (model_name, identity, hash_text(text))
+
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at > time.time():
+                    self._local.move_to_end(key)
+                    self._stats['local_hits'] += 1
+                    return json.loads(payload)
+                del self._local[key]
+
+        if self.redis_client is not None:
+            try:
+                payload = self.redis_client.get(self._redis_key(key))
+            except Exception as e:
+                self._stats['redis_errors'] += 1
+                logger.warning(f"Prediction cache Redis read failed: {e}")
+                payload = None
+
+            if payload is not None:
+                self._store_local(key, payload)
+                self._stats['redis_hits'] += 1
+                return json.loads(payload)
+
+        self._stats['misses'] += 1
+        return None
+
+    def set(self, model_name, text, result):
+        """Store a successful result (results with an 'error' key are not cached)"""
+        identity = self._identities.get(model_name)
+        if identity is None or not isinstance(result, dict) or 'error' in result:
+            return
+
+        key = (model_name, identity, hash_text(text))
+        payload = json.dumps(result)
+        self._store_local(key, payload)
+        self._stats['stores'] += 1
+
+        if self.redis_client is not None:
+            try:
+                self.redis_client.setex(self._redis_key(key), self.ttl, payload)
+            except Exception as e:
+                self._stats['redis_errors'] += 1
+                logger.warning(f"Prediction cache Redis write failed: {e}")
+
+    def _store_local(self, key, payload):
+        with self._lock:
+            self._local[key] = (time.time() + self.ttl, payload)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+
+    def clear(self):
+        """Drop all local entries"""
+        with self._lock:
+            self._local.clear()
+
+    def get_stats(self):
+        """Hit/miss counters for /api/health"""
+        lookups = self._stats['local_hits'] + self._stats['redis_hits'] + self._stats['misses']
+        hits = self._stats['local_hits'] + self._stats['redis_hits']
+        return dict(
+            self._stats,
+            enabled=config.PREDICTION_CACHE_ENABLED,
+            hit_rate=round(hits / lookups, 3) if lookups else 0.0,
+            local_entries=len(self._local),
+            max_local_entries=self.max_local_entries,
+            ttl_seconds=self.ttl,
+            redis=self.redis_client is not None,
+            models=dict(self._identities)
+        )
+
+
+# Global cache instance
+prediction_cache = PredictionCache(
+    max_local_entries=config.PREDICTION_CACHE_LOCAL_SIZE,
+    ttl=config.PREDICTION_CACHE_TTL,
+    key_prefix=config.CACHE_KEY_PREFIX,
+    version=config.PREDICTION_CACHE_VERSION
+)
+
+
+def _reset_after_fork():
+    # A lock held by another thread at fork time would never be released in the child
+    prediction_cache._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def init_redis(redis_client):
+    """Attach the shared Redis client (called from app.py when Redis is connected)"""
+    prediction_cache.redis_client = redis_client
+
+
+def register_model(model_name, weight_paths, runtime=''):
+    """Register a loaded model's identity (see PredictionCache.register_model)"""
+    return prediction_cache.register_model(model_name, weight_paths, runtime)
+
+
+def cached_predict(model_name, text, predict_fn):
+    """
+    Return the cached prediction for text or compute and cache it
+
+    Concurrent misses for the same model and normalized text are coalesced
+    (single_flight.py): one call runs predict_fn, the others share its result.
+
+    Args:
+        model_name (str): Cache namespace of the model
+        text (str): Input text
+        predict_fn: Function text -> result dict
+
+    Returns:
+        Result dict
+    """
+    if config.PREDICTION_CACHE_ENABLED:
+        result = prediction_cache.get(model_name, text)
+        if result is not None:
+            return result
+
+    def compute():
+        result = predict_fn(text)
+        if config.PREDICTION_CACHE_ENABLED:
+            prediction_cache.set(model_name, text, result)
+        return result
+
+    key = (model_name, prediction_cache.get_identity(model_name), normalize_text(text))
+    return single_flight.do(key, compute)
+
+
+def cached_predict_many(model_name, texts, predict_batch_fn):
+    """
+    Batch version of cached_predict: only cache misses are sent to the model,
+    in a single predict_batch_fn call, and results keep the input order
+
+    Args:
+        model_name (str): Cache namespace of the model
+        texts (list): Input texts
+        predict_batch_fn: Function list of texts -> list of result dicts
+
+    Returns:
+        List of result dicts
+    """
+    if not config.PREDICTION_CACHE_ENABLED:
+        return predict_batch_fn(texts)
+
+    results = [prediction_cache.get(model_name, text) for text in texts]
+
+    # Deduplicate misses so repeated rows are computed once
+    missing = {}
+    for i, result in enumerate(results):
+        if result is None:
+            missing.setdefault(normalize_text(texts[i]), []).append(i)
+
+    if missing:
+        positions = list(missing.values())
+        computed = predict_batch_fn([texts[indexes[0]] for indexes in positions])
+        for indexes, result in zip(positions, computed):
+            prediction_cache.set(model_name, texts[indexes[0]], result)
+            for i in indexes:
+                results[i] = result if i == indexes[0] else copy.deepcopy(result)
+
+    return results
+
+
+def get_cache_stats():
+    """Get prediction cache statistics"""
+    return prediction_cache.get_stats()
@@ -0,0 +1,143 @@
+"""
+Sentiment Predictors
+
+The prediction functions behind the API routes, the model server and the
+warmup: RoBERTa and MentalBERT-LSTM, for single texts and for chunks of texts.
+
+This module is model-side only (no Flask, no database), so a model server or
+a warmup run can import it without loading the web tier.
+
+Each function forwards to the model server when INFERENCE_SERVER_ADDRESS is
+set (inference_client.py); otherwise single texts go through the prediction
+cache and the micro-batcher, and chunks are scored with one forward pass.
+"""
+import logging
+
+import batching
+import inference_client
+import long_text
+import model_registry
+import prediction_cache
+import tokenization
+from simple_model import ensure_models_loaded, predict_with_simple_model, predict_with_simple_model_batch
+
+logger = logging.getLogger(__name__)
+
+
+def predict_roberta_sentiment(text):
+    """Predict sentiment using RoBERTa model (model server if configured, else cached/micro-batched locally)"""
+    if inference_client.is_enabled():
+        return inference_client.predict_one('roberta', text)
+
+    if model_registry.get_model('roberta') is None:
+        return {"error": "RoBERTa model not loaded"}
+
+    try:
+        return prediction_cache.cached_predict(
+            'roberta', text,
+            lambda t: batching.submit('roberta', predict_roberta_sentiment_batch, t)
+        )
+    except Exception as e:
+        return {"error": f"RoBERTa prediction error: {str(e)}"}
+
+
+def predict_roberta_sentiment_batch(texts):
+    """
+    Predict sentiment for a list of texts with one tokenizer call and one forward pass
+
+    Long texts are split into 512-token windows that share the forward pass;
+    their logits are averaged per text (long_text.py).
+    """
+    import torch
+    roberta_model, roberta_tokenizer = model_registry.get_model('roberta')
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+    with tokenization.timed('roberta', 'tokenize'):
+        inputs, windows = long_text.tokenize_windows(roberta_tokenizer, texts, max_length=512, cache_name='roberta')
+    inputs = {k: v.to(device) for k, v in inputs.items()}
+
+    with torch.no_grad(), tokenization.timed('roberta', 'forward'):
+        outputs = roberta_model(**inputs)
+        logits = long_text.aggregate_windows(outputs.logits, windows)
+        probabilities = torch.nn.functional.softmax(logits, dim=-1)
+
+    sentiment_map = {0: "Negative", 1: "Neutral", 2: "Positive"}
+    predicted_classes = probabilities.argmax(dim=-1).tolist()
+
+    results = []
+    for i, predicted_class in enumerate(predicted_classes):
+        results.append({
+            "sentiment": sentiment_map[predicted_class],
+            "confidence": float(probabilities[i][predicted_class]),
+            "scores": {
+                "negative": float(probabilities[i][0]),
+                "neutral": float(probabilities[i][1]),
+                "positive": float(probabilities[i][2])
+            },
+            "windows": windows.counts[i]
+        })
+
+    return results
+
+
+def predict_roberta_sentiment_chunk(texts):
+    """Predict sentiment for a chunk of texts using RoBERTa (bulk scoring)"""
+    if inference_client.is_enabled():
+        return inference_client.predict_many('roberta', texts)
+
+    if model_registry.get_model('roberta') is None:
+        return [{"error": "RoBERTa model not loaded"} for _ in texts]
+
+    try:
+        return prediction_cache.cached_predict_many('roberta', texts, predict_roberta_sentiment_batch)
+    except Exception as e:
+        return [{"error": f"RoBERTa prediction error: {str(e)}"} for _ in texts]
+
+
+def predict_lstm_sentiment(text):
+    """Predict sentiment using MentalBERT-LSTM model (model server if configured)"""
+    try:
+        if inference_client.is_enabled():
+            result = inference_client.predict_one('mentalbert_lstm', text)
+        elif not ensure_models_loaded():
+            return {"error": "LSTM model not loaded"}
+        else:
+            result = predict_with_simple_model(text)
+        return format_lstm_result(result)
+    except Exception as e:
+        return {"error": f"LSTM prediction error: {str(e)}"}
+
+
+def predict_lstm_sentiment_batch(texts):
+    """Predict sentiment for a chunk of texts using MentalBERT-LSTM (bulk scoring)"""
+    try:
+        if inference_client.is_enabled():
+            results = inference_client.predict_many('mentalbert_lstm', texts)
+        elif not ensure_models_loaded():
+            return [{"error": "LSTM model not loaded"} for _ in texts]
+        else:
+            results = predict_with_simple_model_batch(texts)
+        return [format_lstm_result(result) for result in results]
+    except Exception as e:
+        return [{"error": f"LSTM prediction error: {str(e)}"} for _ in texts]
+
+
+def format_lstm_result(result):
+    """Convert a simple_model result to the expected format (matching RoBERTa output format)"""
+    if 'error' in result:
+        # Fallback results and model server item errors stay errors
+        return result
+    return {
+        "sentiment": result.get("sentiment", "Neutral"),
+        "confidence": result.get("confidence", 0.5),
+        "scores": {
+            "negative": result.get("scores", {}).get("negative", 0.33),
+            "neutral": result.get("scores", {}).get("neutral", 0.33),
+            "positive": result.get("scores", {}).get("positive", 0.34)
+        },
+        "model_info": {
+            "architecture": result.get("architecture", "MentalBERT-LSTM"),
+            "embeddings": result.get("embeddings_used", "MentalBERT")
+        },
+        "windows": result.get("windows", 1)
+    }
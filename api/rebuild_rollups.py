@@ -0,0 +1,55 @@
+"""
+User Rollup Rebuild Script
+Recounts the user_rollups dashboard statistics from journal_entries, e.g.
+after entries were imported or edited outside of MoodTrackingDB
+
+Usage:
+    python rebuild_rollups.py [--db mood_tracking.db] [user_id ...]
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import MoodTrackingDB
+
+
+def main(db_path, user_ids):
+    """Rebuild the rollups of the given users (every user if none given)"""
+    print("=" * 60)
+    print("USER ROLLUP REBUILD")
+    print("=" * 60)
+
+    db = MoodTrackingDB(db_path)
+
+    if user_ids:
+        for user_id in user_ids:
+            db.rebuild_user_rollups(user_id)
+            print(f"  [OK] {user_id}: {db.get_user_stats(user_id)['total_entries']} entries")
+    else:
+        count = db.rebuild_user_rollups()
+        print(f"  [OK] Rebuilt rollups for {count} users")
+
+    print("\n" + "=" * 60)
+    print("REBUILD COMPLETE!")
+    print("=" * 60)
+    return True
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = "mood_tracking.db"
+    if '--db' in args:
+        index = args.index('--db')
+        db_path = args[index + 1]
+        del args[index:index + 2]
+
+    try:
+        success = main(db_path, args)
+        sys.exit(0 if success else 1)
+    except Exception as e:
+        print(f"\n[FATAL ERROR]: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
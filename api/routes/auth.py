@@ -12,14 +12,13 @@ from flask_limiter.util import get_remote_address
 import os
 import logging
 import secrets
-import requests
 
 # Import from parent modules
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from user_manager import UserManager
-from database import MoodTrackingDB
+from database import get_db
 from jwt_utils import create_token
 
 logger = logging.getLogger(__name__)
@@ -29,7 +28,7 @@ auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 # Initialize managers
 user_manager = UserManager()
-db = MoodTrackingDB()
+db = get_db()
 
 
 @auth_bp.route('/login', methods=['POST', 'OPTIONS'])
@@ -348,6 +347,7 @@ def auth_github():
 
         # If code is provided, exchange it for user info
         if code:
+            import requests  # Only the GitHub code exchange needs it
             client_id = os.environ.get('GITHUB_CLIENT_ID')
             client_secret = os.environ.get('GITHUB_CLIENT_SECRET')
 
@@ -14,7 +14,10 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import MoodTrackingDB
+import inference_client
+import model_registry
+from config_manager import get_config
+from database import get_db
 from jwt_utils import require_auth
 
 logger = logging.getLogger(__name__)
@@ -22,15 +25,17 @@ logger = logging.getLogger(__name__)
 # Create blueprint
 journal_bp = Blueprint('journal', __name__, url_prefix='/api/journal')
 
+config = get_config()
+
 # Initialize database
-db = MoodTrackingDB()
+db = get_db()
 
 
 @journal_bp.route('/entries', methods=['GET', 'POST', 'DELETE', 'OPTIONS'])
 @require_auth
 def journal_entries(current_user):
     """
-    Get all journal entries or create a new entry
+    Get a page of journal entries or create a new entry
     ---
     tags:
       - Journal
@@ -42,6 +47,18 @@ def journal_entries(current_user):
         required: true
         type: string
         description: Bearer JWT token
+      - in: query
+        name: limit
+        type: integer
+        description: Entries per page (GET, default JOURNAL_PAGE_SIZE, at most JOURNAL_MAX_PAGE_SIZE)
+      - in: query
+        name: cursor
+        type: string
+        description: next_cursor of the previous page (GET)
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated entry fields to return (GET), e.g. "id,sentiment,mood_score,date"
       - in: body
         name: body
         required: false
@@ -54,7 +71,9 @@ def journal_entries(current_user):
               type: string
     responses:
       200:
-        description: Journal entries or creation result
+        description: Journal entries (newest first, with next_cursor while more pages exist and total on the first page) or creation result
+      400:
+        description: Unknown field or invalid cursor
       401:
         description: Unauthorized
     """
@@ -66,14 +85,27 @@ def journal_entries(current_user):
 
     try:
         if request.method == 'GET':
-            # Get journal entries for user from database
-            entries = db.get_journal_entries(user_id)
+            # One keyset-paginated page of the user's entries
+            limit = min(max(request.args.get('limit', config.JOURNAL_PAGE_SIZE, type=int), 1), config.JOURNAL_MAX_PAGE_SIZE)
+            fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
 
-            return jsonify({
+            cursor = request.args.get('cursor')
+
+            try:
+                entries, next_cursor = db.list_journal_entries(user_id, limit=limit, cursor=cursor, fields=fields or None)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
+            page = {
                 "success": True,
                 "entries": entries,
-                "total": len(entries)
-            })
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None
+            }
+            if not cursor:
+                # Only the first page carries the total
+                page["total"] = db.get_user_stats(user_id)['total_entries']
+            return jsonify(page)
 
         elif request.method == 'POST':
             # Create new journal entry
@@ -86,9 +118,16 @@ def journal_entries(current_user):
             if not text.strip():
                 return jsonify({"error": "Empty text provided"}), 400
 
-            # Analyze sentiment using the simple model
-            from simple_model import predict_with_simple_model
-            sentiment_result = predict_with_simple_model(text)
+            if not model_registry.predictions_available():
+                # Do not store entries with a made-up neutral sentiment
+                return jsonify({"error": "Journal analysis is not available on this server (ML_ENABLED=False)"}), 503
+
+            # Analyze sentiment using the simple model (on the model server if configured)
+            if inference_client.is_enabled():
+                sentiment_result = inference_client.predict_one('mentalbert_lstm', text)
+            else:
+                from simple_model import predict_with_simple_model
+                sentiment_result = predict_with_simple_model(text)
 
             # Extract sentiment data
             primary_sentiment = sentiment_result.get('sentiment', 'Neutral')
@@ -203,7 +242,7 @@ def journal_analytics(current_user):
         name: days
         type: integer
         default: 30
-        description: Number of days to analyze
+        description: Number of days to analyze (1-365)
     responses:
       200:
         description: Analytics data
@@ -226,10 +265,10 @@ def journal_analytics(current_user):
     user_id = current_user['user_id']
 
     try:
-        # Get user's journal entries from database
-        entries = db.get_journal_entries(user_id)
+        # Counts come from the user_rollups row, not from the entries
+        stats = db.get_user_stats(user_id)
 
-        if len(entries) == 0:
+        if stats['total_entries'] == 0:
             return jsonify({
                 "message": "No entries found",
                 "mood_trends": [],
@@ -238,20 +277,20 @@ def journal_analytics(current_user):
             })
 
         # Calculate sentiment distribution
-        sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
-        for entry in entries:
-            sentiment = entry.get('sentiment', 'Neutral')
-            if sentiment in sentiment_counts:
-                sentiment_counts[sentiment] += 1
+        sentiment_counts = {
+            sentiment: stats['sentiment_distribution'].get(sentiment, 0)
+            for sentiment in ("Positive", "Neutral", "Negative")
+        }
 
-        # Get mood trends over time
-        mood_trends = db.get_mood_trends(user_id, days=30)
+        # Get mood trends over time (one grouped query for any number of days)
+        days = min(max(request.args.get('days', 30, type=int), 1), 365)
+        mood_trends = db.get_weekly_mood_trend(user_id, days=days)
 
         return jsonify({
-            "total_entries": len(entries),
+            "total_entries": stats['total_entries'],
             "sentiment_distribution": sentiment_counts,
             "mood_trends": mood_trends,
-            "average_sentiment_score": sum(e.get('sentiment_score', 0.5) for e in entries) / len(entries)
+            "average_sentiment_score": db.get_average_sentiment_score(user_id)
         })
 
     except Exception as e:
@@ -8,7 +8,6 @@ Handles all ML prediction routes including:
 - CSV batch analysis
 """
 from flask import Blueprint, request, jsonify
-import pandas as pd
 import io
 import logging
 
@@ -17,65 +16,37 @@ logger = logging.getLogger(__name__)
 # Create blueprint
 predictions_bp = Blueprint('predictions', __name__, url_prefix='/api')
 
-# Model variables will be set by app.py
-roberta_model = None
-roberta_tokenizer = None
-lstm_loaded = False
-
-
-def set_models(roberta_m, roberta_t, lstm_l):
-    """Set model references from main app"""
-    global roberta_model, roberta_tokenizer, lstm_loaded
-    roberta_model = roberta_m
-    roberta_tokenizer = roberta_t
-    lstm_loaded = lstm_l
-
-
 # Import prediction functions
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from simple_model import predict_with_simple_model
-
-
-def predict_roberta_sentiment(text):
-    """Predict sentiment using RoBERTa model"""
-    if roberta_model is None or roberta_tokenizer is None:
-        return {"error": "RoBERTa model not loaded"}
-
-    import torch
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-
-    inputs = roberta_tokenizer(text, return_tensors="pt", truncation=True, max_length=512, padding=True)
-    inputs = {k: v.to(device) for k, v in inputs.items()}
-
-    with torch.no_grad():
-        outputs = roberta_model(**inputs)
-        probabilities = torch.nn.functional.softmax(outputs.logits, dim=-1)
-
-    sentiment_map = {0: "Negative", 1: "Neutral", 2: "Positive"}
-    predicted_class = probabilities.argmax().item()
-    confidence = probabilities[0][predicted_class].item()
-
-    return {
-        "sentiment": sentiment_map[predicted_class],
-        "confidence": float(confidence),
-        "scores": {
-            "negative": float(probabilities[0][0]),
-            "neutral": float(probabilities[0][1]),
-            "positive": float(probabilities[0][2])
-        }
-    }
-
-
-def predict_lstm_sentiment(text):
-    """Predict sentiment using LSTM model"""
-    if not lstm_loaded:
-        return {"error": "LSTM model not loaded"}
-
-    result = predict_with_simple_model(text)
-    return result
+from onnx_backend import get_backend_info
+from config_manager import get_config
+import batching
+import import_report
+import inference_client
+import model_executor
+import model_registry
+import precision
+import prediction_cache
+import single_flight
+import thread_budget
+import tokenization
+import warmup
+from predictors import (
+    predict_roberta_sentiment, predict_roberta_sentiment_chunk,
+    predict_lstm_sentiment, predict_lstm_sentiment_batch
+)
+
+config = get_config()
+
+
+@predictions_bp.before_request
+def require_predictions():
+    """Reject prediction routes in a no-ML process (ML_ENABLED=False, no model server)"""
+    if request.endpoint != 'predictions.health_check' and not model_registry.predictions_available():
+        return jsonify({"error": "Predictions are not available on this server (ML_ENABLED=False)"}), 503
 
 
 @predictions_bp.route('/health', methods=['GET'])
@@ -97,11 +68,59 @@ def health_check():
               type: boolean
             lstm_loaded:
               type: boolean
+            inference_batching:
+              type: object
+              description: Micro-batching queue depth and batch size stats
+            prediction_cache:
+              type: object
+              description: Prediction cache hit rate, entries and model identities
+            single_flight:
+              type: object
+              description: Concurrent identical predictions coalesced into one model call
+            model_registry:
+              type: object
+              description: Per-model load time and memory footprint
+            inference_server:
+              type: object
+              description: Model server address, reachability and request latency (if configured)
+            model_executor:
+              type: object
+              description: Dual-model concurrency (concurrent vs sequential runs)
+            thread_budget:
+              type: object
+              description: Cores, intra/inter-op threads and affinity chosen for this worker
+            tokenization:
+              type: object
+              description: Fast tokenizers, token-id cache and tokenize vs forward time per model
+            warmup:
+              type: object
+              description: Readiness flag and per-model warmup time (see /api/ready)
+            imports:
+              type: object
+              description: App import time and which heavy packages (torch, pandas, ...) are loaded
+            encoder_backend:
+              type: object
+              description: Active encoder runtime (pytorch/onnx) and ONNX parity error
+            precision:
+              type: object
+              description: Requested/active PyTorch encoder precision (fp32/bf16/int8) and its parity against fp32
     """
     return jsonify({
         "status": "healthy",
-        "roberta_loaded": roberta_model is not None,
-        "lstm_loaded": lstm_loaded
+        "roberta_loaded": model_registry.registry.is_loaded('roberta'),
+        "lstm_loaded": model_registry.registry.is_loaded('lstm_head') and model_registry.registry.is_loaded('mentalbert'),
+        "inference_batching": batching.get_batching_stats(),
+        "prediction_cache": prediction_cache.get_cache_stats(),
+        "single_flight": single_flight.get_single_flight_stats(),
+        "model_registry": model_registry.get_registry_report(),
+        "inference_server": inference_client.get_status(),
+        "model_executor": model_executor.get_executor_stats(),
+        "thread_budget": thread_budget.get_report(),
+        "tokenization": tokenization.get_stats(),
+        "warmup": warmup.get_status(),
+        "imports": import_report.get_import_status(),
+        "encoder_backend": get_backend_info(config.ENCODER_BACKEND, model_registry.get_loaded_encoders()),
+        "precision": precision.get_precision_report()
     })
 
 
@@ -235,6 +254,10 @@ def predict_both():
             text:
               type: string
               maxLength: 5000
+            mode:
+              type: string
+              enum: [both, cascade]
+              description: cascade runs the second model only when the first is unsure (default DUAL_MODEL_MODE)
     responses:
       200:
         description: Dual model prediction results
@@ -247,8 +270,19 @@ def predict_both():
               type: object
             lstm:
               type: object
+              description: null if the cascade did not need it (likewise roberta)
             consensus:
               type: boolean
+              description: null when only one model ran
+            mode:
+              type: string
+            models_run:
+              type: array
+              items:
+                type: string
+            escalation_reason:
+              type: string
+              description: Why the cascade ran the second model (low_confidence, ambiguous, long_text, first_model_error)
       400:
         description: Invalid input
     """
@@ -269,14 +303,22 @@ def predict_both():
         if len(text) > MAX_TEXT_LENGTH:
             return jsonify({"error": f"Text too long. Maximum length is {MAX_TEXT_LENGTH} characters"}), 400
 
-        roberta_result = predict_roberta_sentiment(text)
-        lstm_result = predict_lstm_sentiment(text)
+        mode = data.get('mode', config.DUAL_MODEL_MODE)
+        if mode not in model_executor.DUAL_MODEL_MODES:
+            return jsonify({"error": f"Unknown mode '{mode}'. Expected one of: {', '.join(model_executor.DUAL_MODEL_MODES)}"}), 400
+
+        # Both models run concurrently (latency of the slower one, not the sum),
+        # or in cascade mode the second model only when the first is unsure
+        roberta_result, lstm_result, run_info = model_executor.predict_dual(
+            predict_roberta_sentiment, predict_lstm_sentiment, text, mode
+        )
 
         return jsonify({
             "text": text,
             "roberta": roberta_result,
             "lstm": lstm_result,
-            "consensus": roberta_result.get('sentiment') == lstm_result.get('sentiment')
+            "consensus": model_executor.models_agree(roberta_result, lstm_result),
+            **run_info
         })
 
     except Exception as e:
@@ -331,6 +373,10 @@ def analyze_csv():
         if not file.filename.lower().endswith('.csv'):
             return jsonify({"error": "File must be a CSV"}), 400
 
+        mode = request.form.get('mode', config.DUAL_MODEL_MODE)
+        if mode not in model_executor.DUAL_MODEL_MODES:
+            return jsonify({"error": f"Unknown mode '{mode}'. Expected one of: {', '.join(model_executor.DUAL_MODEL_MODES)}"}), 400
+
         # Read and validate file size
         try:
             csv_content = file.read()
@@ -341,6 +387,7 @@ def analyze_csv():
 
             # Decode and parse CSV
             csv_content = csv_content.decode('utf-8')
+            import pandas as pd  # Imported on first CSV upload (slow to import)
             df = pd.read_csv(io.StringIO(csv_content))
         except Exception as e:
             return jsonify({"error": f"Error reading CSV: {str(e)}"}), 400
@@ -369,10 +416,11 @@ def analyze_csv():
         if len(df) > MAX_ROWS:
             return jsonify({"error": f"Too many rows. Maximum is {MAX_ROWS} rows. Your file has {len(df)} rows."}), 400
 
-        # Analyze each text entry
+        # Validate every row first, then score valid rows in fixed-size chunks
         results = []
-        for idx, row in df.iterrows():
-            text = str(row[text_column]).strip()
+        pending = []  # (position in results, row number, text)
+        for idx, text in zip(df.index, df[text_column]):
+            text = str(text).strip()
             if not text:
                 continue
 
@@ -387,38 +435,54 @@ def analyze_csv():
                 })
                 continue
 
-            try:
-                # Get predictions from both models
-                roberta_result = predict_roberta_sentiment(text)
-                lstm_result = predict_lstm_sentiment(text)
-
-                # Determine overall sentiment (you can customize this logic)
-                overall_sentiment = roberta_result.get('sentiment', 'Neutral')
-                confidence = roberta_result.get('confidence', 0.5)
+            pending.append((len(results), int(idx + 1), text))
+            results.append(None)
 
-                # Check if models agree
-                agreement = (roberta_result.get('sentiment') == lstm_result.get('sentiment'))
+        # The next chunk is tokenized in the background while this one runs the models
+        chunk_size = max(1, config.CSV_INFERENCE_CHUNK_SIZE)
+        chunks = [pending[start:start + chunk_size] for start in range(0, len(pending), chunk_size)]
+        for chunk in tokenization.pipelined(chunks, lambda chunk: [text for _, _, text in chunk]):
+            texts = [text for _, _, text in chunk]
 
-                results.append({
-                    "row": int(idx + 1),
-                    "text": text,
-                    "sentiment": overall_sentiment,
-                    "confidence": float(confidence),
-                    "roberta": roberta_result,
-                    "lstm": lstm_result,
-                    "agreement": agreement
-                })
+            try:
+                # One forward pass per model per chunk: both models concurrently, or in
+                # cascade mode the second model only for the texts the first was unsure about
+                roberta_results, lstm_results, run_infos = model_executor.predict_dual_batch(
+                    predict_roberta_sentiment_chunk, predict_lstm_sentiment_batch, texts, mode
+                )
+
+                for (position, row_number, text), roberta_result, lstm_result, run_info in zip(
+                        chunk, roberta_results, lstm_results, run_infos):
+                    # Determine overall sentiment (you can customize this logic)
+                    primary_result = roberta_result if roberta_result is not None else lstm_result
+                    overall_sentiment = primary_result.get('sentiment', 'Neutral')
+                    confidence = primary_result.get('confidence', 0.5)
+
+                    results[position] = {
+                        "row": row_number,
+                        "text": text,
+                        "sentiment": overall_sentiment,
+                        "confidence": float(confidence),
+                        "roberta": roberta_result,
+                        "lstm": lstm_result,
+                        # Check if models agree (None when only one model ran)
+                        "agreement": model_executor.models_agree(roberta_result, lstm_result),
+                        "models_run": run_info['models_run'],
+                        "escalation_reason": run_info['escalation_reason']
+                    }
 
             except Exception as e:
                 # Include failed predictions with error info
-                results.append({
-                    "row": int(idx + 1),
-                    "text": text,
-                    "sentiment": "Error",
-                    "confidence": 0.0,
-                    "error": str(e),
-                    "agreement": False
-                })
+                logger.error(f"CSV chunk prediction error: {e}")
+                for position, row_number, text in chunk:
+                    results[position] = {
+                        "row": row_number,
+                        "text": text,
+                        "sentiment": "Error",
+                        "confidence": 0.0,
+                        "error": str(e),
+                        "agreement": False
+                    }
 
         # Calculate summary statistics
         sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
@@ -15,7 +15,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import MoodTrackingDB
+from database import get_db
 from jwt_utils import require_auth
 from translations import translate_test_data
 
@@ -25,7 +25,7 @@ logger = logging.getLogger(__name__)
 tests_bp = Blueprint('tests', __name__, url_prefix='/api')
 
 # Initialize database
-db = MoodTrackingDB()
+db = get_db()
 
 
 @tests_bp.route('/tests', methods=['GET', 'OPTIONS'])
@@ -288,6 +288,9 @@ def dashboard_stats(current_user):
               type: integer
             recent_mood_trend:
               type: string
+            stats:
+              type: object
+              description: total_entries, average_mood, entries_this_week, streak, sentiment_distribution and last_entry (from user_rollups)
       401:
         description: Unauthorized
     """
@@ -298,17 +301,26 @@ def dashboard_stats(current_user):
     user_id = current_user['user_id']
 
     try:
-        # Get comprehensive stats from database
+        # Counts come from the user_rollups row; only the latest entry is read
         user_stats = db.get_user_stats(user_id)
-        entries = db.get_journal_entries(user_id)
+        entries, _ = db.list_journal_entries(user_id, limit=1, fields=['text', 'sentiment', 'mood_score', 'date'])
 
         return jsonify({
             "current_streak": user_stats.get('current_streak', 0),
-            "total_entries": len(entries),
+            "total_entries": user_stats['total_entries'],
             "total_tests_completed": user_stats.get('total_tests', 0),
             "recent_mood_trend": user_stats.get('mood_trend', 'stable'),
             "last_entry_date": user_stats.get('last_entry_date'),
-            "account_created": user_stats.get('created_at')
+            "account_created": user_stats.get('created_at'),
+            "success": True,
+            "stats": {
+                "total_entries": user_stats['total_entries'],
+                "average_mood": user_stats['average_mood'],
+                "entries_this_week": user_stats['entries_this_week'],
+                "streak": user_stats['streak'],
+                "sentiment_distribution": user_stats['sentiment_distribution'],
+                "last_entry": entries[0] if entries else None
+            }
         })
 
     except Exception as e:
@@ -5,44 +5,50 @@ Direct implementation of the LSTM + MentalBERT logic
 """
 
 import numpy as np
-import torch
-import tensorflow as tf
-from transformers import AutoModel, AutoTokenizer
 import logging
-import os
+
+import batching
+import long_text
+import model_registry
+import precision
+import prediction_cache
+import tokenization
+from config_manager import get_config
+from embedding_utils import validate_embedding_mode, pool_embeddings
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+config = get_config()
+
 # Global variables for models (following user's Model.py pattern)
 model = None
 tokenizer = None
 mentalbert = None
 
 def load_models():
-    """Load models exactly as in user's Model.py"""
+    """Fetch the LSTM head and MentalBERT from the shared model registry (loaded once per process)"""
     global model, tokenizer, mentalbert
 
     try:
-        # Load the trained LSTM model (user's path from Model.py)
-        lstm_path = "../mentalbert_lstm_model.keras"
-        if os.path.exists(lstm_path):
-            model = tf.keras.models.load_model(lstm_path)
-            logger.info(f"LSTM model loaded from: {lstm_path}")
-        else:
-            logger.error(f"LSTM model not found at: {lstm_path}")
+        lstm_head = model_registry.get_model('lstm_head')
+        encoder = model_registry.get_model('mentalbert')
+        if lstm_head is None or encoder is None:
             return False
 
-        # Load the fine-tuned MentalBERT model (user's path from Model.py)
-        mentalbert_path = "../mentalbert_sentiment_model"
-        if os.path.exists(mentalbert_path):
-            tokenizer = AutoTokenizer.from_pretrained(mentalbert_path)
-            mentalbert = AutoModel.from_pretrained(mentalbert_path)
-            logger.info(f"MentalBERT model loaded from: {mentalbert_path}")
-        else:
-            logger.error(f"MentalBERT model not found at: {mentalbert_path}")
-            return False
+        model = lstm_head
+        tokenizer, mentalbert = encoder
+        logger.info(f"LSTM model ({type(model).__name__}) and MentalBERT ready")
+
+        # Cached predictions are only valid for these exact weights and settings
+        prediction_cache.register_model(
+            'mentalbert_lstm',
+            [config.LSTM_MODEL_PATH, config.LSTM_HEAD_NPZ_PATH, config.MENTALBERT_MODEL_PATH],
+            runtime=f"{config.ENCODER_BACKEND}:{config.ONNX_QUANTIZED}:"
+                    f"{config.MENTALBERT_EMBEDDING_MODE}:{type(model).__name__}:{long_text.get_runtime_tag()}:"
+                    f"{type(tokenizer).__name__}:{precision.get_active_precision('mentalbert')}"
+        )
 
         return True
 
@@ -50,46 +56,69 @@ def load_models():
         logger.error(f"Error loading models: {e}")
         return False
 
-def extract_embedding(text):
+def ensure_models_loaded():
+    """Load the models on first use; returns True when they are available"""
+    if model is None or tokenizer is None or mentalbert is None:
+        return load_models()
+    return True
+
+def extract_embedding(text, mode=None):
     """
     Extract embeddings from MentalBERT - exact copy from user's Model.py
     """
+    return extract_embeddings([text], mode=mode)
+
+def extract_embeddings(texts, mode=None, return_windows=False):
+    """
+    Extract MentalBERT embeddings for a list of texts with one tokenizer call
+    and one forward pass
+
+    In "padded" mode every text is padded to max_length=300 and mean-pooled as
+    in user's Model.py, so the embedding of a text does not depend on the rest
+    of the batch. In "dynamic" mode texts are padded to the longest text in the
+    batch and pooled with the attention mask. Texts longer than 300 tokens are
+    split into windows whose embeddings are averaged (long_text.py).
+
+    Args:
+        texts (list): Input texts
+        mode (str): "padded" or "dynamic" (default: MENTALBERT_EMBEDDING_MODE)
+        return_windows (bool): Also return the number of windows per text
+
+    Returns:
+        numpy array of embeddings (len(texts), 768)
+        [, list of window counts]
+    """
     global mentalbert, tokenizer
+    import torch
 
     if mentalbert is None or tokenizer is None:
         raise ValueError("Models not loaded")
 
+    mode = validate_embedding_mode(mode or config.MENTALBERT_EMBEDDING_MODE)
+
     mentalbert.eval()
-    inputs = tokenizer(text, padding="max_length", truncation=True, max_length=300, return_tensors="pt")
+    with tokenization.timed('mentalbert', 'tokenize'):
+        inputs, windows = long_text.tokenize_windows(
+            tokenizer, texts, max_length=300, pad_to_max_length=(mode == 'padded'), cache_name='mentalbert'
+        )
 
-    with torch.no_grad():
+    with torch.no_grad(), tokenization.timed('mentalbert', 'forward'):
         output = mentalbert(**inputs)
-        embedding = output.last_hidden_state.mean(dim=1)  # Mean pooling
+        embedding = pool_embeddings(output.last_hidden_state, inputs['attention_mask'], mode)  # Mean pooling
+        embedding = long_text.aggregate_windows(embedding, windows)
 
+    if return_windows:
+        return embedding.cpu().numpy(), windows.counts
     return embedding.cpu().numpy()
 
-def predict_sentiment(text):
-    """
-    Predict sentiment - exact copy from user's Model.py
-    """
-    global model
-
-    if model is None:
-        raise ValueError("LSTM model not loaded")
-
-    embedding = extract_embedding(text)
-
-    # Flatten the embedding from shape (1, 1, 768) to (1, 768)
-    embedding = embedding.reshape(1, 768)  # Reshape to match the LSTM input shape
-
-    prediction = model.predict(embedding)
-    sentiment_class = np.argmax(prediction)  # Get the class with the highest probability
+def format_prediction(probabilities):
+    """Convert one row of LSTM output probabilities into the API result format"""
+    sentiment_class = int(np.argmax(probabilities))  # Get the class with the highest probability
 
     label_mapping = {0: "Positive", 1: "Negative", 2: "Neutral"}
     predicted_sentiment = label_mapping[sentiment_class]
 
     # Get confidence scores
-    probabilities = prediction[0] if len(prediction.shape) > 1 else prediction
     confidence = float(probabilities[sentiment_class])
 
     # Create scores dict matching expected format
@@ -108,18 +137,53 @@ def predict_sentiment(text):
         'architecture': 'User Trained Model'
     }
 
+def predict_sentiment(text):
+    """
+    Predict sentiment - exact copy from user's Model.py
+    """
+    return predict_sentiment_batch([text])[0]
+
+def predict_sentiment_batch(texts):
+    """
+    Predict sentiment for a list of texts with a single MentalBERT forward pass
+    and a single LSTM predict call
+
+    Returns:
+        List of result dicts in the same order as texts
+    """
+    global model
+
+    if model is None:
+        raise ValueError("LSTM model not loaded")
+
+    embeddings, window_counts = extract_embeddings(texts, return_windows=True)
+
+    # Embeddings are (batch, 768) - the LSTM input shape
+    embeddings = embeddings.reshape(len(texts), 768)
+
+    with tokenization.timed('mentalbert_lstm', 'forward'):
+        prediction = model.predict(embeddings, verbose=0)
+
+    results = [format_prediction(probabilities) for probabilities in prediction]
+    for result, windows in zip(results, window_counts):
+        result['windows'] = windows
+    return results
+
 def predict_with_simple_model(text):
     """
     Main prediction function matching the expected API
     """
     try:
         # Ensure models are loaded
-        if model is None or tokenizer is None or mentalbert is None:
-            if not load_models():
-                raise ValueError("Failed to load models")
-
-        # Make prediction using user's exact logic
-        result = predict_sentiment(text)
+        if not ensure_models_loaded():
+            raise ValueError("Failed to load models")
+
+        # Make prediction using user's exact logic (served from the prediction
+        # cache, otherwise micro-batched with other concurrent requests)
+        result = prediction_cache.cached_predict(
+            'mentalbert_lstm', text,
+            lambda t: batching.submit('mentalbert_lstm', predict_sentiment_batch, t)
+        )
         return result
 
     except Exception as e:
@@ -138,6 +202,35 @@ def predict_with_simple_model(text):
             'error': str(e)
         }
 
-# Initialize models on import
-if __name__ != "__main__":
-    load_models()
\ No newline at end of file
+def predict_with_simple_model_batch(texts):
+    """
+    Batch prediction function for bulk scoring (e.g. CSV analysis)
+
+    Runs the uncached texts through one MentalBERT forward pass and one LSTM
+    predict call, bypassing the micro-batcher.
+
+    Returns:
+        List of result dicts in the same order as texts
+    """
+    try:
+        # Ensure models are loaded
+        if not ensure_models_loaded():
+            raise ValueError("Failed to load models")
+
+        return prediction_cache.cached_predict_many('mentalbert_lstm', texts, predict_sentiment_batch)
+
+    except Exception as e:
+        logger.error(f"Error in batch prediction: {e}")
+
+        # Return fallback prediction for every text
+        return [{
+            'sentiment': 'Neutral',
+            'confidence': 0.5,
+            'scores': {
+                'positive': 0.33,
+                'negative': 0.33,
+                'neutral': 0.34
+            },
+            'model': 'MentalBERT-LSTM (Error)',
+            'error': str(e)
+        } for _ in texts]
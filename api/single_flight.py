@@ -0,0 +1,132 @@
+"""
+Single-Flight Request Coalescing
+
+When several requests ask the same model about the same text at the same
+time (a double-submitted form, many users pasting the same text), only the
+first one runs the model; the others wait for it and share its result.
+
+Keys are the model name, its identity (so a swapped model never shares
+results with the previous one) and the normalized text. Only work that is
+in flight is shared - nothing is kept once it completes, so this works with
+or without the prediction cache (which prediction_cache.cached_predict
+checks first).
+"""
+import os
+import copy
+import logging
+import threading
+
+from config_manager import get_config
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+
+class _Call:
+    """One in-flight computation and the requests waiting for it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs a function once per key for all concurrent callers"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {'executions': 0, 'coalesced': 0, 'errors': 0}
+        self._coalesced_by_model = {}
+
+    def do(self, key, fn):
+        """
+        Run fn() unless the same key is already running, then wait for that run
+
+        Args:
+            key (tuple): Model name first, then anything that identifies the input
+            fn: Function with no arguments
+
+        Returns:
+            fn's result (a deep copy for coalesced callers); exceptions raised
+            by fn are raised in every caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+                self._stats['executions'] += 1
+            else:
+                call.waiters += 1
+                leader = False
+                self._stats['coalesced'] += 1
+                self._coalesced_by_model[key[0]] = self._coalesced_by_model.get(key[0], 0) + 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except Exception as e:
+                call.error = e
+                self._stats['errors'] += 1
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+            if call.error is not None:
+                raise call.error
+            # No new waiters after the key was removed; keep the shared result
+            # unmodified while they copy it
+            return copy.deepcopy(call.result) if call.waiters else call.result
+
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        # Callers may modify their result dict
+        return copy.deepcopy(call.result)
+
+    def get_stats(self):
+        """Coalescing counters for /api/health"""
+        with self._lock:
+            in_flight = len(self._calls)
+            waiting = sum(call.waiters for call in self._calls.values())
+
+        total = self._stats['executions'] + self._stats['coalesced']
+        return dict(
+            self._stats,
+            enabled=config.SINGLE_FLIGHT_ENABLED,
+            coalesced_rate=round(self._stats['coalesced'] / total, 3) if total else 0.0,
+            coalesced_by_model=dict(self._coalesced_by_model),
+            in_flight=in_flight,
+            waiting=waiting
+        )
+
+
+# Global instance
+single_flight = SingleFlight()
+
+
+def _reset_after_fork():
+    # In-flight calls belong to the parent's threads and never complete in the child
+    single_flight._calls = {}
+    single_flight._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def do(key, fn):
+    """Run fn once for all concurrent callers with the same key (see SingleFlight.do)"""
+    if not config.SINGLE_FLIGHT_ENABLED:
+        return fn()
+    return single_flight.do(key, fn)
+
+
+def get_single_flight_stats():
+    """Get request coalescing statistics"""
+    return single_flight.get_stats()
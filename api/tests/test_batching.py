@@ -0,0 +1,77 @@
+"""
+Unit Tests for Inference Micro-Batching
+
+Tests that concurrent requests are grouped into batches and that each caller
+receives its own result
+"""
+import unittest
+import threading
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batching import MicroBatcher
+
+
+class TestMicroBatcher(unittest.TestCase):
+    """Test the MicroBatcher scheduler"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.batch_sizes = []
+
+        def batch_fn(items):
+            self.batch_sizes.append(len(items))
+            return [item * 2 for item in items]
+
+        self.batch_fn = batch_fn
+
+    def test_single_item(self):
+        """Test that a single submit returns its own result"""
+        batcher = MicroBatcher('test', self.batch_fn, max_batch_size=8, max_wait_ms=1)
+
+        self.assertEqual(batcher.submit(21), 42, "Single item should get its result")
+        self.assertEqual(self.batch_sizes, [1], "Single item should run as a batch of one")
+
+    def test_concurrent_items_are_batched(self):
+        """Test that concurrent submits share a forward pass and keep their own results"""
+        batcher = MicroBatcher('test', self.batch_fn, max_batch_size=8, max_wait_ms=200)
+        results = {}
+
+        def worker(value):
+            results[value] = batcher.submit(value)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {i: i * 2 for i in range(8)},
+                         "Each caller should receive its own slice of the batch")
+        self.assertLess(len(self.batch_sizes), 8,
+                        "Concurrent items should be grouped into fewer batches")
+        self.assertLessEqual(max(self.batch_sizes), 8,
+                             "Batches should not exceed max_batch_size")
+
+        stats = batcher.get_stats()
+        self.assertEqual(stats['items'], 8, "Stats should count every item")
+        self.assertEqual(stats['queue_depth'], 0, "Queue should be drained")
+
+    def test_batch_error_propagates(self):
+        """Test that a failing batch raises in every caller"""
+        def failing_batch_fn(items):
+            raise RuntimeError("model failure")
+
+        batcher = MicroBatcher('failing', failing_batch_fn, max_batch_size=4, max_wait_ms=1)
+
+        with self.assertRaises(RuntimeError):
+            batcher.submit("text")
+
+        self.assertEqual(batcher.get_stats()['errors'], 1, "Errors should be counted")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
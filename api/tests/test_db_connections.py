@@ -0,0 +1,128 @@
+"""
+Unit Tests for the SQLite Connection Manager
+
+Tests connection reuse, WAL and pragmas, rollback, per-thread connections,
+fork reset and the MoodTrackingDB methods running on them
+"""
+import unittest
+import tempfile
+import threading
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import MoodTrackingDB
+from db_connections import config
+
+
+class ConnectionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = MoodTrackingDB(os.path.join(self.tmpdir.name, 'test.db'))
+
+    def tearDown(self):
+        self.db._connections.close_all()
+        self.tmpdir.cleanup()
+
+    def add_entry(self, user_id='user-1', text='A calm day'):
+        return self.db.create_journal_entry(user_id, text, 'Positive', 0.9, 8.0, {}, [], {})
+
+
+class TestConnectionReuse(ConnectionTestCase):
+    """Test persistent connections"""
+
+    def test_one_connection_per_thread(self):
+        """Test that repeated calls on one thread reuse its connection"""
+        self.add_entry()
+        self.db.get_journal_entries('user-1')
+        self.db.get_user_stats('user-1')
+
+        stats = self.db.get_connection_stats()
+        self.assertEqual(stats['opened'], 1, "Calls on the same thread should share a connection")
+        self.assertGreater(stats['checkouts'], 3)
+
+    def test_wal_and_pragmas(self):
+        """Test that connections use WAL and the configured pragmas"""
+        with self.db.connection() as conn:
+            self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+            self.assertEqual(conn.execute('PRAGMA busy_timeout').fetchone()[0], config.DB_BUSY_TIMEOUT_MS)
+            self.assertEqual(conn.execute('PRAGMA cache_size').fetchone()[0], -config.DB_CACHE_SIZE_KB)
+        self.assertEqual(self.db.get_connection_stats()['journal_mode'], 'wal')
+
+    def test_threads_get_own_connections(self):
+        """Test that each thread uses its own connection and finished threads are cleaned up"""
+        def work():
+            self.db.get_journal_entries('user-1')
+
+        for _ in range(3):
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+        self.db.get_journal_entries('user-1')
+
+        stats = self.db.get_connection_stats()
+        self.assertEqual(stats['opened'], 4, "This thread plus three workers")
+        self.assertLessEqual(stats['connections'], 2, "Connections of finished threads should be closed")
+
+
+class TestTransactions(ConnectionTestCase):
+    """Test commits and rollbacks on the shared connection"""
+
+    def test_failed_write_is_rolled_back(self):
+        """Test that an exception inside a write leaves no open transaction behind"""
+        with self.assertRaises(RuntimeError):
+            with self.db.connection() as conn:
+                conn.execute("INSERT INTO users (user_id) VALUES ('half-written')")
+                raise RuntimeError("boom")
+
+        with self.db.connection() as conn:
+            self.assertFalse(conn.in_transaction)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM users").fetchone()[0], 0)
+
+    def test_entry_and_user_written_together(self):
+        """Test that create_journal_entry creates the user and the entry"""
+        entry_id = self.add_entry()
+
+        entries = self.db.get_journal_entries('user-1')
+        self.assertEqual([entry['id'] for entry in entries], [entry_id])
+        with self.db.connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM users").fetchone()[0], 1)
+
+
+class TestForkAndMemory(unittest.TestCase):
+    """Test fork reset and in-memory databases"""
+
+    def test_fork_reset_opens_new_connection(self):
+        """Test that a forked child never reuses its parent's connection"""
+        tmpdir = tempfile.TemporaryDirectory()
+        db = MoodTrackingDB(os.path.join(tmpdir.name, 'fork.db'))
+        with db.connection() as parent_conn:
+            pass
+
+        db._connections._reset_after_fork()
+
+        with db.connection() as child_conn:
+            self.assertIsNot(child_conn, parent_conn)
+        db._connections.close_all()
+        parent_conn.close()
+        tmpdir.cleanup()
+
+    def test_in_memory_database_is_shared(self):
+        """Test that ':memory:' keeps its schema and data across threads"""
+        db = MoodTrackingDB(':memory:')
+        db.create_journal_entry('user-1', 'text', 'Neutral', 0.5, 5.0, {}, [], {})
+
+        counts = []
+        thread = threading.Thread(target=lambda: counts.append(len(db.get_journal_entries('user-1'))))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(counts, [1])
+        db._connections.close_all()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
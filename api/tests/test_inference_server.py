@@ -0,0 +1,144 @@
+"""
+Unit Tests for the Model Server Protocol
+
+Tests the framing and a client/server round trip over a Unix socket
+"""
+import unittest
+import tempfile
+import threading
+import socket
+import subprocess
+import sys
+import os
+
+# Add parent directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from inference_client import (
+    InferenceClient, InferenceServerError, send_frame, recv_frame, parse_address, OP_PREDICT
+)
+from model_server import create_server
+
+
+def fake_predict_one(text):
+    return {'sentiment': 'Positive', 'text_length': len(text), 'batched': False}
+
+
+def fake_predict_batch(texts):
+    return [{'sentiment': 'Negative', 'text_length': len(text), 'batched': True} for text in texts]
+
+
+def failing_predict_batch(texts):
+    raise RuntimeError("model exploded")
+
+
+class TestFraming(unittest.TestCase):
+    """Test the length-prefixed frame encoding"""
+
+    def test_frame_round_trip(self):
+        """Test that a frame survives a socket pair unchanged"""
+        left, right = socket.socketpair()
+        try:
+            send_frame(left, OP_PREDICT, {'model': 'roberta', 'texts': ['héllo']})
+            code, payload = recv_frame(right)
+        finally:
+            left.close()
+            right.close()
+
+        self.assertEqual(code, OP_PREDICT)
+        self.assertEqual(payload, {'model': 'roberta', 'texts': ['héllo']})
+
+    def test_closed_connection_returns_none(self):
+        """Test that a clean close between frames is not an error"""
+        left, right = socket.socketpair()
+        left.close()
+        self.assertEqual(recv_frame(right), (None, None))
+        right.close()
+
+    def test_parse_address(self):
+        """Test unix: and tcp: address parsing"""
+        self.assertEqual(parse_address('unix:/tmp/a.sock'), (socket.AF_UNIX, '/tmp/a.sock'))
+        self.assertEqual(parse_address('tcp:127.0.0.1:5002'), (socket.AF_INET, ('127.0.0.1', 5002)))
+        with self.assertRaises(ValueError):
+            parse_address('localhost:5002')
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "requires Unix domain sockets")
+class TestClientServer(unittest.TestCase):
+    """Test predictions through a real server on a Unix socket"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.address = f"unix:{os.path.join(self.tmp_dir.name, 'inference.sock')}"
+        self.server = create_server(self.address, {
+            'fake': (fake_predict_one, fake_predict_batch),
+            'broken': (fake_predict_one, failing_predict_batch),
+        })
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.client = InferenceClient(self.address, timeout=5)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp_dir.cleanup()
+
+    def test_single_and_batch_predictions(self):
+        """Test that single texts and batches use the matching server function"""
+        single = self.client.predict('fake', ['abc'])
+        batch = self.client.predict('fake', ['a', 'bb'])
+
+        self.assertEqual(single, [fake_predict_one('abc')])
+        self.assertEqual([r['text_length'] for r in batch], [1, 2])
+        self.assertTrue(all(r['batched'] for r in batch), "Multi-text requests should run as one batch")
+
+    def test_connection_is_reused(self):
+        """Test that a thread keeps one persistent connection"""
+        self.client.predict('fake', ['a'])
+        sock = self.client._local.sock
+        self.client.predict('fake', ['b'])
+
+        self.assertIs(self.client._local.sock, sock, "Connection should be reused between requests")
+        self.assertEqual(self.client.get_stats()['requests'], 2)
+
+    def test_server_errors_are_raised(self):
+        """Test that server-side failures and unknown models surface as errors"""
+        with self.assertRaises(InferenceServerError):
+            self.client.predict('broken', ['a', 'b'])
+        with self.assertRaises(InferenceServerError):
+            self.client.predict('missing', ['a'])
+
+        # Connection still usable after an error response
+        self.assertEqual(len(self.client.predict('fake', ['a'])), 1)
+
+    def test_unreachable_server(self):
+        """Test that a missing server raises InferenceServerError"""
+        client = InferenceClient(f"unix:{os.path.join(self.tmp_dir.name, 'missing.sock')}", timeout=1)
+        with self.assertRaises(InferenceServerError):
+            client.predict('fake', ['a'])
+
+
+class TestModelHandlers(unittest.TestCase):
+    """Test the model server's prediction functions"""
+
+    def test_handlers_do_not_import_web_tier(self):
+        """Test that the model server starts without Flask, the routes or the databases"""
+        code = (
+            "import sys, model_server; "
+            "handlers = model_server.get_model_handlers(); "
+            "print(sorted(handlers)); "
+            "print(','.join(m for m in ('flask', 'routes', 'database', 'user_manager', 'requests') if m in sys.modules))"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, PYTHONPATH=API_DIR)
+            result = subprocess.run([sys.executable, '-c', code], cwd=tmp, env=env, capture_output=True, text=True)
+
+            self.assertEqual(result.returncode, 0, f"get_model_handlers failed: {result.stderr}")
+            self.assertEqual(result.stdout.splitlines(), ["['mentalbert_lstm', 'roberta']", ''],
+                             "Web tier modules imported by the model server")
+            self.assertEqual(os.listdir(tmp), [], "No database files should be created")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,108 @@
+"""
+Unit Tests for Journal Entry Listing
+
+Tests keyset pagination, field projection and that JSON columns are only
+decoded when requested
+"""
+import unittest
+import tempfile
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import MoodTrackingDB
+
+
+class ListingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = MoodTrackingDB(os.path.join(self.tmpdir.name, 'test.db'))
+        # Created within the same second, so pages must break ties on id
+        self.entry_ids = [
+            self.db.create_journal_entry('user-1', f'entry {i}', 'Positive', 0.9, 8.0, {'positive': 0.9}, ['tag'], {})
+            for i in range(7)
+        ]
+        self.db.create_journal_entry('user-2', 'other user', 'Negative', 0.8, 2.0, {}, [], {})
+
+    def tearDown(self):
+        self.db._connections.close_all()
+        self.tmpdir.cleanup()
+
+
+class TestKeysetPagination(ListingTestCase):
+    """Test cursor-based pages"""
+
+    def test_pages_cover_all_entries_once(self):
+        """Test that following next_cursor returns every entry once, newest first"""
+        seen, cursor = [], None
+        while True:
+            entries, cursor = self.db.list_journal_entries('user-1', limit=3, cursor=cursor)
+            seen.extend(entry['id'] for entry in entries)
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, list(reversed(self.entry_ids)))
+
+    def test_last_page_has_no_cursor(self):
+        """Test that an exactly full last page does not point to an empty page"""
+        entries, cursor = self.db.list_journal_entries('user-1', limit=7)
+
+        self.assertEqual(len(entries), 7)
+        self.assertIsNone(cursor)
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        with self.assertRaises(ValueError):
+            self.db.list_journal_entries('user-1', cursor='not-a-cursor')
+
+    def test_sort_uses_index(self):
+        """Test that pages are read from idx_user_created without sorting"""
+        with self.db.connection() as conn:
+            plan = ' '.join(row[-1] for row in conn.execute('''
+                EXPLAIN QUERY PLAN
+                SELECT id, created_at FROM journal_entries
+                WHERE user_id = ? AND (created_at, id) < (?, ?)
+                ORDER BY created_at DESC, id DESC LIMIT 10
+            ''', ('user-1', '2024-01-01', 1)))
+
+        self.assertIn('idx_user_created', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+
+class TestFieldProjection(ListingTestCase):
+    """Test the fields parameter"""
+
+    def test_only_requested_fields(self):
+        """Test that only the requested fields (plus id) are returned"""
+        entries, _ = self.db.list_journal_entries('user-1', limit=1, fields=['sentiment', 'mood_score'])
+
+        self.assertEqual(set(entries[0]), {'id', 'user_id', 'sentiment', 'mood_score'})
+
+    def test_json_fields_decoded_when_requested(self):
+        """Test that requested JSON fields are decoded"""
+        entries, _ = self.db.list_journal_entries('user-1', limit=1, fields=['scores', 'tags'])
+
+        self.assertEqual(entries[0]['scores'], {'positive': 0.9})
+        self.assertEqual(entries[0]['tags'], ['tag'])
+
+    def test_json_fields_not_decoded_otherwise(self):
+        """Test that JSON columns which are not requested are never parsed"""
+        with self.db.connection() as conn:
+            conn.execute("UPDATE journal_entries SET analysis = 'not json'")
+            conn.commit()
+
+        entries, _ = self.db.list_journal_entries('user-1', fields=['text'])
+
+        self.assertEqual(len(entries), 7)
+
+    def test_unknown_field(self):
+        """Test that unknown fields are rejected"""
+        with self.assertRaises(ValueError):
+            self.db.list_journal_entries('user-1', fields=['password'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
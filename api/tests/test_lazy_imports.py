@@ -0,0 +1,78 @@
+"""
+Unit Tests for Lazy Imports and No-ML Mode
+
+Tests that the inference modules import without the ML frameworks, the
+import-time report parser and the disabled model registry
+"""
+import unittest
+import subprocess
+import tempfile
+import sys
+import os
+
+# Add parent directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from database import get_db
+from import_report import parse_importtime
+from model_registry import ModelRegistry
+
+
+class TestLazyImports(unittest.TestCase):
+    """Test that ML frameworks are imported only on first use"""
+
+    def test_inference_modules_do_not_import_ml_frameworks(self):
+        """Test importing the prediction modules in a fresh interpreter"""
+        code = (
+            "import simple_model, model_registry, warmup, embedding_utils, batching, "
+            "prediction_cache, inference_client, thread_budget, import_report; "
+            "print(','.join(import_report.get_loaded_heavy_modules()))"
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd=API_DIR, capture_output=True, text=True)
+
+        self.assertEqual(result.returncode, 0, f"Import failed: {result.stderr}")
+        self.assertEqual(result.stdout.strip(), '', "Heavy packages imported at module load")
+
+
+class TestImportReport(unittest.TestCase):
+    """Test the -X importtime parser"""
+
+    def test_self_times_summed_per_package(self):
+        """Test that submodules count towards their top-level package"""
+        output = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       100 |        100 |   numpy.core",
+            "import time:        50 |        150 | numpy",
+            "import time:       500 |        500 | pandas",
+            "some unrelated line",
+        ])
+
+        totals = parse_importtime(output)
+
+        self.assertEqual(totals, {'pandas': 500, 'numpy': 150})
+        self.assertEqual(list(totals), ['pandas', 'numpy'], "Most expensive first")
+
+
+class TestNoMLMode(unittest.TestCase):
+    """Test the registry and database in a no-ML process"""
+
+    def test_disabled_registry_never_loads(self):
+        """Test that a disabled registry does not call loaders"""
+        calls = []
+        registry = ModelRegistry(enabled=False)
+        registry.register('roberta', lambda: calls.append(1) or 'model')
+
+        self.assertIsNone(registry.get('roberta'))
+        self.assertEqual(calls, [], "Loader must not run with ML disabled")
+        self.assertIn('ML_ENABLED', registry.get_report()['models']['roberta']['error'])
+
+    def test_shared_database_instance(self):
+        """Test that get_db returns one instance per path"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'shared.db')
+            self.assertIs(get_db(path), get_db(path))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
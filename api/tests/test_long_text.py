@@ -0,0 +1,112 @@
+"""
+Unit Tests for Sliding-Window Long-Text Inference
+
+Tests window splitting, window tokenization and aggregation
+"""
+import unittest
+import importlib.util
+import tempfile
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from long_text import split_windows, tokenize_windows, aggregate_windows, WindowedBatch
+
+HAS_TORCH = importlib.util.find_spec('torch') is not None
+HAS_TRANSFORMERS = importlib.util.find_spec('transformers') is not None
+
+
+class WordTokenizer:
+    """Tokenizer stand-in: one token per word, [CLS]=101 ... [SEP]=102, pad=0"""
+
+    pad_token_id = 0
+    model_input_names = ['input_ids', 'attention_mask']
+
+    def __call__(self, texts, add_special_tokens=True, verbose=True):
+        return {'input_ids': [[1000 + len(word) for word in text.split()] for text in texts]}
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 2
+
+    def build_inputs_with_special_tokens(self, ids):
+        return [101] + ids + [102]
+
+
+class BertWordTokenizer(WordTokenizer):
+    """WordTokenizer declaring the inputs of a BERT tokenizer"""
+
+    model_input_names = ['input_ids', 'token_type_ids', 'attention_mask']
+
+
+class TestSplitWindows(unittest.TestCase):
+    """Test window offsets"""
+
+    def test_short_text_is_one_window(self):
+        """Test that texts that fit are not split"""
+        self.assertEqual(split_windows(100, 510, 64), [(0, 100)])
+        self.assertEqual(split_windows(0, 510, 64), [(0, 0)])
+
+    def test_windows_overlap_and_cover_everything(self):
+        """Test that windows overlap by the stride and reach the last token"""
+        spans = split_windows(1000, 510, 64)
+
+        self.assertEqual(spans, [(0, 510), (446, 956), (892, 1000)])
+        for (_, previous_end), (start, _) in zip(spans, spans[1:]):
+            self.assertEqual(previous_end - start, 64, "Consecutive windows share the stride")
+
+
+@unittest.skipUnless(HAS_TORCH, "requires torch")
+class TestWindowedInference(unittest.TestCase):
+    """Test window tokenization and aggregation"""
+
+    def test_long_text_split_into_rows(self):
+        """Test that a long text becomes several encoder rows in one batch"""
+        inputs, batch = tokenize_windows(WordTokenizer(), ['short text', 'word ' * 20], max_length=10)
+
+        # 8 content tokens per window, stride capped at half a window
+        self.assertEqual(batch.counts, [1, 4])
+        self.assertEqual(batch.window_map, [0, 1, 1, 1, 1])
+        self.assertEqual(tuple(inputs['input_ids'].shape), (5, 10))
+        self.assertEqual(inputs['input_ids'][0].tolist()[:4], [101, 1005, 1004, 102])
+        self.assertEqual(inputs['attention_mask'][0].tolist(), [1, 1, 1, 1, 0, 0, 0, 0, 0, 0])
+
+    def test_inputs_match_model_input_names(self):
+        """Test that BERT batches include the token_type_ids their encoders require"""
+        inputs, _ = tokenize_windows(BertWordTokenizer(), ['short text', 'word ' * 20], max_length=10)
+
+        self.assertEqual(set(inputs), set(BertWordTokenizer.model_input_names))
+        self.assertEqual(inputs['token_type_ids'].tolist(), [[0] * 10] * 5)
+
+        roberta_inputs, _ = tokenize_windows(WordTokenizer(), ['short text'], max_length=10)
+        self.assertEqual(set(roberta_inputs), {'input_ids', 'attention_mask'})
+
+    @unittest.skipUnless(HAS_TRANSFORMERS, "requires transformers")
+    def test_bert_tokenizer_inputs(self):
+        """Test the returned keys against a real BERT tokenizer's model_input_names"""
+        from transformers import BertTokenizerFast
+
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as vocab:
+            vocab.write('\n'.join(['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]', 'calm', 'day']))
+        self.addCleanup(os.remove, vocab.name)
+        tokenizer = BertTokenizerFast(vocab_file=vocab.name)
+
+        inputs, _ = tokenize_windows(tokenizer, ['calm day', 'calm ' * 20], max_length=10)
+
+        self.assertEqual(set(inputs), set(tokenizer.model_input_names))
+
+    def test_weighted_aggregation(self):
+        """Test that windows are averaged per text, weighted by their tokens"""
+        import torch
+
+        values = torch.tensor([[1.0, 1.0], [2.0, 0.0], [4.0, 0.0]])
+        batch = WindowedBatch(window_map=[0, 1, 1], weights=[5, 3, 1], counts=[1, 2])
+
+        result = aggregate_windows(values, batch)
+
+        self.assertTrue(torch.allclose(result, torch.tensor([[1.0, 1.0], [2.5, 0.0]])))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,96 @@
+"""
+Unit Tests for the NumPy LSTM Head
+
+Tests the TensorFlow-free forward pass used to serve the MentalBERT-LSTM head
+"""
+import unittest
+import tempfile
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lstm_head import NumpyLSTMHead, FORMAT_VERSION
+
+
+def sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class TestNumpyLSTMHead(unittest.TestCase):
+    """Test the NumPy forward pass against hand-computed results"""
+
+    def setUp(self):
+        """Build a small Reshape -> LSTM -> Dropout -> Dense(softmax) head"""
+        rng = np.random.default_rng(42)
+        self.features, self.units, self.classes = 8, 4, 3
+
+        self.weights = {
+            '1/kernel': rng.normal(size=(self.features, 4 * self.units)).astype(np.float32),
+            '1/recurrent_kernel': rng.normal(size=(self.units, 4 * self.units)).astype(np.float32),
+            '1/bias': rng.normal(size=(4 * self.units,)).astype(np.float32),
+            '3/kernel': rng.normal(size=(self.units, self.classes)).astype(np.float32),
+            '3/bias': rng.normal(size=(self.classes,)).astype(np.float32),
+        }
+        self.spec = {
+            'format_version': FORMAT_VERSION,
+            'keras_version': 3,
+            'input_shape': [self.features],
+            'layers': [
+                {'type': 'Reshape', 'name': 'reshape', 'target_shape': [1, self.features]},
+                {'type': 'LSTM', 'name': 'lstm', 'units': self.units, 'activation': 'tanh',
+                 'recurrent_activation': 'sigmoid', 'use_bias': True,
+                 'return_sequences': False, 'go_backwards': False},
+                {'type': 'Dropout', 'name': 'dropout'},
+                {'type': 'Dense', 'name': 'dense', 'activation': 'softmax'},
+            ]
+        }
+        self.head = NumpyLSTMHead(self.spec, self.weights)
+        self.inputs = rng.normal(size=(5, self.features)).astype(np.float32)
+
+    def expected_output(self, x):
+        """Single-step LSTM from a zero state followed by a softmax Dense layer"""
+        u = self.units
+        z = x @ self.weights['1/kernel'] + self.weights['1/bias']
+        i, g, o = sigmoid(z[:, :u]), np.tanh(z[:, 2 * u:3 * u]), sigmoid(z[:, 3 * u:])
+        h = o * np.tanh(i * g)
+
+        logits = h @ self.weights['3/kernel'] + self.weights['3/bias']
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def test_forward_pass_matches_reference(self):
+        """Test that predict() matches the hand-computed LSTM + Dense output"""
+        actual = self.head.predict(self.inputs, verbose=0)
+        np.testing.assert_allclose(actual, self.expected_output(self.inputs), rtol=1e-5, atol=1e-6)
+
+    def test_probabilities_sum_to_one(self):
+        """Test that the softmax output is a probability distribution per row"""
+        probabilities = self.head.predict(self.inputs)
+
+        self.assertEqual(probabilities.shape, (5, self.classes), "Output should be (batch, classes)")
+        np.testing.assert_allclose(probabilities.sum(axis=1), np.ones(5), rtol=1e-5)
+
+    def test_npz_round_trip(self):
+        """Test that saving and loading the .npz keeps predictions identical"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            npz_path = os.path.join(tmp_dir, 'head.npz')
+            self.head.save(npz_path)
+            reloaded = NumpyLSTMHead.load(npz_path)
+
+        np.testing.assert_array_equal(reloaded.predict(self.inputs), self.head.predict(self.inputs))
+
+    def test_unsupported_layer_rejected(self):
+        """Test that unknown layer types fail loudly instead of being skipped"""
+        spec = dict(self.spec, layers=[{'type': 'Conv1D', 'name': 'conv'}])
+        head = NumpyLSTMHead(spec, {})
+
+        with self.assertRaises(ValueError):
+            head.predict(self.inputs)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
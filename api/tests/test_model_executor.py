@@ -0,0 +1,150 @@
+"""
+Unit Tests for Concurrent Model Execution
+
+Tests the bounded executor used to run both models side by side and the
+confidence-gated cascade
+"""
+import unittest
+import threading
+import time
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_executor
+from model_executor import BoundedExecutor, escalation_reason, predict_dual, predict_dual_batch
+
+
+def slow(value, delay=0.2):
+    time.sleep(delay)
+    return value
+
+
+def failing(value):
+    raise ValueError(f"bad input: {value}")
+
+
+class TestBoundedExecutor(unittest.TestCase):
+    """Test concurrent dispatch, ordering, errors and saturation"""
+
+    def setUp(self):
+        self.executor = BoundedExecutor(max_workers=1)
+
+    def test_calls_run_concurrently(self):
+        """Test that two slow calls take about as long as one"""
+        start = time.perf_counter()
+        results = self.executor.run_all([(slow, ('roberta',)), (slow, ('lstm',))])
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(results, ['roberta', 'lstm'], "Results should keep call order")
+        self.assertLess(elapsed, 0.35, "Concurrent calls should not take the sum of both delays")
+        self.assertEqual(self.executor.get_stats()['concurrent_runs'], 1)
+
+    def test_errors_are_reraised(self):
+        """Test that an exception in either call reaches the caller"""
+        with self.assertRaises(ValueError):
+            self.executor.run_all([(failing, ('a',)), (slow, ('b', 0))])
+        with self.assertRaises(ValueError):
+            self.executor.run_all([(slow, ('a', 0)), (failing, ('b',))])
+
+        self.assertEqual(self.executor.get_stats()['errors'], 2)
+
+    def test_saturated_executor_runs_sequentially(self):
+        """Test that calls run inline instead of queueing when all slots are busy"""
+        release = threading.Event()
+        blocker = threading.Thread(
+            target=self.executor.run_all,
+            args=([(release.wait, (5,)), (slow, ('x', 0))],)
+        )
+        blocker.start()
+        time.sleep(0.05)
+
+        results = self.executor.run_all([(slow, ('a', 0)), (slow, ('b', 0))])
+        release.set()
+        blocker.join()
+
+        self.assertEqual(results, ['a', 'b'])
+        self.assertEqual(self.executor.get_stats()['sequential_runs'], 1,
+                         "Second request should fall back to sequential execution")
+
+
+def clear_result(text):
+    return {'sentiment': 'Positive', 'confidence': 0.95, 'scores': {'positive': 0.95, 'neutral': 0.03, 'negative': 0.02}}
+
+
+def unsure_result(text):
+    return {'sentiment': 'Neutral', 'confidence': 0.5, 'scores': {'positive': 0.3, 'neutral': 0.5, 'negative': 0.2}}
+
+
+class TestCascade(unittest.TestCase):
+    """Test that the second model only runs when the first is unsure"""
+
+    def setUp(self):
+        self.second_calls = []
+
+    def second_model(self, text):
+        self.second_calls.append(text)
+        return {'sentiment': 'Negative', 'confidence': 0.8, 'scores': {}}
+
+    def second_model_batch(self, texts):
+        return [self.second_model(text) for text in texts]
+
+    def test_escalation_reasons(self):
+        """Test each reason for running the second model"""
+        self.assertIsNone(escalation_reason(clear_result(''), 'short text'))
+        self.assertEqual(escalation_reason(unsure_result(''), 'short text'), 'low_confidence')
+        self.assertEqual(escalation_reason({'error': 'boom'}, 'short text'), 'first_model_error')
+        self.assertEqual(escalation_reason(clear_result(''), 'word ' * 1000), 'long_text')
+
+        close_call = {'confidence': 0.9, 'scores': {'positive': 0.9, 'neutral': 0.85, 'negative': 0.0}}
+        self.assertEqual(escalation_reason(close_call, 'short text'), 'ambiguous')
+
+    def test_clear_text_runs_one_model(self):
+        """Test that a confident first model skips the second"""
+        roberta, lstm, info = predict_dual(clear_result, self.second_model, 'great day', mode='cascade')
+
+        self.assertEqual(roberta['sentiment'], 'Positive')
+        self.assertIsNone(lstm)
+        self.assertEqual(info['models_run'], ['roberta'])
+        self.assertEqual(self.second_calls, [])
+
+    def test_unsure_text_runs_both_models(self):
+        """Test that an unsure first model escalates"""
+        roberta, lstm, info = predict_dual(unsure_result, self.second_model, 'meh', mode='cascade')
+
+        self.assertEqual(lstm['sentiment'], 'Negative')
+        self.assertEqual(info['models_run'], ['roberta', 'lstm'])
+        self.assertEqual(info['escalation_reason'], 'low_confidence')
+
+    def test_batch_sends_only_escalated_texts(self):
+        """Test that the second model gets one batch with only the unsure texts"""
+        def first_model_batch(texts):
+            return [unsure_result(text) if 'meh' in text else clear_result(text) for text in texts]
+
+        before = model_executor.get_cascade_stats()
+        roberta, lstm, infos = predict_dual_batch(
+            first_model_batch, self.second_model_batch, ['great', 'meh', 'love it', 'meh again'], mode='cascade'
+        )
+
+        self.assertEqual(self.second_calls, ['meh', 'meh again'])
+        self.assertEqual([result is not None for result in lstm], [False, True, False, True])
+        self.assertEqual(len(roberta), 4)
+        self.assertEqual([info['escalation_reason'] for info in infos], [None, 'low_confidence', None, 'low_confidence'])
+
+        after = model_executor.get_cascade_stats()
+        self.assertEqual(after['texts'] - before['texts'], 4)
+        self.assertEqual(after['escalated'] - before['escalated'], 2)
+
+    def test_both_mode_always_runs_both(self):
+        """Test that mode=both ignores confidence"""
+        roberta, lstm, info = predict_dual(clear_result, self.second_model, 'great day', mode='both')
+
+        self.assertIsNotNone(lstm)
+        self.assertEqual(info['mode'], 'both')
+        self.assertEqual(info['models_run'], ['roberta', 'lstm'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,150 @@
+"""
+Unit Tests for the Shared Model Registry
+
+Tests that each model is loaded once per process and its footprint reported
+"""
+import unittest
+import threading
+import runpy
+import time
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+import model_registry
+from model_registry import ModelRegistry, estimate_weights_bytes
+from lstm_head import NumpyLSTMHead, FORMAT_VERSION
+from config_manager import api_path
+
+
+class TestModelRegistry(unittest.TestCase):
+    """Test lazy loading, load failures and the footprint report"""
+
+    def setUp(self):
+        self.registry = ModelRegistry()
+        self.load_count = 0
+
+    def slow_loader(self):
+        self.load_count += 1
+        time.sleep(0.05)
+        return NumpyLSTMHead({'format_version': FORMAT_VERSION, 'layers': []}, {'0/kernel': np.zeros((512, 512), dtype=np.float32)})
+
+    def test_model_loaded_once(self):
+        """Test that repeated get() calls share one loaded instance"""
+        self.registry.register('head', self.slow_loader)
+
+        self.assertFalse(self.registry.is_loaded('head'), "Models should load lazily")
+        first = self.registry.get('head')
+        second = self.registry.get('head')
+
+        self.assertIs(first, second, "get() should return the same instance")
+        self.assertEqual(self.load_count, 1, "Loader should run exactly once")
+
+    def test_concurrent_first_requests_load_once(self):
+        """Test that concurrent first requests wait for a single load"""
+        self.registry.register('head', self.slow_loader)
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(self.registry.get('head'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.load_count, 1, "Concurrent requests should not load twice")
+        self.assertIsNotNone(results[0])
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_failed_load_is_remembered(self):
+        """Test that a failing loader is not retried until reload()"""
+        def failing_loader():
+            self.load_count += 1
+            raise FileNotFoundError("weights missing")
+
+        self.registry.register('missing', failing_loader)
+
+        self.assertIsNone(self.registry.get('missing'))
+        self.assertIsNone(self.registry.get('missing'))
+        self.assertEqual(self.load_count, 1, "Failed load should not be retried per request")
+        self.assertEqual(self.registry.get_report()['models']['missing']['error'], "weights missing")
+
+        self.registry.reload('missing')
+        self.assertEqual(self.load_count, 2, "reload() should retry the load")
+
+    def test_report_includes_footprint(self):
+        """Test that the report has load time and weight size per model"""
+        self.registry.register('head', self.slow_loader)
+        self.registry.get('head')
+
+        info = self.registry.get_report()['models']['head']
+        self.assertTrue(info['loaded'])
+        self.assertGreaterEqual(info['load_time_s'], 0.05)
+        self.assertEqual(info['weights_mb'], 1.0, "512x512 float32 weights are 1 MB")
+
+    def test_estimate_weights_of_tuple(self):
+        """Test that tuples (model, tokenizer) only count weight arrays"""
+        head = NumpyLSTMHead({'format_version': FORMAT_VERSION, 'layers': []}, {'w': np.zeros(10, dtype=np.float32)})
+        self.assertEqual(estimate_weights_bytes((head, "tokenizer")), 40)
+
+
+class TestPreloadAndFork(unittest.TestCase):
+    """Test the MODEL_PRELOAD (load in master, fork workers) path"""
+
+    def test_preloaded_weights_are_read_only(self):
+        """Test that preloaded NumPy weights cannot be written by workers"""
+        head = NumpyLSTMHead({'format_version': FORMAT_VERSION, 'layers': []}, {'w': np.zeros(4, dtype=np.float32)})
+        model_registry._make_read_only((head, "tokenizer"))
+
+        with self.assertRaises(ValueError):
+            head.weights['w'][0] = 1.0
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "requires os.fork")
+    def test_forked_worker_reuses_parent_model(self):
+        """Test that a forked child sees the parent's model without loading it again"""
+        registry = ModelRegistry()
+        loads = []
+        registry.register('head', lambda: loads.append(os.getpid()) or "weights")
+        registry.get('head')
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # Child: report whether the model came from the parent, then exit
+            os.close(read_fd)
+            registry._reset_locks_after_fork()
+            ok = registry.get('head') == "weights" and registry.preloaded_in_parent() and len(loads) == 1
+            os.write(write_fd, b'1' if ok else b'0')
+            os._exit(0)
+
+        os.close(write_fd)
+        result = os.read(read_fd, 1)
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+
+        self.assertEqual(result, b'1', "Child should reuse the preloaded model")
+        self.assertFalse(registry.preloaded_in_parent(), "Parent loaded the model itself")
+
+
+class TestGunicornPaths(unittest.TestCase):
+    """Test that gunicorn keeps the working directory of the baseline"""
+
+    def test_config_does_not_change_directory(self):
+        """Test that the gunicorn config imports from api/ without chdir"""
+        settings = runpy.run_path(os.path.join(API_DIR, 'gunicorn.conf.py'))
+
+        self.assertNotIn('chdir', settings, "mood_tracking.db must stay relative to the launch directory")
+        self.assertEqual(settings['pythonpath'], API_DIR)
+
+    def test_model_paths_are_relative_to_api(self):
+        """Test that model paths resolve against api/, not the working directory"""
+        self.assertEqual(api_path('../onnx_models'), os.path.join(os.path.dirname(API_DIR), 'onnx_models'))
+        self.assertEqual(api_path('/models/roberta'), '/models/roberta')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,125 @@
+"""
+Unit Tests for Low-RAM Model Weight Loading
+
+Tests safetensors header parsing, the memory-mapped state dict and how
+from_pretrained is called for converted and unconverted model directories
+"""
+import unittest
+import importlib.util
+import tempfile
+import struct
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_weights
+
+HAS_TORCH = importlib.util.find_spec('torch') is not None
+
+
+def write_safetensors(path, tensors):
+    """Write a .safetensors file from name -> (dtype, shape, raw bytes)"""
+    header, data = {'__metadata__': {'format': 'pt'}}, b''
+    for name, (dtype, shape, raw) in tensors.items():
+        header[name] = {'dtype': dtype, 'shape': shape, 'data_offsets': [len(data), len(data) + len(raw)]}
+        data += raw
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    header_bytes += b' ' * (-len(header_bytes) % 8)
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<Q', len(header_bytes)) + header_bytes + data)
+
+
+class FakeModel:
+    """Records the from_pretrained arguments"""
+
+    @classmethod
+    def from_pretrained(cls, model_dir, **kwargs):
+        model = cls()
+        model.model_dir = model_dir
+        model.kwargs = kwargs
+        return model
+
+
+class WeightsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.model_dir = self.tmpdir.name
+        self.path = os.path.join(self.model_dir, model_weights.SAFETENSORS_FILE)
+        self.mmap = model_weights.config.MODEL_WEIGHTS_MMAP
+
+    def tearDown(self):
+        model_weights.config.MODEL_WEIGHTS_MMAP = self.mmap
+        self.tmpdir.cleanup()
+
+
+class TestSafetensorsFormat(WeightsTestCase):
+    """Test reading converted weight files"""
+
+    def test_read_header(self):
+        """Test that tensor entries and the data offset are parsed"""
+        write_safetensors(self.path, {'w': ('F32', [2], struct.pack('<2f', 1.0, 2.0))})
+
+        data_start, header = model_weights.read_safetensors_header(self.path)
+
+        self.assertEqual(list(header), ['w'], "Metadata should not be returned as a tensor")
+        self.assertEqual(header['w']['shape'], [2])
+        self.assertEqual(data_start % 8, 0)
+
+    @unittest.skipUnless(HAS_TORCH, "requires torch")
+    def test_mmap_state_dict(self):
+        """Test that tensors are read from the mapped file, aligned or not"""
+        import torch
+
+        write_safetensors(self.path, {
+            'flag': ('U8', [1], b'\x01'),
+            'weight': ('F32', [2, 2], struct.pack('<4f', 1.0, 2.0, 3.0, 4.0)),
+        })
+
+        state_dict = model_weights.load_mmap_state_dict(self.path)
+
+        self.assertEqual(state_dict['flag'].tolist(), [1])
+        self.assertTrue(torch.equal(state_dict['weight'], torch.tensor([[1.0, 2.0], [3.0, 4.0]])))
+
+
+class TestLoadPretrained(WeightsTestCase):
+    """Test the from_pretrained arguments"""
+
+    def test_unconverted_directory(self):
+        """Test that directories without safetensors load as before"""
+        model = model_weights.load_pretrained('fake', FakeModel, self.model_dir)
+
+        self.assertNotIn('state_dict', model.kwargs)
+        self.assertEqual(model_weights.get_load_info('fake')['weights_format'], 'pytorch_bin')
+
+    def test_safetensors_without_mmap(self):
+        """Test that MODEL_WEIGHTS_MMAP=False lets transformers read the safetensors file"""
+        write_safetensors(self.path, {'w': ('F32', [1], struct.pack('<f', 1.0))})
+        model_weights.config.MODEL_WEIGHTS_MMAP = False
+
+        model = model_weights.load_pretrained('fake', FakeModel, self.model_dir)
+
+        self.assertTrue(model.kwargs.get('use_safetensors'))
+        self.assertFalse(model_weights.get_load_info('fake')['mmap'])
+
+    @unittest.skipUnless(HAS_TORCH, "requires torch")
+    def test_safetensors_with_mmap(self):
+        """Test that converted weights are passed to from_pretrained as a mapped state dict"""
+        write_safetensors(self.path, {'w': ('F32', [1], struct.pack('<f', 1.0))})
+        model_weights.config.MODEL_WEIGHTS_MMAP = True
+
+        model = model_weights.load_pretrained('fake', FakeModel, self.model_dir)
+
+        self.assertEqual(list(model.kwargs['state_dict']), ['w'])
+        self.assertEqual(model_weights.get_load_info('fake'), {
+            'weights_format': 'safetensors', 'mmap': True,
+            'low_cpu_mem_usage': model.kwargs.get('low_cpu_mem_usage', False)
+        })
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,126 @@
+"""
+Unit Tests for the Mood Trend Query
+
+Tests the entry_day column and its migration, and that N-day trends come
+from one indexed range query with empty days filled in
+"""
+import unittest
+import tempfile
+import sqlite3
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import MoodTrackingDB
+
+TREND_QUERY = '''
+    SELECT entry_day, AVG(mood_score)
+    FROM journal_entries
+    WHERE user_id = ? AND entry_day BETWEEN ? AND ?
+    GROUP BY entry_day
+'''
+
+
+class TrendTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'test.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def open_db(self):
+        db = MoodTrackingDB(self.path)
+        self.addCleanup(db._connections.close_all)
+        return db
+
+    def insert_on_day(self, db, days_ago, mood_score, user_id='user-1'):
+        date = (datetime.now() - timedelta(days=days_ago)).isoformat()
+        with db.connection() as conn:
+            conn.execute('''
+                INSERT INTO journal_entries (user_id, text, sentiment, confidence, mood_score, date, entry_day)
+                VALUES (?, 'text', 'Neutral', 0.5, ?, ?, ?)
+            ''', (user_id, mood_score, date, date[:10]))
+            conn.commit()
+
+
+class TestMoodTrend(TrendTestCase):
+    """Test N-day trends"""
+
+    def test_trend_is_zero_filled(self):
+        """Test daily averages, with days without entries set to None"""
+        db = self.open_db()
+        self.insert_on_day(db, 0, 8.0)
+        self.insert_on_day(db, 0, 6.0)
+        self.insert_on_day(db, 2, 3.0)
+        self.insert_on_day(db, 9, 9.0)
+
+        trend = db.get_weekly_mood_trend('user-1', 7)
+
+        self.assertEqual(len(trend), 7)
+        self.assertEqual(trend[-1], {'date': datetime.now().date().isoformat(), 'average_mood': 7.0})
+        self.assertEqual([day['average_mood'] for day in trend], [None, None, None, None, 3.0, None, 7.0])
+
+    def test_long_trend(self):
+        """Test that the days parameter can cover a year"""
+        db = self.open_db()
+        self.insert_on_day(db, 200, 4.0)
+
+        trend = db.get_weekly_mood_trend('user-1', 365)
+
+        self.assertEqual(len(trend), 365)
+        self.assertEqual([day['average_mood'] for day in trend if day['average_mood']], [4.0])
+
+    def test_trend_uses_index(self):
+        """Test that the trend query is an index range scan"""
+        db = self.open_db()
+        with db.connection() as conn:
+            plan = ' '.join(row[-1] for row in conn.execute('EXPLAIN QUERY PLAN ' + TREND_QUERY, ('u', 'a', 'b')))
+
+        self.assertIn('idx_user_entry_day', plan)
+
+
+class TestEntryDayMigration(TrendTestCase):
+    """Test adding entry_day to existing databases"""
+
+    def test_new_entries_have_entry_day(self):
+        """Test that create_journal_entry stores the entry day"""
+        db = self.open_db()
+        db.create_journal_entry('user-1', 'text', 'Positive', 0.9, 8.0, {}, [], {})
+
+        with db.connection() as conn:
+            entry_day = conn.execute('SELECT entry_day FROM journal_entries').fetchone()[0]
+        self.assertEqual(entry_day, datetime.now().date().isoformat())
+
+    def test_existing_rows_are_backfilled(self):
+        """Test that opening a database without entry_day adds and fills the column"""
+        conn = sqlite3.connect(self.path)
+        conn.execute('''
+            CREATE TABLE journal_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, text TEXT NOT NULL,
+                sentiment TEXT NOT NULL, confidence REAL NOT NULL, mood_score REAL NOT NULL,
+                scores TEXT, tags TEXT, analysis TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, date TEXT NOT NULL
+            )
+        ''')
+        conn.execute('''
+            INSERT INTO journal_entries (user_id, text, sentiment, confidence, mood_score, date)
+            VALUES ('user-1', 'text', 'Neutral', 0.5, 5.0, '2024-03-01T21:15:00')
+        ''')
+        conn.commit()
+        conn.close()
+
+        db = self.open_db()
+
+        with db.connection() as conn:
+            entry_day = conn.execute('SELECT entry_day FROM journal_entries').fetchone()[0]
+        self.assertEqual(entry_day, '2024-03-01')
+        self.assertEqual(db.get_user_stats('user-1')['total_entries'], 1, "Rollups are backfilled after the migration")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
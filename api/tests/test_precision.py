@@ -0,0 +1,116 @@
+"""
+Unit Tests for Reduced-Precision Encoders
+
+Tests CPU feature detection, precision fallback and the parity tolerances
+"""
+import unittest
+import importlib.util
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import precision
+
+HAS_TORCH = importlib.util.find_spec('torch') is not None
+
+X86_CPUINFO = """processor	: 0
+vendor_id	: GenuineIntel
+flags		: fpu sse2 avx2 avx512f avx512_bf16 amx_tile
+"""
+
+ARM_CPUINFO = """processor	: 0
+Features	: fp asimd sha2 bf16 i8mm
+"""
+
+
+class TestCpuFeatures(unittest.TestCase):
+    """Test bfloat16 support detection"""
+
+    def setUp(self):
+        self._read_cpu_flags = precision._read_cpu_flags
+
+    def tearDown(self):
+        precision._read_cpu_flags = self._read_cpu_flags
+
+    def test_parse_cpu_flags(self):
+        """Test that x86 flags and ARM features are parsed"""
+        self.assertIn('avx512_bf16', precision.parse_cpu_flags(X86_CPUINFO))
+        self.assertIn('bf16', precision.parse_cpu_flags(ARM_CPUINFO))
+        self.assertEqual(precision.parse_cpu_flags(""), set())
+
+    def test_bf16_requires_native_support(self):
+        """Test that bf16 is refused on CPUs without bfloat16 instructions"""
+        precision._read_cpu_flags = lambda: {'avx2', 'avx512f'}
+        self.assertIsNotNone(precision.unavailable_reason('bf16'))
+
+        precision._read_cpu_flags = lambda: {'avx2', 'amx_bf16'}
+        self.assertIsNone(precision.unavailable_reason('bf16'))
+
+
+class TestFallback(unittest.TestCase):
+    """Test that unavailable precisions keep the float32 model"""
+
+    def test_unknown_and_gpu(self):
+        """Test that unknown precisions and non-CPU devices are refused"""
+        self.assertIn('unknown', precision.unavailable_reason('fp16'))
+        self.assertIn('CPU', precision.unavailable_reason('int8', device='cuda'))
+        self.assertIsNone(precision.unavailable_reason('fp32'))
+
+    def test_fallback_is_reported(self):
+        """Test that apply_precision returns the fp32 model and reports why"""
+        model = object()
+
+        result = precision.apply_precision('roberta', model, None, 'logits', device='cuda', precision='int8')
+
+        self.assertIs(result, model, "The float32 model should be served")
+        self.assertEqual(precision.get_active_precision('roberta'), 'fp32')
+        report = precision.get_precision_report()['models']['roberta']
+        self.assertEqual(report['requested'], 'int8')
+        self.assertIsNotNone(report['fallback_reason'])
+
+
+class TestParityTolerance(unittest.TestCase):
+    """Test the parity pass/fail rules"""
+
+    def test_probability_error(self):
+        """Test that RoBERTa parity is judged on the probability error"""
+        report = {'compared': 'probabilities', 'max_abs_error': 0.01}
+        self.assertIsNone(precision.parity_failure(report))
+
+        report['max_abs_error'] = precision.config.PRECISION_MAX_PROB_ERROR + 0.01
+        self.assertIsNotNone(precision.parity_failure(report))
+
+    def test_embedding_cosine(self):
+        """Test that MentalBERT parity is judged on the embedding cosine similarity"""
+        report = {'compared': 'mean_pooled_embeddings', 'max_abs_error': 0.3, 'min_cosine_similarity': 0.999}
+        self.assertIsNone(precision.parity_failure(report))
+
+        report['min_cosine_similarity'] = 0.9
+        self.assertIsNotNone(precision.parity_failure(report))
+
+
+@unittest.skipUnless(HAS_TORCH, "requires torch")
+class TestConvert(unittest.TestCase):
+    """Test the reduced-precision conversions"""
+
+    def test_int8_quantizes_linear_layers(self):
+        """Test that int8 keeps the model's outputs close to float32"""
+        import torch
+
+        if precision.select_quantized_engine() is None:
+            self.skipTest("no quantized engine")
+
+        torch.manual_seed(0)
+        model = torch.nn.Sequential(torch.nn.Linear(16, 16), torch.nn.ReLU(), torch.nn.Linear(16, 3)).eval()
+        quantized = precision.convert(model, 'int8')
+
+        x = torch.randn(4, 16)
+        with torch.no_grad():
+            self.assertLess(float((model(x) - quantized(x)).abs().max()), 0.1)
+        self.assertIsInstance(model[0], torch.nn.Linear, "The float32 model should be left unchanged")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
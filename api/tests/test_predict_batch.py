@@ -0,0 +1,166 @@
+"""
+Unit Tests for the Batch Prediction Endpoint
+
+Tests per-item validation and model errors of /api/predict/batch, result
+order, the request size limit and the rate-limit cost
+"""
+import unittest
+import importlib.util
+import sys
+import os
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import predictors
+
+# app.py needs the web dependencies (Flask-Limiter, Flask-Caching, ...), not the ML frameworks
+HAS_APP_DEPS = all(importlib.util.find_spec(module) is not None
+                   for module in ('redis', 'dotenv', 'flask_limiter', 'flask_caching', 'flask_cors', 'flasgger'))
+
+
+def fake_roberta_chunk(texts):
+    """One Positive result per text, carrying the text for order checks"""
+    return [{"sentiment": "Positive", "confidence": 0.9, "scores": {}, "text": text} for text in texts]
+
+
+@unittest.skipUnless(HAS_APP_DEPS, "requires the API dependencies")
+class TestPredictBatch(unittest.TestCase):
+    """Test /api/predict/batch"""
+
+    @classmethod
+    def setUpClass(cls):
+        import database
+
+        # Keep app.py and its blueprints off the database in the working directory
+        database.set_db(database.MoodTrackingDB(':memory:'))
+        import app as app_module
+
+        cls.app_module = app_module
+        app_module.limiter.enabled = False
+        cls.client = app_module.app.test_client()
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(self.app_module.model_registry, 'predictions_available', return_value=True),
+            mock.patch.object(self.app_module.inference_client, 'is_enabled', return_value=False),
+            mock.patch.object(self.app_module, 'predict_roberta_sentiment_chunk', side_effect=fake_roberta_chunk),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def post(self, texts, model='roberta'):
+        return self.client.post('/api/predict/batch', json={'texts': texts, 'model': model})
+
+    def test_order_with_invalid_items(self):
+        """Test that results stay in request order when invalid items are mixed in"""
+        response = self.post(['first', '', 42, 'second', '   '])
+        data = response.get_json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['index'] for item in data['results']], [0, 1, 2, 3, 4])
+        self.assertEqual(data['results'][0]['text'], 'first')
+        self.assertEqual(data['results'][3]['text'], 'second')
+        self.assertIn('error', data['results'][1])
+        self.assertIn('error', data['results'][2])
+        self.assertEqual((data['succeeded'], data['failed']), (2, 3))
+
+    def test_text_too_long(self):
+        """Test that an over-long text gets its own error"""
+        data = self.post(['fine', 'x' * 5001]).get_json()
+
+        self.assertNotIn('error', data['results'][0])
+        self.assertIn('too long', data['results'][1]['error'])
+        self.assertEqual(data['failed'], 1)
+
+    def test_lstm_item_errors_are_kept(self):
+        """Test that LSTM fallback results keep their error and count as failed"""
+        fallback = [{"sentiment": "Neutral", "confidence": 0.5, "error": "model not loaded"}] * 2
+        with mock.patch.object(predictors, 'ensure_models_loaded', return_value=True), \
+                mock.patch.object(predictors, 'predict_with_simple_model_batch', return_value=fallback):
+            data = self.post(['one', 'two'], model='lstm').get_json()
+
+        self.assertEqual([item['error'] for item in data['results']], ['model not loaded'] * 2)
+        self.assertEqual((data['succeeded'], data['failed']), (0, 2))
+
+    def test_model_server_item_errors_are_kept(self):
+        """Test that model server item errors reach the response in model=both"""
+        with mock.patch.object(self.app_module.inference_client, 'is_enabled', return_value=True), \
+                mock.patch.object(self.app_module.inference_client, 'predict_many',
+                                  return_value=[{"error": "Model server unreachable"}]):
+            data = self.post(['one'], model='both').get_json()
+
+        self.assertEqual(data['results'][0]['lstm'], {"error": "Model server unreachable"})
+        self.assertEqual(data['failed'], 1)
+
+    def test_one_implementation_per_model(self):
+        """Test that app.py and the blueprint share the predictors (one micro-batch queue per model)"""
+        from routes import predictions
+
+        self.assertIs(self.app_module.predict_lstm_sentiment_batch, predictors.predict_lstm_sentiment_batch)
+        for name in ('predict_roberta_sentiment', 'predict_roberta_sentiment_chunk',
+                     'predict_lstm_sentiment', 'predict_lstm_sentiment_batch'):
+            self.assertIs(getattr(predictions, name), getattr(predictors, name), name)
+
+    def test_single_text_both_has_consensus(self):
+        """Test that /api/predict/both reports whether the models agree"""
+        from routes import predictions
+
+        positive = {"sentiment": "Positive", "confidence": 0.9, "scores": {}}
+        with mock.patch.object(predictions, 'predict_roberta_sentiment', return_value=positive), \
+                mock.patch.object(predictions, 'predict_lstm_sentiment', return_value=dict(positive)):
+            response = self.client.post('/api/predict/both', json={'text': 'fine', 'mode': 'both'})
+
+        data = response.get_json()
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(data['consensus'], True)
+        self.assertEqual(data['models_run'], ['roberta', 'lstm'])
+
+    def test_single_lstm_result_is_formatted(self):
+        """Test that /api/predict/lstm returns LSTM results in the RoBERTa format"""
+        raw = {"sentiment": "Positive", "confidence": 0.8, "scores": {"negative": 0.1, "neutral": 0.1, "positive": 0.8}}
+        with mock.patch.object(predictors, 'ensure_models_loaded', return_value=True), \
+                mock.patch.object(predictors, 'predict_with_simple_model', return_value=raw):
+            data = self.client.post('/api/predict/lstm', json={'text': 'fine'}).get_json()
+
+        self.assertEqual(data['sentiment'], 'Positive')
+        self.assertEqual(data['scores']['positive'], 0.8)
+        self.assertEqual(data['model_info']['architecture'], 'MentalBERT-LSTM')
+
+    def test_single_lstm_error_is_kept(self):
+        """Test that an LSTM error result reaches /api/predict/lstm instead of a made-up Neutral"""
+        fallback = {"sentiment": "Neutral", "confidence": 0.5, "error": "model not loaded"}
+        with mock.patch.object(predictors, 'ensure_models_loaded', return_value=True), \
+                mock.patch.object(predictors, 'predict_with_simple_model', return_value=fallback):
+            data = self.client.post('/api/predict/lstm', json={'text': 'fine'}).get_json()
+
+        self.assertEqual(data, fallback)
+
+    def test_too_many_texts(self):
+        """Test that requests over PREDICT_BATCH_MAX_ITEMS are rejected"""
+        response = self.post(['text'] * (self.app_module.config.PREDICT_BATCH_MAX_ITEMS + 1))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Too many texts', response.get_json()['error'])
+
+    def test_rate_limit_cost(self):
+        """Test that the rate limit counts one unit per text and model"""
+        cost = self.app_module.batch_rate_limit_cost
+        max_items = self.app_module.config.PREDICT_BATCH_MAX_ITEMS
+
+        for payload, expected in [
+            ({'texts': ['a', 'b', 'c']}, 3),
+            ({'texts': ['a', 'b', 'c'], 'model': 'lstm'}, 3),
+            ({'texts': ['a', 'b', 'c'], 'model': 'both'}, 6),
+            ({'texts': ['a', 'b', 'c'], 'model': 'cascade'}, 6),
+            ({'texts': ['a'] * (max_items + 50)}, max_items),
+            ({'texts': []}, 1),
+        ]:
+            with self.app_module.app.test_request_context('/api/predict/batch', method='POST', json=payload):
+                self.assertEqual(cost(), expected, f"Cost of {payload.get('model', 'roberta')} x {len(payload['texts'])}")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
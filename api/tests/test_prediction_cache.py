@@ -0,0 +1,116 @@
+"""
+Unit Tests for the Prediction Cache
+
+Tests content-addressed caching of model predictions
+"""
+import unittest
+import tempfile
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import prediction_cache
+from prediction_cache import PredictionCache, hash_text
+
+
+class CountingModel:
+    """Fake model that records every text it is asked to score"""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, text):
+        self.calls.append(text)
+        return {'sentiment': 'Positive', 'confidence': 0.9, 'length': len(text)}
+
+    def predict_batch(self, texts):
+        return [self.predict(text) for text in texts]
+
+
+class TestPredictionCache(unittest.TestCase):
+    """Test the local tier and model identity handling"""
+
+    def setUp(self):
+        """Swap in a fresh cache with a registered fake model"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.weights_path = os.path.join(self.tmp_dir.name, 'weights.bin')
+        with open(self.weights_path, 'wb') as f:
+            f.write(b'v1')
+
+        self.original_cache = prediction_cache.prediction_cache
+        self.cache = PredictionCache(max_local_entries=8, ttl=60)
+        prediction_cache.prediction_cache = self.cache
+        self.cache.register_model('fake', [self.weights_path])
+        self.model = CountingModel()
+
+    def tearDown(self):
+        prediction_cache.prediction_cache = self.original_cache
+        self.tmp_dir.cleanup()
+
+    def test_repeated_text_is_served_from_cache(self):
+        """Test that the model runs once for repeated texts"""
+        first = prediction_cache.cached_predict('fake', 'I feel great', self.model.predict)
+        second = prediction_cache.cached_predict('fake', 'I feel great', self.model.predict)
+
+        self.assertEqual(first, second, "Cached result should match the computed one")
+        self.assertEqual(len(self.model.calls), 1, "Model should only run on the first call")
+        self.assertEqual(self.cache.get_stats()['local_hits'], 1)
+
+    def test_error_results_are_not_cached(self):
+        """Test that fallback/error results are recomputed on the next request"""
+        def failing(text):
+            self.model.calls.append(text)
+            return {'error': 'model not loaded'}
+
+        prediction_cache.cached_predict('fake', 'hello', failing)
+        prediction_cache.cached_predict('fake', 'hello', failing)
+
+        self.assertEqual(len(self.model.calls), 2, "Error results must not be cached")
+
+    def test_model_swap_invalidates_entries(self):
+        """Test that re-registering changed weights drops the old predictions"""
+        prediction_cache.cached_predict('fake', 'hello', self.model.predict)
+
+        with open(self.weights_path, 'wb') as f:
+            f.write(b'v2-retrained')
+        self.cache.register_model('fake', [self.weights_path])
+
+        self.assertIsNone(self.cache.get('fake', 'hello'), "Stale prediction should be dropped")
+        self.assertEqual(self.cache.get_stats()['invalidations'], 1)
+
+    def test_batch_only_scores_unique_misses(self):
+        """Test that cached_predict_many skips hits and scores duplicates once"""
+        prediction_cache.cached_predict('fake', 'cached', self.model.predict)
+        self.model.calls.clear()
+
+        texts = ['cached', 'new', 'new', 'other']
+        results = prediction_cache.cached_predict_many('fake', texts, self.model.predict_batch)
+
+        self.assertEqual(self.model.calls, ['new', 'other'], "Only unique misses should reach the model")
+        self.assertEqual([r['length'] for r in results], [6, 3, 3, 5], "Results should keep input order")
+
+    def test_unregistered_model_is_not_cached(self):
+        """Test that models without an identity always run"""
+        prediction_cache.cached_predict('unknown', 'hello', self.model.predict)
+        prediction_cache.cached_predict('unknown', 'hello', self.model.predict)
+
+        self.assertEqual(len(self.model.calls), 2)
+
+    def test_hash_is_nfc_only(self):
+        """Test that normalization unifies unicode forms but keeps whitespace and case"""
+        self.assertEqual(hash_text('cafe\u0301'), hash_text('caf\u00e9'))
+        self.assertNotEqual(hash_text('a  b\n'), hash_text('a b'), "The model sees whitespace, so must the key")
+        self.assertNotEqual(hash_text('Sad'), hash_text('sad'))
+
+    def test_whitespace_variants_are_scored_separately(self):
+        """Test that texts differing only in whitespace each reach the model"""
+        prediction_cache.cached_predict('fake', 'I feel great', self.model.predict)
+        prediction_cache.cached_predict('fake', '  I feel   great ', self.model.predict)
+
+        self.assertEqual(self.model.calls, ['I feel great', '  I feel   great '])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,102 @@
+"""
+Unit Tests for Single-Flight Request Coalescing
+
+Tests that concurrent identical predictions share one model call
+"""
+import unittest
+import threading
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test coalescing of concurrent calls"""
+
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.release = threading.Event()
+        self.calls = []
+
+    def slow_predict(self):
+        self.calls.append(1)
+        self.release.wait(5)
+        return {'sentiment': 'Positive', 'confidence': 0.9}
+
+    def run_concurrently(self, keys, fn):
+        """Call fn under each key from its own thread, return results in order"""
+        results = [None] * len(keys)
+        errors = [None] * len(keys)
+
+        def worker(i, key):
+            try:
+                results[i] = self.flight.do(key, fn)
+            except Exception as e:
+                errors[i] = e
+
+        threads = [threading.Thread(target=worker, args=(i, key)) for i, key in enumerate(keys)]
+        for thread in threads:
+            thread.start()
+
+        # Let every caller register before the leader finishes
+        while self.flight.get_stats()['waiting'] < len(keys) - len(set(keys)):
+            threading.Event().wait(0.01)
+        self.release.set()
+
+        for thread in threads:
+            thread.join(5)
+        return results, errors
+
+    def test_duplicates_share_one_call(self):
+        """Test that 5 concurrent identical requests run the model once"""
+        results, errors = self.run_concurrently([('roberta', 'id', 'same text')] * 5, self.slow_predict)
+
+        self.assertEqual(len(self.calls), 1, "Model should run once")
+        self.assertEqual(errors, [None] * 5)
+        self.assertTrue(all(result == results[0] for result in results))
+
+        stats = self.flight.get_stats()
+        self.assertEqual(stats['executions'], 1)
+        self.assertEqual(stats['coalesced'], 4)
+        self.assertEqual(stats['coalesced_by_model'], {'roberta': 4})
+        self.assertEqual(stats['in_flight'], 0)
+
+    def test_results_are_independent_copies(self):
+        """Test that one caller modifying its result does not affect others"""
+        results, _ = self.run_concurrently([('roberta', 'id', 'text')] * 3, self.slow_predict)
+
+        results[0]['sentiment'] = 'Changed'
+        self.assertEqual(results[1]['sentiment'], 'Positive')
+        self.assertEqual(results[2]['sentiment'], 'Positive')
+
+    def test_different_keys_are_not_coalesced(self):
+        """Test that different texts each run the model"""
+        self.release.set()
+        self.run_concurrently([('roberta', 'id', 'a'), ('roberta', 'id', 'b'), ('lstm', 'id', 'a')], self.slow_predict)
+        self.assertEqual(len(self.calls), 3)
+
+    def test_errors_reach_every_caller(self):
+        """Test that an exception in the shared call is raised in all waiters"""
+        def failing_predict():
+            self.release.wait(5)
+            raise RuntimeError("model crashed")
+
+        _, errors = self.run_concurrently([('roberta', 'id', 'text')] * 3, failing_predict)
+
+        self.assertTrue(all(isinstance(error, RuntimeError) for error in errors))
+        self.assertEqual(self.flight.get_stats()['errors'], 1)
+
+    def test_completed_calls_are_not_reused(self):
+        """Test that a later request for the same key runs again (no caching)"""
+        self.release.set()
+        self.flight.do(('roberta', 'id', 'text'), self.slow_predict)
+        self.flight.do(('roberta', 'id', 'text'), self.slow_predict)
+        self.assertEqual(len(self.calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
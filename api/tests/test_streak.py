@@ -0,0 +1,90 @@
+"""
+Unit Tests for the Journal Streak
+
+Tests the gaps-and-islands streak query and that the streak stored in
+user_rollups agrees with it
+"""
+import unittest
+import tempfile
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import MoodTrackingDB
+
+
+class TestStreak(unittest.TestCase):
+    """Test streak calculation"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = MoodTrackingDB(os.path.join(self.tmpdir.name, 'test.db'))
+
+    def tearDown(self):
+        self.db._connections.close_all()
+        self.tmpdir.cleanup()
+
+    def insert_days(self, days_ago, user_id='user-1'):
+        """Insert one entry per day N days back, then recount the rollup"""
+        with self.db.connection() as conn:
+            for days in days_ago:
+                date = (datetime.now() - timedelta(days=days)).isoformat()
+                conn.execute('''
+                    INSERT INTO journal_entries (user_id, text, sentiment, confidence, mood_score, date, entry_day)
+                    VALUES (?, 'text', 'Neutral', 0.5, 5.0, ?, ?)
+                ''', (user_id, date, date[:10]))
+            conn.commit()
+        self.db.rebuild_user_rollups(user_id)
+
+    def assertStreak(self, expected, msg=None):
+        self.assertEqual(self.db.calculate_streak('user-1'), expected, msg)
+        self.assertEqual(self.db.get_user_stats('user-1')['streak'], expected, msg)
+
+    def test_no_entries(self):
+        """Test that users without entries have no streak"""
+        self.assertStreak(0)
+
+    def test_streak_stops_at_gap(self):
+        """Test that only the latest run of consecutive days counts"""
+        self.insert_days([0, 1, 2, 4, 5, 6, 7])
+
+        self.assertStreak(3)
+
+    def test_several_entries_per_day(self):
+        """Test that days with several entries count once"""
+        self.insert_days([0, 0, 1, 1, 1])
+
+        self.assertStreak(2)
+
+    def test_streak_ending_yesterday(self):
+        """Test that a streak is still running before today's entry"""
+        self.insert_days([1, 2])
+
+        self.assertStreak(2)
+
+    def test_broken_streak(self):
+        """Test that a streak whose last day is before yesterday is over"""
+        self.insert_days([2, 3, 4])
+
+        self.assertStreak(0)
+
+    def test_no_thirty_day_cap(self):
+        """Test that streaks longer than 30 days are counted in full"""
+        self.insert_days(range(45))
+
+        self.assertStreak(45)
+
+    def test_incremental_streak(self):
+        """Test that today's entry extends the stored streak"""
+        self.insert_days(range(1, 40))
+
+        self.db.create_journal_entry('user-1', 'text', 'Positive', 0.9, 8.0, {}, [], {})
+
+        self.assertStreak(40)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
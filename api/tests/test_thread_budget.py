@@ -0,0 +1,56 @@
+"""
+Unit Tests for the Inference Thread Budget
+
+Tests how cores are divided between workers and runtimes
+"""
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thread_budget import compute_layout
+
+
+class TestComputeLayout(unittest.TestCase):
+    """Test the per-worker thread layout"""
+
+    def setUp(self):
+        self.cores = list(range(8))
+
+    def test_cores_divided_between_workers(self):
+        """Test that 4 workers on 8 cores get 2 intra-op threads each"""
+        layout = compute_layout(self.cores, workers=4)
+
+        self.assertEqual(layout['cores_per_worker'], 2)
+        self.assertEqual(layout['intra_op_threads'], 2)
+        self.assertEqual(layout['inter_op_threads'], 1)
+        self.assertIsNone(layout['pinned_cores'], "No affinity unless requested")
+
+    def test_dual_concurrency_halves_intra_op_threads(self):
+        """Test that two concurrent models share the worker's cores"""
+        layout = compute_layout(self.cores, workers=2, dual_concurrency=True)
+        self.assertEqual(layout['intra_op_threads'], 2, "4 cores per worker / 2 models")
+
+    def test_never_below_one_thread(self):
+        """Test that oversubscribed servers still get one thread per pool"""
+        layout = compute_layout([0, 1], workers=4, dual_concurrency=True)
+        self.assertEqual(layout['cores_per_worker'], 1)
+        self.assertEqual(layout['intra_op_threads'], 1)
+
+    def test_override(self):
+        """Test that MODEL_INTRA_OP_THREADS wins over the derived value"""
+        layout = compute_layout(self.cores, workers=4, intra_op_override=3)
+        self.assertEqual(layout['intra_op_threads'], 3)
+
+    def test_affinity_slices_do_not_overlap(self):
+        """Test that pinned workers get disjoint core slices"""
+        slices = [compute_layout(self.cores, workers=4, worker_index=i, affinity=True)['pinned_cores']
+                  for i in range(4)]
+
+        self.assertEqual(slices, [[0, 1], [2, 3], [4, 5], [6, 7]])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,139 @@
+"""
+Unit Tests for the Tokenization Layer
+
+Tests the token-id cache, batched encoding of cache misses, chunk prefetching
+and stage timings
+"""
+import unittest
+import threading
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tokenization
+from tokenization import TokenIdCache
+
+
+class CountingTokenizer:
+    """Tokenizer stand-in: one token per word, records every call"""
+
+    is_fast = True
+
+    def __init__(self):
+        self.calls = []
+        self.threads = []
+
+    def __call__(self, texts, add_special_tokens=True, verbose=True):
+        self.calls.append(list(texts))
+        self.threads.append(threading.current_thread().name)
+        return {'input_ids': [[1000 + len(word) for word in text.split()] for text in texts]}
+
+
+class TokenizationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        tokenization.token_cache = TokenIdCache(max_entries=8)
+        tokenization._tokenizers.clear()
+        tokenization._stages.clear()
+        self.tokenizer = CountingTokenizer()
+
+
+class TestTokenIdCache(TokenizationTestCase):
+    """Test the bounded token-id LRU"""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the cache never holds more than max_entries texts"""
+        cache = TokenIdCache(max_entries=2)
+        cache.set('roberta', 'a', [1])
+        cache.set('roberta', 'b', [2])
+        cache.get('roberta', 'a')
+        cache.set('roberta', 'c', [3])
+
+        self.assertEqual(cache.get('roberta', 'a'), [1], "Recently used entry should be kept")
+        self.assertIsNone(cache.get('roberta', 'b'), "Least recently used entry should be evicted")
+        self.assertEqual(cache.get_stats()['entries'], 2)
+
+    def test_returns_copies(self):
+        """Test that callers cannot modify cached ids"""
+        cache = TokenIdCache(max_entries=2)
+        cache.set('roberta', 'a', [1, 2])
+        cache.get('roberta', 'a').append(3)
+
+        self.assertEqual(cache.get('roberta', 'a'), [1, 2])
+
+    def test_new_tokenizer_clears_its_entries(self):
+        """Test that replacing a tokenizer drops its cached ids only"""
+        tokenization.register_tokenizer('roberta', self.tokenizer)
+        tokenization.token_cache.set('roberta', 'a', [1])
+        tokenization.token_cache.set('mentalbert', 'a', [2])
+
+        tokenization.register_tokenizer('roberta', CountingTokenizer())
+
+        self.assertIsNone(tokenization.token_cache.get('roberta', 'a'))
+        self.assertEqual(tokenization.token_cache.get('mentalbert', 'a'), [2])
+
+
+class TestEncode(TokenizationTestCase):
+    """Test batched encoding through the cache"""
+
+    def test_misses_encoded_in_one_call(self):
+        """Test that only uncached texts are tokenized, once each, in one call"""
+        tokenization.encode('roberta', self.tokenizer, ['one two', 'three'])
+        ids = tokenization.encode('roberta', self.tokenizer, ['one two', 'four five six', 'four five six'])
+
+        self.assertEqual(self.tokenizer.calls, [['one two', 'three'], ['four five six']])
+        self.assertEqual(ids, [[1003, 1003], [1004, 1004, 1003], [1004, 1004, 1003]])
+        self.assertIsNot(ids[1], ids[2], "Duplicate texts should get their own lists")
+
+    def test_no_name_bypasses_cache(self):
+        """Test that encode without a cache namespace always tokenizes"""
+        tokenization.encode(None, self.tokenizer, ['one'])
+        tokenization.encode(None, self.tokenizer, ['one'])
+
+        self.assertEqual(len(self.tokenizer.calls), 2)
+        self.assertEqual(tokenization.token_cache.get_stats()['entries'], 0)
+
+
+class TestPipelined(TokenizationTestCase):
+    """Test background tokenization of the next chunk"""
+
+    def test_chunks_are_prefetched_in_background(self):
+        """Test that every chunk is tokenized off the calling thread before it is yielded"""
+        tokenization.register_tokenizer('roberta', self.tokenizer)
+        chunks = [['a b'], ['c'], ['d e f']]
+
+        seen = []
+        for chunk in tokenization.pipelined(chunks):
+            # Already cached when the chunk is handed out
+            seen.append(tokenization.encode('roberta', self.tokenizer, chunk))
+
+        self.assertEqual(seen, [[[1001, 1001]], [[1001]], [[1001, 1001, 1001]]])
+        self.assertEqual(self.tokenizer.calls, chunks, "Each chunk should be tokenized exactly once")
+        self.assertTrue(all(name.startswith('tokenize') for name in self.tokenizer.threads))
+
+    def test_without_tokenizers_yields_chunks(self):
+        """Test that pipelined is a plain iteration when no tokenizer is loaded"""
+        self.assertEqual(list(tokenization.pipelined([[1], [2]])), [[1], [2]])
+
+
+class TestStageTimings(TokenizationTestCase):
+    """Test per-model stage timings"""
+
+    def test_tokenize_share(self):
+        """Test that tokenize and forward time are reported per model"""
+        tokenization.record_stage('roberta', 'tokenize', 0.001)
+        tokenization.record_stage('roberta', 'forward', 0.003)
+        with tokenization.timed('roberta', 'forward'):
+            pass
+
+        stats = tokenization.get_stats()
+
+        self.assertEqual(stats['stages']['roberta']['forward']['count'], 2)
+        self.assertEqual(stats['stages']['roberta']['tokenize']['total_ms'], 1.0)
+        self.assertAlmostEqual(stats['tokenize_share']['roberta'], 0.25, places=2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
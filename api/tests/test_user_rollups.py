@@ -0,0 +1,148 @@
+"""
+Unit Tests for the User Rollup Table
+
+Tests that user_rollups follows journal writes and deletes, matches a full
+recount, and is backfilled for databases that predate it
+"""
+import unittest
+import tempfile
+import sys
+import os
+from datetime import datetime, time, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import MoodTrackingDB
+
+
+class RollupTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'test.db')
+        self.db = MoodTrackingDB(self.path)
+
+    def tearDown(self):
+        self.db._connections.close_all()
+        self.tmpdir.cleanup()
+
+    def add_entry(self, sentiment='Positive', mood_score=8.0, user_id='user-1'):
+        return self.db.create_journal_entry(user_id, 'text', sentiment, 0.9, mood_score, {}, [], {})
+
+    def insert_on_day(self, days_ago, user_id='user-1', at=None):
+        """Insert an entry dated N days back (at a given time of day), bypassing the rollup"""
+        date = datetime.now() - timedelta(days=days_ago)
+        if at is not None:
+            date = datetime.combine(date.date(), at)
+        date = date.isoformat()
+        with self.db.connection() as conn:
+            conn.execute('''
+                INSERT INTO journal_entries (user_id, text, sentiment, confidence, mood_score, date, entry_day)
+                VALUES (?, 'text', 'Neutral', 0.5, 5.0, ?, ?)
+            ''', (user_id, date, date[:10]))
+            conn.commit()
+
+
+class TestIncrementalRollup(RollupTestCase):
+    """Test rollup updates on journal writes"""
+
+    def test_empty_user(self):
+        """Test stats of a user without entries"""
+        stats = self.db.get_user_stats('nobody')
+
+        self.assertEqual(stats['total_entries'], 0)
+        self.assertEqual(stats['streak'], 0)
+
+    def test_create_updates_stats(self):
+        """Test that new entries are counted"""
+        self.add_entry('Positive', 8.0)
+        self.add_entry('Negative', 3.0)
+        self.add_entry('Positive', 7.0)
+
+        stats = self.db.get_user_stats('user-1')
+
+        self.assertEqual(stats['total_entries'], 3)
+        self.assertEqual(stats['sentiment_distribution'], {'Positive': 2, 'Negative': 1})
+        self.assertEqual(stats['average_mood'], 6.0)
+        self.assertEqual(stats['entries_this_week'], 3)
+        self.assertEqual(stats['streak'], 1)
+
+    def test_delete_updates_stats(self):
+        """Test that deleted entries are no longer counted"""
+        self.add_entry('Positive', 8.0)
+        entry_id = self.add_entry('Negative', 2.0)
+
+        self.assertTrue(self.db.delete_journal_entry('user-1', entry_id))
+        stats = self.db.get_user_stats('user-1')
+
+        self.assertEqual(stats['total_entries'], 1)
+        self.assertEqual(stats['sentiment_distribution'], {'Positive': 1})
+        self.assertEqual(stats['average_mood'], 8.0)
+
+    def test_average_sentiment_score(self):
+        """Test the 0-1 sentiment average used by the journal analytics"""
+        self.assertIsNone(self.db.get_average_sentiment_score('user-1'))
+
+        for sentiment in ['Positive', 'Positive', 'Neutral', 'Negative']:
+            self.add_entry(sentiment)
+
+        self.assertEqual(self.db.get_average_sentiment_score('user-1'), 0.625)
+
+    def test_incremental_matches_rebuild(self):
+        """Test that the incrementally maintained rollup equals a recount"""
+        for sentiment, mood_score in [('Positive', 9.0), ('Neutral', 5.0), ('Negative', 1.5)]:
+            self.add_entry(sentiment, mood_score)
+        incremental = self.db.get_user_stats('user-1')
+
+        self.db.rebuild_user_rollups()
+
+        self.assertEqual(self.db.get_user_stats('user-1'), incremental)
+
+
+class TestRebuild(RollupTestCase):
+    """Test recounting rollups from journal_entries"""
+
+    def test_streak_and_week(self):
+        """Test streak and weekly counts of a recounted rollup"""
+        for days_ago in [1, 2, 3, 5, 10]:
+            self.insert_on_day(days_ago)
+
+        self.db.rebuild_user_rollups('user-1')
+        stats = self.db.get_user_stats('user-1')
+
+        self.assertEqual(stats['streak'], 3, "Yesterday and the two days before")
+        self.assertEqual(stats['entries_this_week'], 4)
+
+        self.add_entry()
+        self.assertEqual(self.db.get_user_stats('user-1')['streak'], 4, "Today's entry extends the streak")
+
+    def test_week_is_calendar_days(self):
+        """Test that entries_this_week counts the last 7 calendar days, today included"""
+        self.insert_on_day(6, at=time(0, 0, 1))
+        self.insert_on_day(7, at=time(23, 59, 59))
+
+        self.db.rebuild_user_rollups('user-1')
+        stats = self.db.get_user_stats('user-1')
+
+        self.assertEqual(stats['entries_this_week'], 1,
+                         "Six days ago counts from midnight, seven days ago not at all, "
+                         "even within the last 7x24 hours")
+
+    def test_backfill_existing_database(self):
+        """Test that opening a database without user_rollups backfills it"""
+        self.add_entry()
+        self.add_entry(user_id='user-2')
+        with self.db.connection() as conn:
+            conn.execute('DROP TABLE user_rollups')
+            conn.commit()
+
+        db = MoodTrackingDB(self.path)
+
+        self.assertEqual(db.get_user_stats('user-1')['total_entries'], 1)
+        self.assertEqual(db.get_user_stats('user-2')['total_entries'], 1)
+        db._connections.close_all()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
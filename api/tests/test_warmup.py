@@ -0,0 +1,110 @@
+"""
+Unit Tests for Model Warmup and Readiness
+
+Tests the synthetic warmup texts and the readiness flag
+"""
+import unittest
+import subprocess
+import tempfile
+import sys
+import os
+
+# Add parent directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+import warmup
+
+
+class TestWarmupTexts(unittest.TestCase):
+    """Test the synthetic warmup texts"""
+
+    def test_word_counts(self):
+        """Test that each text has the requested number of words"""
+        texts = warmup.build_warmup_texts([1, 8, 100])
+        self.assertEqual([len(text.split()) for text in texts], [1, 8, 100])
+
+
+class TestRunWarmup(unittest.TestCase):
+    """Test the warmup run and the readiness flag"""
+
+    def setUp(self):
+        warmup._reset_after_fork()
+        self.original_targets = warmup.get_warmup_targets
+
+    def tearDown(self):
+        warmup.get_warmup_targets = self.original_targets
+        warmup._reset_after_fork()
+
+    def test_not_ready_before_warmup(self):
+        """Test that a fresh process is not ready"""
+        self.assertFalse(warmup.is_ready())
+        self.assertEqual(warmup.get_status()['state'], 'pending')
+
+    def test_every_length_reaches_the_model(self):
+        """Test that texts are predicted singly and as one batch per round"""
+        calls = []
+
+        def predict_batch(texts):
+            calls.append(len(texts))
+            return [{'sentiment': 'Neutral'} for _ in texts]
+
+        elapsed = warmup.warm_model(predict_batch, warmup.build_warmup_texts([4, 16]), rounds=2)
+
+        self.assertEqual(calls, [1, 1, 2, 1, 1, 2])
+        self.assertGreaterEqual(elapsed, 0)
+
+    def test_ready_when_one_model_warms_up(self):
+        """Test that one working model makes the process ready and failures are recorded"""
+        warmup.get_warmup_targets = lambda: {
+            'roberta': lambda texts: [{'sentiment': 'Positive'} for _ in texts],
+            'mentalbert_lstm': lambda texts: [{'error': 'boom'} for _ in texts],
+        }
+
+        self.assertTrue(warmup.run_warmup())
+
+        status = warmup.get_status()
+        self.assertEqual(status['state'], 'done')
+        self.assertTrue(status['models']['roberta']['warmed'])
+        self.assertIn('warmup_time_s', status['models']['roberta'])
+        self.assertFalse(status['models']['mentalbert_lstm']['warmed'])
+        self.assertEqual(status['models']['mentalbert_lstm']['error'], 'boom')
+
+    def test_not_ready_without_models(self):
+        """Test that a process with no loadable model never reports ready"""
+        warmup.get_warmup_targets = lambda: {'roberta': None, 'mentalbert_lstm': None}
+
+        self.assertFalse(warmup.run_warmup())
+        self.assertFalse(warmup.is_ready())
+
+    def test_progress_callback(self):
+        """Test that the heartbeat callback runs during the warmup"""
+        beats = []
+        warmup.get_warmup_targets = lambda: {'roberta': lambda texts: [{} for _ in texts]}
+
+        warmup.run_warmup(on_progress=lambda: beats.append(1))
+        self.assertGreaterEqual(len(beats), 3)
+
+
+class TestWarmupTargets(unittest.TestCase):
+    """Test finding the model functions to warm up"""
+
+    def test_targets_do_not_import_web_tier(self):
+        """Test that the warmup does not load Flask, the routes or the databases"""
+        code = (
+            "import sys, warmup; "
+            "print(sorted(warmup.get_warmup_targets())); "
+            "print(','.join(m for m in ('flask', 'routes', 'database', 'user_manager', 'requests') if m in sys.modules))"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, PYTHONPATH=API_DIR, ML_ENABLED='False', INFERENCE_SERVER_ADDRESS='')
+            result = subprocess.run([sys.executable, '-c', code], cwd=tmp, env=env, capture_output=True, text=True)
+
+            self.assertEqual(result.returncode, 0, f"get_warmup_targets failed: {result.stderr}")
+            self.assertEqual(result.stdout.splitlines(), ["['mentalbert_lstm', 'roberta']", ''],
+                             "Web tier modules imported by the warmup")
+            self.assertEqual(os.listdir(tmp), [], "No database files should be created")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
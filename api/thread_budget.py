@@ -0,0 +1,214 @@
+"""
+Inference Thread Budget
+
+Divides the cores available to the API between gunicorn workers and
+between the runtimes inside each worker, instead of every worker's torch,
+ONNX Runtime and TensorFlow pools each sizing themselves to all cores
+(4 workers x all-core pools = heavy oversubscription under load).
+
+Layout per worker:
+- cores_per_worker = available cores // GUNICORN_WORKERS
+- intra_op_threads = cores_per_worker, halved when DUAL_MODEL_CONCURRENCY
+  runs both models at once (or MODEL_INTRA_OP_THREADS)
+- inter_op_threads = MODEL_INTEROP_THREADS (default 1; requests are
+  already parallel across workers and gunicorn threads)
+- optional CPU affinity (THREAD_AFFINITY): worker i is pinned to its own
+  slice of cores
+
+gunicorn.conf.py calls configure_worker() in post_fork; other processes
+(flask dev server, model_server.py) use the whole process as one worker.
+The layout is applied to torch, TensorFlow and the OpenMP/MKL environment
+before models run and reported in /api/health.
+"""
+import os
+import sys
+import logging
+import threading
+
+from config_manager import get_config
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+
+def get_available_cores():
+    """Cores this process may run on (respects taskset/cgroup affinity)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def compute_layout(cores, workers, worker_index=0, dual_concurrency=False,
+                   intra_op_override=0, inter_op_threads=1, affinity=False):
+    """
+    Compute the thread layout of one worker
+
+    Args:
+        cores (list): Core ids available to the whole server
+        workers (int): Number of worker processes sharing them
+        worker_index (int): This worker's slot (0 .. workers - 1)
+        dual_concurrency (bool): Two models run at once in this worker
+        intra_op_override (int): Fixed intra-op threads (0 = derive)
+        inter_op_threads (int): Inter-op threads
+        affinity (bool): Pin the worker to its slice of cores
+
+    Returns:
+        dict describing the layout
+    """
+    workers = max(1, workers)
+    cores_per_worker = max(1, len(cores) // workers)
+
+    if intra_op_override > 0:
+        intra_op_threads = intra_op_override
+    elif dual_concurrency:
+        intra_op_threads = max(1, cores_per_worker // 2)
+    else:
+        intra_op_threads = cores_per_worker
+
+    pinned_cores = None
+    if affinity and len(cores) >= workers:
+        start = (worker_index % workers) * cores_per_worker
+        pinned_cores = cores[start:start + cores_per_worker]
+
+    return {
+        'available_cores': len(cores),
+        'workers': workers,
+        'worker_index': worker_index % workers,
+        'cores_per_worker': cores_per_worker,
+        'intra_op_threads': intra_op_threads,
+        'inter_op_threads': max(1, inter_op_threads),
+        'dual_concurrency': dual_concurrency,
+        'pinned_cores': pinned_cores
+    }
+
+
+# ============================================
+# PROCESS STATE
+# ============================================
+
+_layout = None
+_applied = {}
+_lock = threading.Lock()
+
+
+def configure_worker(worker_index=0, workers=1):
+    """
+    Set this process's slot in the server (gunicorn post_fork) and apply it
+
+    Returns:
+        The layout
+    """
+    global _layout
+    with _lock:
+        _layout = compute_layout(
+            get_available_cores(),
+            workers,
+            worker_index=worker_index,
+            dual_concurrency=config.DUAL_MODEL_CONCURRENCY,
+            intra_op_override=config.MODEL_INTRA_OP_THREADS,
+            inter_op_threads=config.MODEL_INTEROP_THREADS,
+            affinity=config.THREAD_AFFINITY
+        )
+        _applied.clear()
+
+    apply_layout()
+    return _layout
+
+
+def get_layout():
+    """Layout of this process (the whole process is one worker unless configured)"""
+    if _layout is None:
+        return configure_worker(0, 1)
+    return _layout
+
+
+def get_intra_op_threads():
+    return get_layout()['intra_op_threads']
+
+
+def apply_layout():
+    """
+    Apply the layout to CPU affinity, the thread environment variables and
+    every runtime already imported (torch, TensorFlow)
+
+    Safe to call repeatedly; model loaders call it before loading weights so
+    runtimes imported later also pick it up.
+    """
+    if not config.THREAD_BUDGET_ENABLED:
+        return
+
+    layout = get_layout()
+    intra, inter = layout['intra_op_threads'], layout['inter_op_threads']
+
+    with _lock:
+        if 'env' not in _applied:
+            # Read by OpenMP/MKL/OpenBLAS and TensorFlow when they initialize
+            for name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS'):
+                os.environ[name] = str(intra)
+            os.environ['TF_NUM_INTEROP_THREADS'] = str(inter)
+            _applied['env'] = True
+
+        if 'affinity' not in _applied and layout['pinned_cores'] and hasattr(os, 'sched_setaffinity'):
+            try:
+                os.sched_setaffinity(0, layout['pinned_cores'])
+                _applied['affinity'] = True
+            except OSError as e:
+                _applied['affinity'] = f"failed: {e}"
+
+        if 'torch' not in _applied and 'torch' in sys.modules:
+            _applied['torch'] = _apply_torch(intra, inter)
+
+        if 'tensorflow' not in _applied and 'tensorflow' in sys.modules:
+            _applied['tensorflow'] = _apply_tensorflow(intra, inter)
+
+
+def _apply_torch(intra, inter):
+    import torch
+
+    torch.set_num_threads(intra)
+    try:
+        torch.set_interop_threads(inter)
+    except RuntimeError:
+        # Only allowed before the first inter-op parallel work (e.g. in a forked worker)
+        pass
+
+    logger.info(f"✓ PyTorch threads: intra-op {torch.get_num_threads()}, inter-op {torch.get_num_interop_threads()}")
+    return {'intra_op': torch.get_num_threads(), 'inter_op': torch.get_num_interop_threads()}
+
+
+def _apply_tensorflow(intra, inter):
+    import tensorflow as tf
+
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(intra)
+        tf.config.threading.set_inter_op_parallelism_threads(inter)
+    except RuntimeError:
+        # TensorFlow runtime already initialized - TF_NUM_*_THREADS applied at init
+        pass
+
+    return {
+        'intra_op': tf.config.threading.get_intra_op_parallelism_threads(),
+        'inter_op': tf.config.threading.get_inter_op_parallelism_threads()
+    }
+
+
+def _reset_after_fork():
+    global _layout, _lock
+    _layout = None
+    _applied.clear()
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_report():
+    """Chosen layout and what was applied, for /api/health"""
+    return dict(
+        get_layout(),
+        enabled=config.THREAD_BUDGET_ENABLED,
+        pid=os.getpid(),
+        applied=dict(_applied)
+    )
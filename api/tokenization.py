@@ -0,0 +1,304 @@
+"""
+Tokenization Layer
+
+Loads the encoder tokenizers as fast (Rust, HuggingFace `tokenizers`)
+tokenizers from the saved tokenizer directories and encodes texts in
+batches. The slow Python tokenizers cost milliseconds per journal entry, a
+sizeable share of a CPU forward pass for short texts.
+
+- Token-id cache: content token ids (no special tokens) of recently seen
+  texts are kept in a bounded LRU per tokenizer (TOKENIZER_CACHE_SIZE), so
+  repeated texts skip tokenization. long_text.tokenize_windows builds the
+  encoder rows from these ids.
+- Prefetch: bulk paths (CSV analysis, /api/predict/batch) tokenize the next
+  chunk on a background thread while the current chunk is in the forward
+  pass (pipelined()). Fast tokenizers release the GIL while encoding.
+- Stage timings: callers time tokenization and model compute per model
+  (timed()), so /api/health shows where request latency goes.
+
+TOKENIZER_USE_FAST=False loads the slow tokenizers (same token ids).
+"""
+import os
+import time
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from config_manager import get_config
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+
+class TokenIdCache:
+    """Bounded LRU of (tokenizer name, text) -> content token ids"""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def get(self, name, text):
+        with self._lock:
+            ids = self._entries.get((name, text))
+            if ids is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end((name, text))
+            self._stats['hits'] += 1
+        return ids.tolist()
+
+    def set(self, name, text, ids):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            # int32 array: a quarter of the memory of a list of ints
+            self._entries[(name, text)] = array('i', ids)
+            self._entries.move_to_end((name, text))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, name=None):
+        """Drop the entries of one tokenizer (or all)"""
+        with self._lock:
+            for key in [key for key in self._entries if name is None or key[0] == name]:
+                del self._entries[key]
+
+    def get_stats(self):
+        lookups = self._stats['hits'] + self._stats['misses']
+        return dict(
+            self._stats,
+            hit_rate=round(self._stats['hits'] / lookups, 3) if lookups else 0.0,
+            entries=len(self._entries),
+            max_entries=self.max_entries
+        )
+
+
+# Global state
+token_cache = TokenIdCache(config.TOKENIZER_CACHE_SIZE)
+_tokenizers = {}        # name -> tokenizer (registered by the model loaders)
+_stages = {}            # model -> stage -> {count, total_ms, max_ms}
+_stats_lock = threading.Lock()
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+_prefetch_stats = {'submitted': 0, 'errors': 0}
+
+
+def _reset_after_fork():
+    """The prefetch thread does not survive a fork; locks may be held by other threads"""
+    global _prefetcher, _prefetcher_lock, _stats_lock
+    _prefetcher = None
+    _prefetcher_lock = threading.Lock()
+    _stats_lock = threading.Lock()
+    token_cache._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# ============================================
+# LOADING
+# ============================================
+
+def load_tokenizer(name, path):
+    """
+    Load a saved tokenizer (fast unless TOKENIZER_USE_FAST=False) and register it
+
+    Slow-only tokenizer directories (vocab/merges files without a
+    tokenizer.json) are converted to fast tokenizers on load.
+
+    Args:
+        name (str): Model name, e.g. "roberta"
+        path (str): Saved tokenizer directory
+
+    Returns:
+        HuggingFace tokenizer
+    """
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(path, use_fast=config.TOKENIZER_USE_FAST)
+    if config.TOKENIZER_USE_FAST and not tokenizer.is_fast:
+        logger.warning(f"⚠ No fast tokenizer available for '{name}' - using {type(tokenizer).__name__}")
+
+    register_tokenizer(name, tokenizer)
+    logger.info(f"Tokenizer for '{name}': {type(tokenizer).__name__}")
+    return tokenizer
+
+
+def register_tokenizer(name, tokenizer):
+    """Register (or replace after a model swap) the tokenizer of a model"""
+    previous = _tokenizers.get(name)
+    _tokenizers[name] = tokenizer
+    if previous is not None and previous is not tokenizer:
+        token_cache.clear(name)
+
+
+# ============================================
+# ENCODING
+# ============================================
+
+def encode(name, tokenizer, texts):
+    """
+    Content token ids (no special tokens) of each text
+
+    Cached texts are served from the token-id cache; the rest are encoded in
+    a single tokenizer call.
+
+    Args:
+        name (str): Cache namespace (model name), or None to bypass the cache
+        tokenizer: HuggingFace tokenizer
+        texts (list): Input texts
+
+    Returns:
+        List of lists of token ids, one per text
+    """
+    texts = list(texts)
+    if name is None:
+        return tokenizer(texts, add_special_tokens=False, verbose=False)['input_ids']
+
+    token_ids = [token_cache.get(name, text) for text in texts]
+    missing = {}
+    for i, ids in enumerate(token_ids):
+        if ids is None:
+            missing.setdefault(texts[i], []).append(i)
+
+    if missing:
+        encoded = tokenizer(list(missing), add_special_tokens=False, verbose=False)['input_ids']
+        for (text, indexes), ids in zip(missing.items(), encoded):
+            ids = list(ids)
+            token_cache.set(name, text, ids)
+            for i in indexes:
+                token_ids[i] = ids if i == indexes[0] else list(ids)
+
+    return token_ids
+
+
+def _get_prefetcher():
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                _prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tokenize')
+    return _prefetcher
+
+
+def _prefetch(texts, names):
+    for name in names:
+        tokenizer = _tokenizers.get(name)
+        if tokenizer is not None:
+            with timed(name, 'tokenize_prefetch'):
+                encode(name, tokenizer, texts)
+
+
+def prefetch(texts, names=None):
+    """
+    Tokenize texts on the background thread so a later encode() hits the cache
+
+    Args:
+        texts (list): Input texts
+        names (list): Tokenizers to prefetch for (default: all registered)
+
+    Returns:
+        Future, or None when there is nothing to prefetch
+    """
+    names = [name for name in (names or list(_tokenizers)) if name in _tokenizers]
+    if not config.TOKENIZER_PREFETCH or not names or not texts:
+        return None
+
+    _prefetch_stats['submitted'] += 1
+    try:
+        return _get_prefetcher().submit(_prefetch, list(texts), names)
+    except RuntimeError:
+        return None  # Interpreter shutting down
+
+
+def pipelined(chunks, texts_of=None, names=None):
+    """
+    Iterate over chunks with the next chunk's tokenization overlapping the
+    current chunk's forward pass
+
+    Each chunk is yielded once its own prefetch has finished, right after the
+    next chunk's prefetch was submitted.
+
+    Args:
+        chunks (list): Chunks of work
+        texts_of: Function chunk -> list of texts (default: the chunk itself)
+        names (list): Tokenizers to prefetch for (default: all registered)
+    """
+    chunks = list(chunks)
+    texts_of = texts_of or (lambda chunk: chunk)
+
+    future = prefetch(texts_of(chunks[0]), names) if chunks else None
+    for i, chunk in enumerate(chunks):
+        if future is not None:
+            try:
+                future.result()
+            except Exception as e:
+                # The inference thread tokenizes the chunk itself
+                _prefetch_stats['errors'] += 1
+                logger.warning(f"Tokenizer prefetch failed: {e}")
+
+        future = prefetch(texts_of(chunks[i + 1]), names) if i + 1 < len(chunks) else None
+        yield chunk
+
+
+# ============================================
+# STAGE TIMINGS
+# ============================================
+
+@contextmanager
+def timed(model_name, stage):
+    """Time a stage ("tokenize", "forward", ...) of one batch of a model"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(model_name, stage, time.perf_counter() - start)
+
+
+def record_stage(model_name, stage, seconds):
+    ms = seconds * 1000.0
+    with _stats_lock:
+        stats = _stages.setdefault(model_name, {}).setdefault(stage, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        stats['count'] += 1
+        stats['total_ms'] += ms
+        stats['max_ms'] = max(stats['max_ms'], ms)
+
+
+def get_stats():
+    """Tokenizer types, token-id cache, prefetch and per-stage timings for /api/health"""
+    with _stats_lock:
+        stages = {}
+        for model_name, model_stages in _stages.items():
+            stages[model_name] = {
+                stage: {
+                    'count': stats['count'],
+                    'total_ms': round(stats['total_ms'], 1),
+                    'avg_ms': round(stats['total_ms'] / stats['count'], 2),
+                    'max_ms': round(stats['max_ms'], 1)
+                }
+                for stage, stats in model_stages.items()
+            }
+
+    # Share of inference-thread time spent tokenizing (prefetch runs alongside)
+    tokenize_share = {}
+    for model_name, model_stages in stages.items():
+        tokenize = model_stages.get('tokenize', {}).get('total_ms', 0.0)
+        forward = model_stages.get('forward', {}).get('total_ms', 0.0)
+        if tokenize + forward:
+            tokenize_share[model_name] = round(tokenize / (tokenize + forward), 3)
+
+    return {
+        'tokenizers': {name: type(tokenizer).__name__ for name, tokenizer in _tokenizers.items()},
+        'fast': {name: bool(getattr(tokenizer, 'is_fast', False)) for name, tokenizer in _tokenizers.items()},
+        'token_cache': token_cache.get_stats(),
+        'prefetch': dict(_prefetch_stats, enabled=config.TOKENIZER_PREFETCH),
+        'stages': stages,
+        'tokenize_share': tokenize_share
+    }
@@ -0,0 +1,201 @@
+"""
+Model Warmup and Readiness
+
+The first forward pass of each model pays one-off costs: lazy kernel and
+memory-layout selection in PyTorch/ONNX Runtime, tokenizer initialization
+and Keras graph tracing in model.predict. The warmup runs synthetic texts of
+several lengths (MODEL_WARMUP_LENGTHS, in words) through every loaded model
+before a process serves traffic, singly and as one padded batch, so those
+costs are paid at startup instead of by the first users.
+
+Readiness is tracked separately from health: /api/health says the process is
+up, /api/ready says it has finished warming up and at least one model works.
+The Docker HEALTHCHECK and load balancers use /api/ready.
+
+Where it runs:
+- gunicorn: post_worker_init, before the worker accepts connections
+- flask dev server: a background thread after the models are loaded
+- model_server.py: before it starts serving
+
+The predictions bypass the prediction cache and the micro-batcher so every
+round really reaches the model.
+"""
+import os
+import time
+import logging
+import threading
+
+import inference_client
+import model_registry
+from config_manager import get_config
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+_WORDS = (
+    "today I felt calm and hopeful after a long walk but work was stressful "
+    "and I could not sleep well so I wrote down my thoughts to feel better"
+).split()
+
+
+def build_warmup_texts(lengths):
+    """
+    Synthetic journal-like texts with the given word counts
+
+    Args:
+        lengths (list): Word count of each text
+
+    Returns:
+        List of texts, one per length
+    """
+    texts = []
+    for length in lengths:
+        words = (_WORDS * (length // len(_WORDS) + 1))[:max(1, length)]
+        texts.append(' '.join(words))
+    return texts
+
+
+def get_warmup_targets():
+    """
+    Model name -> batch prediction function (list of texts -> list of results)
+
+    Loads the models if they are not loaded yet; models that fail to load are
+    mapped to None.
+    """
+    if inference_client.is_enabled():
+        # Warms the connection to the model server (which warms its own models)
+        return {
+            'roberta': lambda texts: inference_client.predict_many('roberta', texts),
+            'mentalbert_lstm': lambda texts: inference_client.predict_many('mentalbert_lstm', texts)
+        }
+
+    import predictors
+    import simple_model
+
+    return {
+        'roberta': predictors.predict_roberta_sentiment_batch if model_registry.get_model('roberta') is not None else None,
+        'mentalbert_lstm': simple_model.predict_sentiment_batch if simple_model.ensure_models_loaded() else None
+    }
+
+
+def warm_model(predict_batch, texts, rounds=1):
+    """
+    Run the warmup texts through one model
+
+    Each round predicts every text on its own (the shapes of single requests)
+    and then all texts as one padded batch (micro-batches, CSV chunks).
+
+    Returns:
+        Seconds taken
+    """
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            results = predict_batch([text])
+            _raise_on_error(results)
+        _raise_on_error(predict_batch(texts))
+    return time.perf_counter() - start
+
+
+def _raise_on_error(results):
+    for result in results:
+        if isinstance(result, dict) and 'error' in result:
+            raise RuntimeError(result['error'])
+
+
+# ============================================
+# READINESS STATE
+# ============================================
+
+_state = {'state': 'pending', 'ready': False, 'models': {}, 'total_time_s': None, 'pid': os.getpid()}
+_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    """Kernel choices and thread pools are per process - each worker warms up itself"""
+    global _lock
+    _lock = threading.Lock()
+    _state.update({'state': 'pending', 'ready': False, 'models': {}, 'total_time_s': None, 'pid': os.getpid()})
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def run_warmup(on_progress=None):
+    """
+    Warm up every loaded model and set the readiness flag
+
+    Args:
+        on_progress: Optional function called before and after each model
+            (gunicorn's worker.notify, so a long warmup does not look like a
+            hung worker)
+
+    Returns:
+        True if the process is ready
+    """
+    with _lock:
+        if _state['state'] in ('running', 'done'):
+            return _state['ready']
+        _state['state'] = 'running'
+
+    if not config.MODEL_WARMUP_ENABLED or not model_registry.predictions_available():
+        _state.update({'state': 'disabled', 'ready': True})
+        return True
+
+    texts = build_warmup_texts(config.MODEL_WARMUP_LENGTHS)
+    start = time.perf_counter()
+
+    if on_progress:
+        on_progress()
+    targets = get_warmup_targets()
+
+    models = {}
+    for name, predict_batch in targets.items():
+        if on_progress:
+            on_progress()
+
+        if predict_batch is None:
+            models[name] = {'warmed': False, 'error': 'model not loaded'}
+            continue
+
+        try:
+            elapsed = warm_model(predict_batch, texts, config.MODEL_WARMUP_ROUNDS)
+            models[name] = {'warmed': True, 'warmup_time_s': round(elapsed, 3)}
+            logger.info(f"✓ Warmed up {name} in {elapsed:.2f}s")
+        except Exception as e:
+            logger.error(f"Warmup of {name} failed: {e}")
+            models[name] = {'warmed': False, 'error': str(e)}
+
+    if on_progress:
+        on_progress()
+
+    ready = any(model['warmed'] for model in models.values())
+    _state.update({
+        'state': 'done',
+        'ready': ready,
+        'models': models,
+        'total_time_s': round(time.perf_counter() - start, 3),
+        'text_lengths': list(config.MODEL_WARMUP_LENGTHS)
+    })
+
+    if not ready:
+        logger.warning("⚠ Warmup finished but no model could be warmed up - not ready")
+    return ready
+
+
+def start_background():
+    """Run the warmup in a daemon thread (the flask dev server keeps serving /api/ready meanwhile)"""
+    thread = threading.Thread(target=run_warmup, name='model-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+def is_ready():
+    return _state['ready']
+
+
+def get_status():
+    """Warmup state, per-model warmup time and the readiness flag"""
+    return dict(_state, models={name: dict(info) for name, info in _state['models'].items()})
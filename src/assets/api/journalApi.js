@@ -38,14 +38,23 @@ const createHeaders = (user) => {
   return headers;
 };
 
+// Entry fields the journal views render (the analysis, tags and scores JSON are not requested)
+export const ENTRY_LIST_FIELDS = ['id', 'text', 'sentiment', 'confidence', 'date'];
+
 // Journal Entry Operations
 export const journalApi = {
-  // Get all journal entries for the user
-  async getEntries(user) {
+  // Get one page of journal entries (newest first)
+  // Pass the returned nextCursor back as cursor to load the next page; total is only sent with the first page
+  async getEntries(user, { cursor = null, limit = null, fields = ENTRY_LIST_FIELDS } = {}) {
     try {
       const headers = createHeaders(user);
+      const params = new URLSearchParams();
+      if (cursor) params.set('cursor', cursor);
+      if (limit) params.set('limit', limit);
+      if (fields && fields.length) params.set('fields', fields.join(','));
+      const query = params.toString() ? `?${params.toString()}` : '';
 
-      const response = await fetch(`${API_BASE_URL}/journal/entries`, {
+      const response = await fetch(`${API_BASE_URL}/journal/entries${query}`, {
         method: 'GET',
         headers
       });
@@ -58,7 +67,8 @@ export const journalApi = {
       return {
         success: true,
         entries: data.entries || [],
-        total: data.total || 0
+        nextCursor: data.next_cursor || null,
+        total: data.total
       };
     } catch (error) {
       console.error('Error fetching journal entries:', error);
@@ -66,11 +76,41 @@ export const journalApi = {
         success: false,
         error: error.message,
         entries: [],
+        nextCursor: null,
         total: 0
       };
     }
   },
 
+  // Get dashboard statistics (totals, sentiment distribution, streak) without loading entries
+  async getDashboardStats(user) {
+    try {
+      const headers = createHeaders(user);
+
+      const response = await fetch(`${API_BASE_URL}/dashboard/stats`, {
+        method: 'GET',
+        headers
+      });
+
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+
+      const data = await response.json();
+      return {
+        success: true,
+        stats: data.stats
+      };
+    } catch (error) {
+      console.error('Error fetching dashboard stats:', error);
+      return {
+        success: false,
+        error: error.message,
+        stats: null
+      };
+    }
+  },
+
   // Create a new journal entry
   async createEntry(user, text, tags = []) {
     try {
@@ -264,7 +304,7 @@ export const migrationUtils = {
       }
 
       // Check if entries already exist on server
-      const serverEntries = await journalApi.getEntries(user);
+      const serverEntries = await journalApi.getEntries(user, { limit: 1, fields: ['id'] });
       if (serverEntries.success && serverEntries.total > 0) {
         console.log('Server entries already exist, skipping migration');
         return { success: true, migrated: 0, skipped: true };
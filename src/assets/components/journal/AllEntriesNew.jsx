@@ -51,7 +51,12 @@ const AllEntries = ({ user, onSignOut }) => {
   const [sentimentFilter, setSentimentFilter] = useState('All');
   const [searchQuery, setSearchQuery] = useState('');
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [serverStats, setServerStats] = useState(null);
   const entriesPerPage = 6;
+  // Entries fetched per request; older entries are loaded on demand
+  const entriesPerRequest = 30;
 
   useEffect(() => {
     loadEntries();
@@ -65,14 +70,23 @@ const AllEntries = ({ user, onSignOut }) => {
     try {
       setLoading(true);
 
-      // Fetch entries from API
-      const result = await journalApi.getEntries(user);
+      // Fetch the newest entries and the totals from API
+      const [result, statsResult] = await Promise.all([
+        journalApi.getEntries(user, { limit: entriesPerRequest }),
+        journalApi.getDashboardStats(user)
+      ]);
+
+      if (statsResult.success && statsResult.stats) {
+        setServerStats(statsResult.stats);
+      }
 
       if (result.success && result.entries) {
         setEntries(result.entries);
+        setNextCursor(result.nextCursor);
       } else {
         console.error('Failed to load entries:', result.error);
         setEntries([]);
+        setNextCursor(null);
       }
     } catch (error) {
       console.error('Error loading entries:', error);
@@ -82,6 +96,26 @@ const AllEntries = ({ user, onSignOut }) => {
     }
   };
 
+  const loadMoreEntries = async () => {
+    if (!nextCursor) return;
+
+    try {
+      setLoadingMore(true);
+      const result = await journalApi.getEntries(user, { cursor: nextCursor, limit: entriesPerRequest });
+
+      if (result.success) {
+        setEntries(previous => [...previous, ...result.entries]);
+        setNextCursor(result.nextCursor);
+      } else {
+        console.error('Failed to load more entries:', result.error);
+      }
+    } catch (error) {
+      console.error('Error loading more entries:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const filterEntries = () => {
     let filtered = entries;
 
@@ -113,6 +147,15 @@ const AllEntries = ({ user, onSignOut }) => {
         // Update local state
         const updatedEntries = entries.filter(entry => entry.id !== selectedEntry.id);
         setEntries(updatedEntries);
+        if (serverStats) {
+          const distribution = { ...serverStats.sentiment_distribution };
+          distribution[selectedEntry.sentiment] = Math.max((distribution[selectedEntry.sentiment] || 0) - 1, 0);
+          setServerStats({
+            ...serverStats,
+            total_entries: Math.max(serverStats.total_entries - 1, 0),
+            sentiment_distribution: distribution
+          });
+        }
       } else {
         console.error('Failed to delete entry:', result.error);
         alert('Failed to delete entry. Please try again.');
@@ -146,6 +189,10 @@ const AllEntries = ({ user, onSignOut }) => {
 
   const getSentimentStats = () => {
     const stats = { Positive: 0, Negative: 0, Neutral: 0 };
+    if (serverStats) {
+      // Counts over all entries, not only the loaded pages
+      return { ...stats, ...serverStats.sentiment_distribution };
+    }
     entries.forEach(entry => {
       stats[entry.sentiment]++;
     });
@@ -158,6 +205,7 @@ const AllEntries = ({ user, onSignOut }) => {
   );
 
   const stats = getSentimentStats();
+  const totalEntries = serverStats ? serverStats.total_entries : entries.length;
 
   const StatChip = ({ label, value, color, delay = 0 }) => (
     <Grow in={!loading} timeout={800} style={{ transitionDelay: `${delay}ms` }}>
@@ -198,7 +246,7 @@ const AllEntries = ({ user, onSignOut }) => {
 
           {/* Stats Overview */}
           <Box display="flex" flexWrap="wrap" gap={2} mb={3}>
-            <StatChip label="Total" value={entries.length} color="#667eea" delay={0} />
+            <StatChip label="Total" value={totalEntries} color="#667eea" delay={0} />
             <StatChip label="Positive" value={stats.Positive} color="#4caf50" delay={100} />
             <StatChip label="Neutral" value={stats.Neutral} color="#ff9800" delay={200} />
             <StatChip label="Negative" value={stats.Negative} color="#f44336" delay={300} />
@@ -438,6 +486,20 @@ const AllEntries = ({ user, onSignOut }) => {
         </>
       )}
 
+      {/* Older entries are fetched on demand (search and filters apply to loaded entries) */}
+      {!loading && nextCursor && (
+        <Box display="flex" justifyContent="center" mt={3}>
+          <Button
+            variant="outlined"
+            onClick={loadMoreEntries}
+            disabled={loadingMore}
+            sx={{ borderRadius: 3 }}
+          >
+            {loadingMore ? '...' : `Load older entries (${entries.length} / ${totalEntries})`}
+          </Button>
+        </Box>
+      )}
+
       {/* Delete Confirmation Dialog */}
       <Dialog
         open={deleteDialogOpen}
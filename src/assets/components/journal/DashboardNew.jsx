@@ -57,12 +57,17 @@ import MentalHealthInsights from '../mental-health/MentalHealthInsights';
 import { journalApi } from '../../api/journalApi';
 import { useTranslation } from '../../../hooks/useTranslation';
 
+// Recent entries loaded for the dashboard (covers the 7-day mood chart for typical use)
+const RECENT_ENTRIES_LIMIT = 50;
+
 const Dashboard = ({ user, onSignOut }) => {
   const navigate = useNavigate();
   const { t } = useTranslation();
   const [openNewEntry, setOpenNewEntry] = useState(false);
   const [journalEntries, setJournalEntries] = useState([]);
   const [moodData, setMoodData] = useState([]);
+  // Totals, distribution and streak over all entries (server-side), so only recent entries are fetched
+  const [dashboardStats, setDashboardStats] = useState(null);
   const [selectedModel, setSelectedModel] = useState('both');
   const [loading, setLoading] = useState(true);
   const theme = useTheme();
@@ -73,12 +78,22 @@ const Dashboard = ({ user, onSignOut }) => {
     loadEntries();
   }, [user.id]);
 
+  const loadDashboardStats = async () => {
+    const statsResult = await journalApi.getDashboardStats(user);
+    if (statsResult.success && statsResult.stats) {
+      setDashboardStats(statsResult.stats);
+    }
+  };
+
   const loadEntries = async () => {
     try {
       setLoading(true);
 
-      // Fetch entries from the API
-      const result = await journalApi.getEntries(user);
+      // Fetch the recent entries (mood chart, trend, latest entries) and the overall stats from the API
+      const [result] = await Promise.all([
+        journalApi.getEntries(user, { limit: RECENT_ENTRIES_LIMIT }),
+        loadDashboardStats()
+      ]);
 
       if (result.success && result.entries.length > 0) {
         setJournalEntries(result.entries);
@@ -90,6 +105,7 @@ const Dashboard = ({ user, onSignOut }) => {
           const entries = JSON.parse(savedEntries);
           setJournalEntries(entries);
           generateMoodData(entries);
+          setDashboardStats(null); // Stats are computed from the local entries
         }
         // No sample data generation - leave empty if no entries
       }
@@ -102,6 +118,7 @@ const Dashboard = ({ user, onSignOut }) => {
         const entries = JSON.parse(savedEntries);
         setJournalEntries(entries);
         generateMoodData(entries);
+        setDashboardStats(null);
       }
     } finally {
       setLoading(false);
@@ -218,6 +235,7 @@ const Dashboard = ({ user, onSignOut }) => {
         const updatedEntries = [result.entry, ...journalEntries];
         setJournalEntries(updatedEntries);
         generateMoodData(updatedEntries);
+        loadDashboardStats();
 
         // AI analysis will be available in the dedicated AI Assistant page
         if (result.aiAnalysis) {
@@ -258,6 +276,8 @@ const Dashboard = ({ user, onSignOut }) => {
   };
 
   const getStreakCount = () => {
+    if (dashboardStats) return dashboardStats.streak;
+
     let streak = 0;
     let currentDate = new Date();
 
@@ -281,9 +301,13 @@ const Dashboard = ({ user, onSignOut }) => {
 
   const getMoodDistribution = () => {
     const distribution = { Positive: 0, Neutral: 0, Negative: 0 };
-    journalEntries.forEach(entry => {
-      distribution[entry.sentiment]++;
-    });
+    if (dashboardStats) {
+      Object.assign(distribution, dashboardStats.sentiment_distribution);
+    } else {
+      journalEntries.forEach(entry => {
+        distribution[entry.sentiment]++;
+      });
+    }
 
     return [
       {
@@ -377,8 +401,8 @@ const Dashboard = ({ user, onSignOut }) => {
     const recentMoodScore = normalizedRecentMood * 0.3;
 
     // Factor 3: Positive Sentiment Ratio (0-1)
-    const positiveEntries = journalEntries.filter(entry => entry.sentiment === 'Positive').length;
-    const positiveRatio = positiveEntries / journalEntries.length;
+    const positiveEntries = moodDistribution.find(item => item.name === 'Positive').value;
+    const positiveRatio = positiveEntries / totalEntries;
     const positiveScore = positiveRatio * 0.2;
 
     // Factor 4: Trend Improvement (0-1)
@@ -434,6 +458,7 @@ const Dashboard = ({ user, onSignOut }) => {
   const trend = getRecentTrend();
   const streak = getStreakCount();
   const moodDistribution = getMoodDistribution();
+  const totalEntries = dashboardStats ? dashboardStats.total_entries : journalEntries.length;
   const healthAssessment = getOverallHealthAssessment();
 
   const StatCard = ({ title, value, subtitle, icon, gradient, delay = 0 }) => (
@@ -563,7 +588,7 @@ const Dashboard = ({ user, onSignOut }) => {
               <Grid item xs={12} sm={6} md={3}>
                 <StatCard
                   title={t('dashboard.totalEntries')}
-                  value={journalEntries.length}
+                  value={totalEntries}
                   subtitle={t('dashboard.journalEntriesRecorded')}
                   icon={<Psychology sx={{ fontSize: 32 }} />}
                   gradient="linear-gradient(135deg, #667eea 0%, #764ba2 100%)"
@@ -651,7 +676,7 @@ const Dashboard = ({ user, onSignOut }) => {
               </Box>
               <Chip
                 icon={<Insights sx={{ fontSize: { xs: 16, sm: 18 } }} />}
-                label={`${journalEntries.length} ${t('dashboard.entriesAnalyzed')}`}
+                label={`${totalEntries} ${t('dashboard.entriesAnalyzed')}`}
                 color="primary"
                 variant="outlined"
                 size="small"
@@ -832,7 +857,7 @@ const Dashboard = ({ user, onSignOut }) => {
                               outerRadius={95}
                               paddingAngle={3}
                               dataKey="value"
-                              label={(entry) => entry.value > 0 ? `${entry.emoji} ${((entry.value / journalEntries.length) * 100).toFixed(0)}%` : ''}
+                              label={(entry) => entry.value > 0 ? `${entry.emoji} ${((entry.value / totalEntries) * 100).toFixed(0)}%` : ''}
                               labelLine={false}
                               animationBegin={0}
                               animationDuration={1500}
@@ -852,7 +877,7 @@ const Dashboard = ({ user, onSignOut }) => {
                             </Pie>
                             <RechartsTooltip
                               formatter={(value, name) => [
-                                `${value} ${t('dashboard.journalEntries')} (${((value / journalEntries.length) * 100).toFixed(1)}%)`,
+                                `${value} ${t('dashboard.journalEntries')} (${((value / totalEntries) * 100).toFixed(1)}%)`,
                                 name
                               ]}
                               contentStyle={{
@@ -922,7 +947,7 @@ const Dashboard = ({ user, onSignOut }) => {
                                   }}
                                 />
                                 <Typography variant="body2" sx={{ color: 'text.secondary', fontSize: '0.8rem' }}>
-                                  ({((item.value / journalEntries.length) * 100).toFixed(1)}%)
+                                  ({((item.value / totalEntries) * 100).toFixed(1)}%)
                                 </Typography>
                               </Box>
                             </Box>
@@ -959,7 +984,7 @@ const Dashboard = ({ user, onSignOut }) => {
               </Box>
               <Chip
                 icon={<Insights sx={{ fontSize: { xs: 16, sm: 18 } }} />}
-                label={`${journalEntries.length} ${t('dashboard.entriesAnalyzed')}`}
+                label={`${totalEntries} ${t('dashboard.entriesAnalyzed')}`}
                 color="primary"
                 variant="outlined"
                 size="small"
@@ -1067,7 +1092,7 @@ const Dashboard = ({ user, onSignOut }) => {
               </Grid>
             )}
 
-            {journalEntries.length > 3 && (
+            {totalEntries > 3 && (
               <Box textAlign="center" mt={3}>
                 <Button
                   variant="outlined"
@@ -1076,7 +1101,7 @@ const Dashboard = ({ user, onSignOut }) => {
                   size="large"
                   sx={{ borderRadius: 3 }}
                 >
-                  {t('dashboard.viewAllEntries')} ({journalEntries.length})
+                  {t('dashboard.viewAllEntries')} ({totalEntries})
                 </Button>
               </Box>
             )}
@@ -578,6 +578,7 @@ const AIAssistant = ({ user, onSignOut }) => {
   const [copingStrategies, setCopingStrategies] = useState([]);
   const [journalEntries, setJournalEntries] = useState([]);
   const [analytics, setAnalytics] = useState(null);
+  const [journalStats, setJournalStats] = useState(null);
   const [loading, setLoading] = useState(true);
   const [insightHistory, setInsightHistory] = useState([]);
   const [practiceModalOpen, setPracticeModalOpen] = useState(false);
@@ -603,8 +604,14 @@ const AIAssistant = ({ user, onSignOut }) => {
     setLoading(true);
     try {
       console.log('📚 Loading journal entries...');
-      // Load journal entries
-      const entriesResult = await journalApi.getEntries(user);
+      // Load recent journal entries (14-day mood chart) and the totals over all entries
+      const [entriesResult, statsResult] = await Promise.all([
+        journalApi.getEntries(user, { limit: 100, fields: ['id', 'sentiment', 'date'] }),
+        journalApi.getDashboardStats(user)
+      ]);
+      if (statsResult.success) {
+        setJournalStats(statsResult.stats);
+      }
       console.log('📚 Journal entries result:', entriesResult);
       if (entriesResult.success) {
         setJournalEntries(entriesResult.entries);
@@ -857,7 +864,7 @@ const AIAssistant = ({ user, onSignOut }) => {
               <Card sx={{ borderRadius: 3, background: '#f8f9ff' }}>
                 <CardContent sx={{ textAlign: 'center', py: 3 }}>
                   <Typography variant="h3" fontWeight="bold" color="#667eea">
-                    {journalEntries.length}
+                    {journalStats ? journalStats.total_entries : journalEntries.length}
                   </Typography>
                   <Typography variant="body2" color="text.secondary">
                     Total Journal Entries
@@ -871,7 +878,9 @@ const AIAssistant = ({ user, onSignOut }) => {
               <Card sx={{ borderRadius: 3, background: '#f0f9f0' }}>
                 <CardContent sx={{ textAlign: 'center', py: 3 }}>
                   <Typography variant="h3" fontWeight="bold" color="#4caf50">
-                    {journalEntries.filter(e => e.sentiment === 'Positive').length}
+                    {journalStats
+                      ? journalStats.sentiment_distribution.Positive || 0
+                      : journalEntries.filter(e => e.sentiment === 'Positive').length}
                   </Typography>
                   <Typography variant="body2" color="text.secondary">
                     Positive Entries